@@ -0,0 +1,30 @@
+"""add analysis_status
+
+Revision ID: 3b7e5d1a9c42
+Revises: acfc448f7edc
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b7e5d1a9c42'
+down_revision: Union[str, Sequence[str], None] = 'acfc448f7edc'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('user', sa.Column('analysis_status', sqlmodel.sql.sqltypes.AutoString(), nullable=False, server_default='pending'))
+    op.execute("UPDATE \"user\" SET analysis_status = 'ready' WHERE analysis_result IS NOT NULL")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('user', 'analysis_status')
@@ -0,0 +1,29 @@
+"""index active_project_end_date
+
+Revision ID: 8e1f0c2d7b64
+Revises: 3b7e5d1a9c42
+Create Date: 2026-10-19 09:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e1f0c2d7b64'
+down_revision: Union[str, Sequence[str], None] = '3b7e5d1a9c42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_user_active_project_end_date'), 'user', ['active_project_end_date'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_user_active_project_end_date'), table_name='user')
@@ -0,0 +1,31 @@
+"""index quest status and deadline
+
+Revision ID: c4a9e2f61d30
+Revises: 8e1f0c2d7b64
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4a9e2f61d30'
+down_revision: Union[str, Sequence[str], None] = '8e1f0c2d7b64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_quest_status'), 'quest', ['status'], unique=False)
+    op.create_index(op.f('ix_quest_deadline'), 'quest', ['deadline'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_quest_deadline'), table_name='quest')
+    op.drop_index(op.f('ix_quest_status'), table_name='quest')
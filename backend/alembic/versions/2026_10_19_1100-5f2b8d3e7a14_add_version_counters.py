@@ -0,0 +1,30 @@
+"""add version counters to user and quest
+
+Revision ID: 5f2b8d3e7a14
+Revises: c4a9e2f61d30
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5f2b8d3e7a14'
+down_revision: Union[str, Sequence[str], None] = 'c4a9e2f61d30'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('user', sa.Column('version', sa.Integer(), nullable=False, server_default='1'))
+    op.add_column('quest', sa.Column('version', sa.Integer(), nullable=False, server_default='1'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('quest', 'version')
+    op.drop_column('user', 'version')
@@ -0,0 +1,39 @@
+"""add change log
+
+Revision ID: 8a31c6d0e5b2
+Revises: 5f2b8d3e7a14
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8a31c6d0e5b2'
+down_revision: Union[str, Sequence[str], None] = '5f2b8d3e7a14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'change_log',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('entity', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('entity_id', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('op', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('changed_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_change_log_entity_id'), 'change_log', ['entity_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_change_log_entity_id'), table_name='change_log')
+    op.drop_table('change_log')
@@ -0,0 +1,35 @@
+"""add table version counters
+
+Revision ID: c47e19a2b6d3
+Revises: 8a31c6d0e5b2
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c47e19a2b6d3'
+down_revision: Union[str, Sequence[str], None] = '8a31c6d0e5b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    table_version = op.create_table(
+        'table_version',
+        sa.Column('name', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('name'),
+    )
+    op.bulk_insert(table_version, [{'name': 'user', 'version': 0}, {'name': 'quest', 'version': 0}])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('table_version')
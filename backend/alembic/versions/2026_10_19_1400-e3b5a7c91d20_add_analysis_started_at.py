@@ -0,0 +1,28 @@
+"""add analysis started at
+
+Revision ID: e3b5a7c91d20
+Revises: c47e19a2b6d3
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3b5a7c91d20'
+down_revision: Union[str, Sequence[str], None] = 'c47e19a2b6d3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('user', sa.Column('analysis_started_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('user', 'analysis_started_at')
@@ -1,9 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session, select
-from core.database import engine
+import io
+import json
+import math
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlmodel import Session, func, select
+from core.database import engine, get_session
 from models import User
 from core.auth import get_current_admin
 from schemas import RoleUpdate, UserPublic
+from services.capacity import BUCKETS, forecast_cache
+from services.exports import EXPORTS, export_lines
+from services.user_import import FORMATS, IMPORT_HASH_WORKERS, hash_passwords, import_users
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
@@ -38,6 +50,80 @@ def delete_user(user_id: str, admin: User = Depends(get_current_admin)):
         return {"message": "User deleted successfully"}
 
 
+@router.get("/capacity-forecast")
+def capacity_forecast(
+    start: Optional[date] = None,
+    horizon_days: int = Query(90, ge=1, le=366),
+    bucket: str = "day",
+    admin: User = Depends(get_current_admin),
+    session: Session = Depends(get_session),
+):
+    """Available people per department for each day/week of the horizon."""
+    if bucket not in BUCKETS:
+        raise HTTPException(status_code=400, detail="bucket must be 'day' or 'week'")
+
+    start = start or datetime.utcnow().date()
+    periods = math.ceil(horizon_days / BUCKETS[bucket].days)
+    return forecast_cache.get_or_compute(session, start, periods, bucket)
+
+
+# Uploads above this size spill from memory to a temp file
+IMPORT_SPOOL_BYTES = 8 * 1024 * 1024
+
+
+@router.post("/users/import")
+async def import_users_bulk(
+    request: Request,
+    format: Optional[str] = None,
+    admin: User = Depends(get_current_admin),
+    session: Session = Depends(get_session),
+):
+    """
+    Bulk import users from an NDJSON or CSV body (format from ?format= or
+    Content-Type). Streams NDJSON progress lines, one per committed chunk.
+    """
+    fmt = format or ("csv" if "csv" in request.headers.get("content-type", "") else "ndjson")
+    if fmt not in FORMATS:
+        raise HTTPException(status_code=400, detail="format must be 'ndjson' or 'csv'")
+
+    spool = tempfile.SpooledTemporaryFile(max_size=IMPORT_SPOOL_BYTES)
+    async for chunk in request.stream():
+        spool.write(chunk)
+    spool.seek(0)
+    lines = io.TextIOWrapper(spool, encoding="utf-8-sig", newline="")
+    bind = session.get_bind()
+
+    def progress_lines():
+        try:
+            for report in import_users(lines, fmt, engine=bind):
+                print(f"User import: {report['processed']} rows, {report['imported']} imported")
+                yield json.dumps(report, ensure_ascii=False) + "\n"
+        finally:
+            lines.close()
+
+    return StreamingResponse(progress_lines(), media_type="application/x-ndjson")
+
+
+@router.get("/export/{kind}")
+def export_ndjson(
+    kind: str,
+    admin: User = Depends(get_current_admin),
+    session: Session = Depends(get_session),
+):
+    """
+    Stream every user, quest or team as NDJSON (one JSON object per line),
+    read through a server-side cursor so memory stays flat.
+    """
+    if kind not in EXPORTS:
+        raise HTTPException(status_code=404, detail="export must be users, quests or teams")
+
+    return StreamingResponse(
+        export_lines(kind, engine=session.get_bind()),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{kind}.ndjson"'},
+    )
+
+
 # ================= SEED LOGIC =================
 
 from core.auth import get_password_hash
@@ -165,8 +251,7 @@ from jose import jwt, JWTError
 def seed_production_data(authorization: str = Header(None)):
     """Seed initial users. Requires admin if DB is not empty."""
     with Session(engine) as session:
-        all_users = session.exec(select(User)).all()
-        existing_count = len(all_users)
+        existing_count = session.exec(select(func.count(User.id))).one()
 
         if existing_count > 0:
             if not authorization:
@@ -194,6 +279,7 @@ def seed_production_data(authorization: str = Header(None)):
                 raise HTTPException(status_code=401, detail="Invalid token")
 
         created_count = 0
+        new_users = []
 
         for dept in DEPARTMENTS:
             dept_id = dept["id"]
@@ -219,7 +305,6 @@ def seed_production_data(authorization: str = Header(None)):
                 user = User(
                     name=full_name,
                     email=email,
-                    hashed_password=get_password_hash("1234"),
                     character_class=character_class,
                     level=random.randint(1, 5),
                     ocean_openness=o,
@@ -231,9 +316,15 @@ def seed_production_data(authorization: str = Header(None)):
                     skills=json.dumps(skills_json, ensure_ascii=False),
                     is_available=True,
                 )
-                session.add(user)
+                new_users.append(user)
                 created_count += 1
 
+        with ThreadPoolExecutor(max_workers=IMPORT_HASH_WORKERS) as executor:
+            hashes = hash_passwords(["1234"] * len(new_users), executor)
+        for user, hashed in zip(new_users, hashes):
+            user.hashed_password = hashed
+        session.add_all(new_users)
+
         if existing_count == 0:
             admin1 = User(
                 name="King Arthur",
@@ -0,0 +1,76 @@
+import json
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.encoders import jsonable_encoder
+from sqlmodel import Session, select
+
+from api.quests import _quest_list_item
+from api.users import _format_user_safe
+from core.auth import get_optional_user
+from core.database import get_session
+from models import Quest, User
+from services.change_log import CHANGES_PAGE_SIZE, read_changes
+
+router = APIRouter()
+
+
+@router.get("/changes")
+def get_changes(
+    since: int = Query(0, ge=0),
+    limit: int = Query(CHANGES_PAGE_SIZE, ge=1, le=CHANGES_PAGE_SIZE),
+    session: Session = Depends(get_session),
+    current_user: Optional[User] = Depends(get_optional_user),
+):
+    """Users and quests created, updated or deleted after cursor `since`.
+
+    Pass the returned `cursor` as the next `since`; keep going while
+    `has_more`, then poll again later (changes from the last few seconds
+    are held back until they settle). Start from 0 for a full sync. Items are shaped like the
+    /users and /quests items; an empty poll is one indexed query.
+    """
+    changes, cursor, has_more = read_changes(session, since, limit)
+    result = {
+        "cursor": cursor,
+        "has_more": has_more,
+        "users": [],
+        "quests": [],
+        "deleted": {"users": [], "quests": []},
+    }
+    if not changes:
+        return result
+
+    changed = {"user": [], "quest": []}
+    for (entity, entity_id), op in changes.items():
+        if op == "delete":
+            result["deleted"][entity + "s"].append(entity_id)
+        else:
+            changed[entity].append(entity_id)
+
+    quests = []
+    if changed["quest"]:
+        quests = session.exec(select(Quest).where(Quest.id.in_(changed["quest"]))).all()
+
+    # Changed users plus the leaders/members the quest items need, in one query
+    user_ids = set(changed["user"])
+    for q in quests:
+        user_ids.add(q.leader_id)
+        user_ids.update(json.loads(q.accepted_members) if q.accepted_members else [])
+    users_by_id = {}
+    if user_ids:
+        users_by_id = {u.id: u for u in session.exec(select(User).where(User.id.in_(user_ids))).all()}
+
+    requester_role = current_user.role if current_user else "guest"
+    requester_id = current_user.id if current_user else ""
+    for user_id in changed["user"]:
+        user = users_by_id.get(user_id)
+        if user:
+            result["users"].append(_format_user_safe(user, requester_role, requester_id))
+        else:
+            # Logged as an upsert, deleted before this poll
+            result["deleted"]["users"].append(user_id)
+
+    found = {q.id for q in quests}
+    result["quests"] = [_quest_list_item(q, users_by_id) for q in quests]
+    result["deleted"]["quests"] += [i for i in changed["quest"] if i not in found]
+    return jsonable_encoder(result)
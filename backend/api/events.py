@@ -0,0 +1,39 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from sqlmodel import Session
+
+from core.auth import get_current_user
+from core.database import get_session
+from core.sse import SSE_HEADERS
+from models import Quest, User
+from services.events import event_hub
+
+router = APIRouter()
+
+
+@router.get("/events/users/{user_id}")
+def user_events(user_id: str, current_user: User = Depends(get_current_user)):
+    """SSE: quest events for one user (kicked, assigned, quest status). Self or admin."""
+    if current_user.id != user_id and current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="You can only follow your own events")
+
+    return StreamingResponse(
+        event_hub.stream([f"user:{user_id}"]),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
+    )
+
+
+@router.get("/events/quests/{quest_id}")
+def quest_events(quest_id: str, session: Session = Depends(get_session)):
+    """SSE: status and team changes of one quest (public, like the quest detail)."""
+    if not session.get(Quest, quest_id):
+        raise HTTPException(status_code=404, detail="Quest not found")
+    # Streams stay open for hours; don't hold a pooled connection meanwhile
+    session.close()
+
+    return StreamingResponse(
+        event_hub.stream([f"quest:{quest_id}"]),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
+    )
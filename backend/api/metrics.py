@@ -0,0 +1,22 @@
+import os
+
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import PlainTextResponse
+
+from core.metrics import render_metrics
+
+router = APIRouter(tags=["metrics"])
+
+# Optional shared secret for the scraper; unset = open (e.g. private network)
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def get_metrics(authorization: str = Header(None)):
+    """Prometheus text exposition of in-process metrics."""
+    if METRICS_TOKEN and authorization != f"Bearer {METRICS_TOKEN}":
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+
+    return PlainTextResponse(
+        render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
@@ -1,10 +1,23 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from sqlmodel import Session, select
 from core.database import get_session
+from core.etag import etag_matches, make_etag, not_modified, table_versions
+from core.fieldsets import load_only_columns, parse_fields
 from core.auth import verify_token
 from models import Quest, User
 from schemas import UpdateStatusRequest, QuestResponse, QuestListResponse
-from services.matching import calculate_match_score, evaluate_team
+from services.availability import (
+    availability_index,
+    available_users,
+    parse_window,
+    release_members,
+)
+from services.events import publish_quest_event
+from services.response_cache import response_cache
+from services.matching import calculate_match_score, cost_to_score, evaluate_team, get_team_rating
+from services.team_optimizer import best_swaps
 from datetime import datetime
 from data.skills import DEPARTMENTS
 import json
@@ -12,110 +25,298 @@ import json
 router = APIRouter()
 
 
-@router.get("/quests", response_model=QuestListResponse)
-def get_quests(status: str = None, session: Session = Depends(get_session)):
-    """Get all quests, optionally filtered by status."""
-    if status:
-        quests = session.exec(select(Quest).where(Quest.status == status)).all()
-    else:
-        quests = session.exec(select(Quest)).all()
-
-    result = []
-    for q in quests:
-        leader = session.get(User, q.leader_id)
-
-        quest_dict = {
-            "id": q.id,
-            "title": q.title,
-            "description": q.description,
-            "rank": q.rank,
-            "required_skills": json.loads(q.required_skills),
-            "ocean_preference": json.loads(q.ocean_preference),
-            "team_size": q.team_size,
-            "leader_id": q.leader_id,
-            "leader_name": leader.name if leader else "Unknown",
-            "leader_class": leader.character_class if leader else "Novice",
-            "status": q.status,
-            "applicant_count": 0,
-            "start_date": q.start_date.isoformat() if q.start_date else None,
-            "deadline": q.deadline.isoformat() if q.deadline else None,
-            "created_at": q.created_at.isoformat(),
-            "harmony_score": 0,
-        }
-
+# Computed keys of the /quests items -> Quest columns they are built from
+QUEST_DERIVED_COLUMNS = {
+    "leader_name": ("leader_id",),
+    "leader_class": ("leader_id",),
+    "applicant_count": (),
+    "harmony_score": ("leader_id", "accepted_members"),
+}
+QUEST_LIST_FIELDS = (
+    "id",
+    "title",
+    "description",
+    "rank",
+    "required_skills",
+    "ocean_preference",
+    "team_size",
+    "leader_id",
+    "status",
+    "start_date",
+    "deadline",
+    "created_at",
+    *QUEST_DERIVED_COLUMNS,
+)
+TEAM_FIELDS = {"leader_name", "leader_class", "harmony_score"}
+
+
+def _quest_list_item(q: Quest, users_by_id: dict, fields: set = None) -> dict:
+    """One /quests item; with `fields`, only those keys (and their columns) are touched."""
+
+    def wanted(name):
+        return fields is None or name in fields
+
+    data = {}
+    for name in ("id", "title", "description", "rank", "team_size", "leader_id", "status"):
+        if wanted(name):
+            data[name] = getattr(q, name)
+    for name in ("required_skills", "ocean_preference"):
+        if wanted(name):
+            data[name] = json.loads(getattr(q, name))
+
+    leader = users_by_id.get(q.leader_id) if fields is None or fields & TEAM_FIELDS else None
+    if wanted("leader_name"):
+        data["leader_name"] = leader.name if leader else "Unknown"
+    if wanted("leader_class"):
+        data["leader_class"] = leader.character_class if leader else "Novice"
+    if wanted("applicant_count"):
+        data["applicant_count"] = 0
+
+    for name in ("start_date", "deadline"):
+        if wanted(name):
+            value = getattr(q, name)
+            data[name] = value.isoformat() if value else None
+    if wanted("created_at"):
+        data["created_at"] = q.created_at.isoformat()
+
+    if wanted("harmony_score"):
+        data["harmony_score"] = 0
         accepted_ids = json.loads(q.accepted_members) if q.accepted_members else []
         if accepted_ids and leader:
             team_users = [leader]
             for uid in accepted_ids:
-                u = session.get(User, uid)
+                u = users_by_id.get(uid)
                 if u:
                     team_users.append(u)
 
             if len(team_users) >= 2:
                 eval_result = evaluate_team(team_users)
-                quest_dict["harmony_score"] = int(round(eval_result["score"]))
+                data["harmony_score"] = int(round(eval_result["score"]))
 
-        result.append(quest_dict)
+    return data
 
-    return {"quests": result}
+
+def _quest_list(session: Session, status: str = None, selected: set = None) -> list:
+    statement = select(Quest)
+    if status:
+        statement = statement.where(Quest.status == status)
+    if selected:
+        columns = set()
+        for name in selected:
+            columns.update(QUEST_DERIVED_COLUMNS.get(name, (name,)))
+        statement = statement.options(load_only_columns(Quest, columns))
+    quests = session.exec(statement).all()
+
+    # Load every leader/member in one query instead of one per quest
+    users_by_id = {}
+    if selected is None or selected & TEAM_FIELDS:
+        # Members only matter for harmony; leader fields don't load accepted_members
+        with_members = selected is None or "harmony_score" in selected
+        user_ids = set()
+        for q in quests:
+            user_ids.add(q.leader_id)
+            if with_members:
+                user_ids.update(json.loads(q.accepted_members) if q.accepted_members else [])
+        if user_ids:
+            users_by_id = {
+                u.id: u
+                for u in session.exec(select(User).where(User.id.in_(user_ids))).all()
+            }
+
+    return [_quest_list_item(q, users_by_id, selected) for q in quests]
 
 
-@router.get("/quests/{quest_id}", response_model=QuestResponse)
-def get_quest_detail(quest_id: str, session: Session = Depends(get_session)):
-    """Get quest details."""
-    quest = session.get(Quest, quest_id)
-    if not quest:
-        raise HTTPException(status_code=404, detail="Quest not found")
+@router.get("/quests", response_model=QuestListResponse)
+def get_quests(
+    request: Request,
+    response: Response,
+    status: str = None,
+    fields: str = None,
+    session: Session = Depends(get_session),
+):
+    """Get all quests, optionally filtered by status. `fields=id,title` returns only those keys.
+
+    Sends an ETag; If-None-Match gets a 304 without running the list query.
+    """
+    try:
+        selected = parse_fields(fields, QUEST_LIST_FIELDS)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    etag = make_etag("quests", status, sorted(selected or []), table_versions(session, Quest, User))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    result = response_cache.get_or_compute(
+        "quests",
+        [status, sorted(selected or [])],
+        ["quests", "users"],
+        lambda s: _quest_list(s, status, selected),
+        session,
+    )
+
+    if selected:
+        # Partial items don't fit QuestListResponse; skip its validation
+        return JSONResponse({"quests": result}, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return {"quests": result}
+
 
-    leader = session.get(User, quest.leader_id)
+def _load_team(session: Session, quest: Quest):
+    """Leader and accepted members (in accepted order) with a single query."""
     accepted_ids = json.loads(quest.accepted_members) if quest.accepted_members else []
+    users_by_id = {
+        u.id: u
+        for u in session.exec(
+            select(User).where(User.id.in_({quest.leader_id, *accepted_ids}))
+        ).all()
+    }
+    members = [users_by_id[uid] for uid in accepted_ids if uid in users_by_id]
+    return users_by_id.get(quest.leader_id), members, accepted_ids
 
-    accepted_members = []
-    req_skills = json.loads(quest.required_skills)
 
-    for uid in accepted_ids:
-        user = session.get(User, uid)
-        if user:
-            user_skills = json.loads(user.skills) if user.skills else []
-            user_skill_map = {s["name"]: s["level"] for s in user_skills}
-
-            matching = []
-            for req in req_skills:
-                if req["name"] in user_skill_map:
-                    matching.append(
-                        {
-                            "name": req["name"],
-                            "level": user_skill_map[req["name"]],
-                            "type": "required",
-                        }
-                    )
-
-            matching.sort(key=lambda x: x["level"], reverse=True)
-
-            department = "Unknown"
-            dept_names = [d["name"] for d in DEPARTMENTS]
-            for s in user_skills:
-                if s["name"] in dept_names:
-                    department = s["name"]
-                    break
-
-            accepted_members.append(
+def _member_detail(user: User, req_skills: list) -> dict:
+    user_skills = json.loads(user.skills) if user.skills else []
+    user_skill_map = {s["name"]: s["level"] for s in user_skills}
+
+    matching = []
+    for req in req_skills:
+        if req["name"] in user_skill_map:
+            matching.append(
                 {
-                    "id": user.id,
-                    "name": user.name,
-                    "character_class": user.character_class,
-                    "department": department,
-                    "level": user.level,
-                    "matching_skills": matching,
+                    "name": req["name"],
+                    "level": user_skill_map[req["name"]],
+                    "type": "required",
                 }
             )
 
+    matching.sort(key=lambda x: x["level"], reverse=True)
+
+    department = "Unknown"
+    dept_names = [d["name"] for d in DEPARTMENTS]
+    for s in user_skills:
+        if s["name"] in dept_names:
+            department = s["name"]
+            break
+
+    return {
+        "id": user.id,
+        "name": user.name,
+        "character_class": user.character_class,
+        "department": department,
+        "level": user.level,
+        "matching_skills": matching,
+    }
+
+
+def _team_analysis(leader, members: list, accepted_ids: list, required_skills: list) -> dict:
+    """Skill coverage and OCEAN averages of the members, harmony of leader + members."""
+    if not accepted_ids:
+        return {"has_team": False}
+
+    team_skills = {}
+    team_ocean = {"O": [], "C": [], "E": [], "A": [], "N": []}
+
+    for user in members:
+        user_skills = json.loads(user.skills) if user.skills else []
+        for s in user_skills:
+            skill_name = s.get("name", "")
+            skill_level = s.get("level", 0)
+            if (
+                skill_name not in team_skills
+                or skill_level > team_skills[skill_name]
+            ):
+                team_skills[skill_name] = skill_level
+
+        team_ocean["O"].append(user.ocean_openness or 25)
+        team_ocean["C"].append(user.ocean_conscientiousness or 25)
+        team_ocean["E"].append(user.ocean_extraversion or 25)
+        team_ocean["A"].append(user.ocean_agreeableness or 25)
+        team_ocean["N"].append(user.ocean_neuroticism or 25)
+
+    covered_skills = []
+    missing_skills = []
+    partial_skills = []
+
+    for req in required_skills:
+        skill_name = req["name"]
+        required_level = req["level"]
+        team_level = team_skills.get(skill_name, 0)
+
+        if team_level >= required_level:
+            covered_skills.append(
+                {"name": skill_name, "required": required_level, "has": team_level}
+            )
+        elif team_level > 0:
+            partial_skills.append(
+                {"name": skill_name, "required": required_level, "has": team_level}
+            )
+        else:
+            missing_skills.append({"name": skill_name, "required": required_level})
+
+    total_skills = len(required_skills)
+    coverage_percent = int((len(covered_skills) / max(total_skills, 1)) * 100)
+
+    team_users = ([leader] if leader else []) + members
+
+    harmony_score = 0
+    if len(team_users) >= 2:
+        eval_result = evaluate_team(team_users)
+        harmony_score = int(round(eval_result["score"]))
+
     return {
+        "has_team": True,
+        "member_count": len(accepted_ids),
+        "skill_coverage": {
+            "covered": covered_skills,
+            "partial": partial_skills,
+            "missing": missing_skills,
+            "coverage_percent": coverage_percent,
+            "all_covered": len(missing_skills) == 0 and len(partial_skills) == 0,
+        },
+        "harmony_score": harmony_score,
+        "team_ocean": {
+            trait: int(sum(values) / len(values)) if values else 0
+            for trait, values in team_ocean.items()
+        },
+    }
+
+
+def _detail_etag(quest_id: str, quest_version: int, include: str, team_versions) -> str:
+    """ETag of GET /quests/{id} from the quest's and its team's (id, version) pairs."""
+    return make_etag("quest", quest_id, quest_version, include, sorted(set(team_versions)))
+
+
+def _current_detail_etag(session: Session, quest_id: str, include: str = None):
+    """The detail ETag from version columns only (None if no such quest)."""
+    row = session.exec(
+        select(Quest.version, Quest.leader_id, Quest.accepted_members).where(Quest.id == quest_id)
+    ).first()
+    if not row:
+        return None
+    version, leader_id, accepted = row
+    team_ids = {leader_id, *(json.loads(accepted) if accepted else [])}
+    team_versions = session.exec(select(User.id, User.version).where(User.id.in_(team_ids))).all()
+    return _detail_etag(quest_id, version, include, [tuple(v) for v in team_versions])
+
+
+def _quest_detail(session: Session, quest_id: str, include: str = None) -> dict:
+    """{"etag", "body"} for GET /quests/{id}; the ETag comes from the quest and team versions."""
+    quest = session.get(Quest, quest_id)
+    if not quest:
+        raise HTTPException(status_code=404, detail="Quest not found")
+
+    leader, members, accepted_ids = _load_team(session, quest)
+    team = ([leader] if leader else []) + members
+    etag = _detail_etag(quest.id, quest.version, include, [(u.id, u.version) for u in team])
+    req_skills = json.loads(quest.required_skills)
+
+    detail = {
         "id": quest.id,
         "title": quest.title,
         "description": quest.description,
         "rank": quest.rank,
-        "required_skills": json.loads(quest.required_skills),
+        "required_skills": req_skills,
         "optional_skills": [],
         "ocean_preference": json.loads(quest.ocean_preference),
         "team_size": quest.team_size,
@@ -124,13 +325,56 @@ def get_quest_detail(quest_id: str, session: Session = Depends(get_session)):
         "leader_class": leader.character_class if leader else "Novice",
         "status": quest.status,
         "applicants": [],
-        "accepted_members": accepted_members,
+        "accepted_members": [_member_detail(u, req_skills) for u in members],
         "accepted_member_ids": accepted_ids,
         "start_date": quest.start_date.isoformat() if quest.start_date else None,
         "deadline": quest.deadline.isoformat() if quest.deadline else None,
         "created_at": quest.created_at.isoformat(),
     }
 
+    if include and "analysis" in include.split(","):
+        analysis = _team_analysis(leader, members, accepted_ids, req_skills)
+        detail["analysis"] = analysis
+        detail["harmony_score"] = analysis.get("harmony_score", 0)
+
+    return {"etag": etag, "body": detail}
+
+
+def _quest_tags(quest_id: str) -> list:
+    return [f"quest:{quest_id}", "quest:*", "users"]
+
+
+@router.get("/quests/{quest_id}", response_model=QuestResponse)
+def get_quest_detail(
+    quest_id: str,
+    request: Request,
+    response: Response,
+    include: str = None,
+    session: Session = Depends(get_session),
+):
+    """
+    Get quest details. include=analysis adds the team analysis (same as
+    /quests/{id}/team-analysis) computed from the same loaded team.
+    With If-None-Match, the ETag is checked against the version columns
+    first, so a 304 never loads the team or builds the body.
+    """
+    if request.headers.get("if-none-match"):
+        etag = _current_detail_etag(session, quest_id, include)
+        if etag and etag_matches(request, etag):
+            return not_modified(etag)
+
+    cached = response_cache.get_or_compute(
+        "quest",
+        [quest_id, include],
+        _quest_tags(quest_id),
+        lambda s: _quest_detail(s, quest_id, include),
+        session,
+    )
+    if etag_matches(request, cached["etag"]):
+        return not_modified(cached["etag"])
+    response.headers["ETag"] = cached["etag"]
+    return cached["body"]
+
 
 # Unused Endpoint
 # @router.patch("/quests/{quest_id}/team-size")
@@ -171,121 +415,90 @@ def get_quest_detail(quest_id: str, session: Session = Depends(get_session)):
 #     }
 
 
-@router.get("/quests/{quest_id}/team-analysis")
-def get_team_analysis(quest_id: str, session: Session = Depends(get_session)):
-    """Analyze team compatibility and skill coverage."""
+def _quest_team_analysis(session: Session, quest_id: str) -> dict:
     quest = session.get(Quest, quest_id)
     if not quest:
         raise HTTPException(status_code=404, detail="Quest not found")
 
-    accepted_ids = json.loads(quest.accepted_members) if quest.accepted_members else []
-    if not accepted_ids:
-        return {"has_team": False}
-
+    leader, members, accepted_ids = _load_team(session, quest)
     required_skills = (
         json.loads(quest.required_skills)
         if isinstance(quest.required_skills, str)
         else quest.required_skills
     )
+    return _team_analysis(leader, members, accepted_ids, required_skills)
 
-    team_skills = {}
-    team_ocean = {"O": [], "C": [], "E": [], "A": [], "N": []}
-
-    for uid in accepted_ids:
-        user = session.get(User, uid)
-        if user:
-            user_skills = json.loads(user.skills) if user.skills else []
-            for s in user_skills:
-                skill_name = s.get("name", "")
-                skill_level = s.get("level", 0)
-                if (
-                    skill_name not in team_skills
-                    or skill_level > team_skills[skill_name]
-                ):
-                    team_skills[skill_name] = skill_level
-
-            team_ocean["O"].append(user.ocean_openness or 25)
-            team_ocean["C"].append(user.ocean_conscientiousness or 25)
-            team_ocean["E"].append(user.ocean_extraversion or 25)
-            team_ocean["A"].append(user.ocean_agreeableness or 25)
-            team_ocean["N"].append(user.ocean_neuroticism or 25)
 
-    covered_skills = []
-    missing_skills = []
-    partial_skills = []
+@router.get("/quests/{quest_id}/team-analysis")
+def get_team_analysis(quest_id: str, session: Session = Depends(get_session)):
+    """Analyze team compatibility and skill coverage."""
+    return response_cache.get_or_compute(
+        "team-analysis",
+        [quest_id],
+        _quest_tags(quest_id),
+        lambda s: _quest_team_analysis(s, quest_id),
+        session,
+    )
 
-    for req in required_skills:
-        skill_name = req["name"]
-        required_level = req["level"]
-        team_level = team_skills.get(skill_name, 0)
 
-        if team_level >= required_level:
-            covered_skills.append(
-                {"name": skill_name, "required": required_level, "has": team_level}
-            )
-        elif team_level > 0:
-            partial_skills.append(
-                {"name": skill_name, "required": required_level, "has": team_level}
-            )
-        else:
-            missing_skills.append({"name": skill_name, "required": required_level})
+@router.get("/quests/{quest_id}/swap-suggestions")
+def get_swap_suggestions(
+    quest_id: str,
+    limit: int = Query(10, ge=1, le=50),
+    user_id_from_token: str = Depends(verify_token),
+    session: Session = Depends(get_session),
+):
+    """Best single-member replacements that raise the team's harmony (leader only)."""
+    quest = session.get(Quest, quest_id)
+    if not quest:
+        raise HTTPException(status_code=404, detail="Quest not found")
 
-    total_skills = len(required_skills)
-    coverage_percent = int((len(covered_skills) / max(total_skills, 1)) * 100)
+    if quest.leader_id != user_id_from_token:
+        raise HTTPException(status_code=403, detail="เฉพาะหัวหน้าทีมเท่านั้นที่ดูคำแนะนำได้")
 
-    team_users = []
-    leader = session.get(User, quest.leader_id)
-    if leader:
-        team_users.append(leader)
+    if quest.status not in ["open", "filled"]:
+        raise HTTPException(
+            status_code=400, detail="Only open or filled quests can change members"
+        )
 
-    for uid in accepted_ids:
-        u = session.get(User, uid)
-        if u:
-            team_users.append(u)
+    leader, members, accepted_ids = _load_team(session, quest)
+    team = ([leader] if leader else []) + members
+    # Free for the quest's dates (or right now when it has none)
+    window = parse_window(quest.start_date, quest.deadline)
+    candidates = available_users(
+        session,
+        select(User).where(User.id.not_in({quest.leader_id, *accepted_ids})),
+        window,
+    )
 
-    harmony_score = 0
-    if len(team_users) >= 2:
-        eval_result = evaluate_team(team_users)
-        harmony_score = int(round(eval_result["score"]))
+    _, swaps = best_swaps(team, members, candidates, limit)
+    current = evaluate_team(team)
+    if current["cost"] == float("inf"):
+        current["cost"] = None  # not valid JSON
+    suggestions = []
+    for cost, out, replacement in swaps:
+        score = cost_to_score(cost)
+        suggestions.append(
+            {
+                "remove": {"id": out.id, "name": out.name},
+                "add": {
+                    "id": replacement.id,
+                    "name": replacement.name,
+                    "character_class": replacement.character_class,
+                    "level": replacement.level,
+                },
+                "cost": round(cost, 3),
+                "score": score,
+                "rating": get_team_rating(score),
+                "delta_score": round(score - current["score"], 1),
+            }
+        )
 
     return {
-        "has_team": True,
-        "member_count": len(accepted_ids),
-        "skill_coverage": {
-            "covered": covered_skills,
-            "partial": partial_skills,
-            "missing": missing_skills,
-            "coverage_percent": coverage_percent,
-            "all_covered": len(missing_skills) == 0 and len(partial_skills) == 0,
-        },
-        "harmony_score": harmony_score,
-        "team_ocean": {
-            "O": (
-                int(sum(team_ocean["O"]) / len(team_ocean["O"]))
-                if team_ocean["O"]
-                else 0
-            ),
-            "C": (
-                int(sum(team_ocean["C"]) / len(team_ocean["C"]))
-                if team_ocean["C"]
-                else 0
-            ),
-            "E": (
-                int(sum(team_ocean["E"]) / len(team_ocean["E"]))
-                if team_ocean["E"]
-                else 0
-            ),
-            "A": (
-                int(sum(team_ocean["A"]) / len(team_ocean["A"]))
-                if team_ocean["A"]
-                else 0
-            ),
-            "N": (
-                int(sum(team_ocean["N"]) / len(team_ocean["N"]))
-                if team_ocean["N"]
-                else 0
-            ),
-        },
+        "quest_id": quest.id,
+        "current": current,
+        "candidates_considered": len(candidates),
+        "suggestions": suggestions,
     }
 
 
@@ -349,17 +562,16 @@ def kick_member(
     accepted_ids.remove(user_id)
     quest.accepted_members = json.dumps(accepted_ids)
 
-    user = session.get(User, user_id)
-    if user:
-        user.is_available = True
-        user.active_project_end_date = None
-        session.add(user)
+    # Still on another active quest: stays busy until that one ends
+    release_members(session, [user_id], [quest.id])
 
     if len(accepted_ids) < quest.team_size:
         quest.status = "open"
 
     session.add(quest)
     session.commit()
+    availability_index.invalidate()
+    publish_quest_event(quest, "member_kicked", user_id, user_id=user_id)
 
     return {"message": f"ปลดสมาชิกแล้ว", "remaining_members": len(accepted_ids)}
 
@@ -388,18 +600,15 @@ def update_quest_status(
         accepted_ids = (
             json.loads(quest.accepted_members) if quest.accepted_members else []
         )
-        for uid in accepted_ids:
-            user = session.get(User, uid)
-            if user:
-                user.is_available = True
-                user.active_project_end_date = None
-                session.add(user)
+        release_members(session, accepted_ids, [quest.id])
 
     elif req.status == "in_progress":
         quest.start_date = datetime.utcnow()
 
     session.add(quest)
     session.commit()
+    availability_index.invalidate()
+    publish_quest_event(quest, "quest_status")
 
     return {"message": "Status updated", "status": quest.status}
 
@@ -459,14 +668,12 @@ def complete_quest(
     quest.status = "completed"
 
     accepted = json.loads(quest.accepted_members) if quest.accepted_members else []
-    for uid in accepted:
-        user = session.get(User, uid)
-        if user:
-            user.is_available = True
-            session.add(user)
+    release_members(session, accepted, [quest.id])
 
     session.add(quest)
     session.commit()
+    availability_index.invalidate()
+    publish_quest_event(quest, "quest_status")
 
     return {"message": "Quest completed!", "status": "completed"}
 
@@ -494,14 +701,12 @@ def cancel_quest(
     quest.status = "cancelled"
 
     accepted = json.loads(quest.accepted_members) if quest.accepted_members else []
-    for uid in accepted:
-        user = session.get(User, uid)
-        if user:
-            user.is_available = True
-            session.add(user)
+    release_members(session, accepted, [quest.id])
 
     session.add(quest)
     session.commit()
+    availability_index.invalidate()
+    publish_quest_event(quest, "quest_status")
 
     return {"message": "Quest cancelled", "status": "cancelled"}
 
@@ -526,5 +731,6 @@ def start_quest(
     quest.status = "in_progress"
     session.add(quest)
     session.commit()
+    publish_quest_event(quest, "quest_status")
 
     return {"message": "Quest started!", "status": "in_progress"}
@@ -1,11 +1,14 @@
 import json
-import random
+import time
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
 from sqlmodel import Session, select
 
-from core.auth import get_current_user, verify_token
+from core.auth import decode_token, get_current_user, verify_token
 from core.database import get_session
+from core.sse import SSE_HEADERS, format_sse
 from data.skills import DEPARTMENTS
 from models import Quest, User
 from schemas import (
@@ -13,16 +16,36 @@ from schemas import (
     ConfirmSmartTeamRequest,
     MatchRequest,
     PreviewSmartTeamRequest,
+    TeamDraftMessage,
+    TeamPlanRequest,
     UserPublic,
 )
-from services.ai import analyze_match_synergy, generate_team_overview
+from services.ai import (
+    analyze_match_synergy,
+    generate_team_overview,
+    stream_match_synergy,
+    stream_team_overview,
+)
+from services.availability import (
+    availability_index,
+    available_users,
+    parse_window,
+    schedule_release,
+    to_utc_naive,
+)
+from services.events import publish_quest_event
+from services.quest_sweeper import schedule_deadline
+from services.team_draft import TeamDraft
+from services.team_planner import plan_teams
+from services.team_optimizer import optimize_team
 from services.matching import (
     LAMBDA,
     SCALING_MAX_COST,
     TAU,
     calculate_academic_cost,
-    calculate_team_cost,
+    calculate_match_score,
     cost_to_score,
+    evaluate_team,
     get_stats,
     get_team_rating,
 )
@@ -30,8 +53,7 @@ from services.matching import (
 router = APIRouter()
 
 
-@router.post("/match-ai")
-async def match_users_ai(req: MatchRequest, session: Session = Depends(get_session)):
+def _load_match_pair(req: MatchRequest, session: Session):
     u1 = session.get(User, req.user1_id)
     u2 = session.get(User, req.user2_id)
 
@@ -49,35 +71,17 @@ async def match_users_ai(req: MatchRequest, session: Session = Depends(get_sessi
     final_score = max(0, min(100, int(round(score_raw))))
     team_rating = get_team_rating(final_score)
 
-    analysis_json = await analyze_match_synergy(u1, u2, s1, s2, final_score)
+    return u1, u2, s1, s2, final_score, team_rating
 
-    # Parse skills for user1
-    u1_dict = u1.model_dump()
-    u1_skills = (
-        json.loads(u1.skills)
-        if u1.skills and isinstance(u1.skills, str)
-        else (u1.skills if u1.skills else [])
-    )
-    u1_dict["skills"] = u1_skills
-    # Ensure OCEAN defaults
-    for f in [
-        "ocean_openness",
-        "ocean_conscientiousness",
-        "ocean_extraversion",
-        "ocean_agreeableness",
-        "ocean_neuroticism",
-    ]:
-        if u1_dict.get(f) is None:
-            u1_dict[f] = 0
-
-    # Parse skills for user2
-    u2_dict = u2.model_dump()
-    u2_skills = (
-        json.loads(u2.skills)
-        if u2.skills and isinstance(u2.skills, str)
-        else (u2.skills if u2.skills else [])
+
+def _match_user_dict(u: User) -> dict:
+    u_dict = u.model_dump()
+    u_skills = (
+        json.loads(u.skills)
+        if u.skills and isinstance(u.skills, str)
+        else (u.skills if u.skills else [])
     )
-    u2_dict["skills"] = u2_skills
+    u_dict["skills"] = u_skills
     # Ensure OCEAN defaults
     for f in [
         "ocean_openness",
@@ -86,18 +90,54 @@ async def match_users_ai(req: MatchRequest, session: Session = Depends(get_sessi
         "ocean_agreeableness",
         "ocean_neuroticism",
     ]:
-        if u2_dict.get(f) is None:
-            u2_dict[f] = 0
+        if u_dict.get(f) is None:
+            u_dict[f] = 0
+    return u_dict
+
+
+@router.post("/match-ai")
+async def match_users_ai(req: MatchRequest, session: Session = Depends(get_session)):
+    u1, u2, s1, s2, final_score, team_rating = _load_match_pair(req, session)
+
+    analysis_json = await analyze_match_synergy(u1, u2, s1, s2, final_score)
 
     return {
-        "user1": u1_dict,
-        "user2": u2_dict,
+        "user1": _match_user_dict(u1),
+        "user2": _match_user_dict(u2),
         "ai_analysis": analysis_json,
         "team_rating": team_rating,
         "score": final_score,
     }
 
 
+@router.post("/match-ai/stream")
+async def match_users_ai_stream(
+    req: MatchRequest, session: Session = Depends(get_session)
+):
+    """Same as /match-ai but streams the AI analysis over SSE."""
+    u1, u2, s1, s2, final_score, team_rating = _load_match_pair(req, session)
+
+    # Scores are known before the LLM answers -> send them first
+    meta = {
+        "user1": _match_user_dict(u1),
+        "user2": _match_user_dict(u2),
+        "team_rating": team_rating,
+        "score": final_score,
+    }
+
+    async def event_stream():
+        yield format_sse(meta, event="meta")
+        async for event, data in stream_match_synergy(u1, u2, s1, s2, final_score):
+            if event == "done":
+                yield format_sse({"ai_analysis": data}, event="done")
+            else:
+                yield format_sse(data, event=event)
+
+    return StreamingResponse(
+        event_stream(), media_type="text/event-stream", headers=SSE_HEADERS
+    )
+
+
 # =========================
 # Utility
 # =========================
@@ -141,14 +181,15 @@ def user_matches_dept(user: User, dept_name: str, dept_skills: set) -> bool:
 def preview_smart_team(
     req: PreviewSmartTeamRequest, session: Session = Depends(get_session)
 ):
+    try:
+        window = parse_window(req.start_date, req.deadline)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ช่วงวันที่ไม่ถูกต้อง")
+
+    statement = select(User)
     if req.candidate_ids:
-        all_users = session.exec(
-            select(User).where(
-                User.id.in_(req.candidate_ids), User.is_available == True
-            )
-        ).all()
-    else:
-        all_users = session.exec(select(User).where(User.is_available == True)).all()
+        statement = statement.where(User.id.in_(req.candidate_ids))
+    all_users = available_users(session, statement, window)
 
     req_pools = []
     for req_item in req.requirements:
@@ -168,67 +209,7 @@ def preview_smart_team(
 
         req_pools.append({"dept_id": dept_id, "count": req_item.count, "pool": pool})
 
-    best_team = None
-    best_cost = float("inf")
-
-    iterations = 1000
-    OPTIMAL_COST_THRESHOLD = 0.6
-
-    for i in range(iterations):
-        if best_team and best_cost <= OPTIMAL_COST_THRESHOLD:
-            break
-
-        current_team = []
-        possible = True
-
-        # Biased Sampling (Elite Retention / Mutation)
-        if best_team and random.random() < 0.7:
-            current_team = list(best_team)
-            idx_to_change = random.randint(0, len(current_team) - 1)
-            role_needed = current_team[idx_to_change]["role"]
-            target_pool = next(
-                (p for p in req_pools if p["dept_id"] == role_needed), None
-            )
-
-            if target_pool:
-                current_ids = {m["user"].id for m in current_team}
-                available = [u for u in target_pool["pool"] if u.id not in current_ids]
-                if available:
-                    new_user = random.choice(available)
-                    current_team[idx_to_change] = {
-                        "user": new_user,
-                        "role": role_needed,
-                    }
-                else:
-                    current_team = []
-            else:
-                current_team = []
-
-        # Random Restart
-        if not current_team:
-            used_ids = set()
-            for item in req_pools:
-                pool = item["pool"]
-                count = item["count"]
-
-                available = [u for u in pool if u.id not in used_ids]
-
-                if len(available) < count:
-                    possible = False
-                    break
-
-                picked = random.sample(available, count)
-                for p in picked:
-                    current_team.append({"user": p, "role": item["dept_id"]})
-                    used_ids.add(p.id)
-
-        if possible and current_team:
-            team_users = [t["user"] for t in current_team]
-            cost = calculate_team_cost(team_users)
-
-            if cost < best_cost:
-                best_cost = cost
-                best_team = current_team
+    best_team, best_cost = optimize_team(req_pools)
 
     selected_team = best_team if best_team else []
 
@@ -261,7 +242,7 @@ def preview_smart_team(
                     "A": u.ocean_agreeableness,
                     "N": u.ocean_neuroticism,
                 },
-                "is_available": u.is_available,
+                "is_available": True if window else u.is_available,
             }
         )
 
@@ -272,6 +253,183 @@ def preview_smart_team(
     }
 
 
+def _dept_match_scores(user: User, depts: list) -> dict:
+    """calculate_match_score against each department the user may fill."""
+    try:
+        skills = json.loads(user.skills) if isinstance(user.skills, str) else (user.skills or [])
+    except ValueError:
+        return {}
+    # "Dept: <name>" tags count as the department's own skill
+    skills = [
+        {"name": s["name"].removeprefix("Dept: "), "level": s.get("level", 1)}
+        for s in skills
+        if s.get("name")
+    ]
+    ocean = {
+        "ocean_openness": user.ocean_openness,
+        "ocean_conscientiousness": user.ocean_conscientiousness,
+        "ocean_extraversion": user.ocean_extraversion,
+        "ocean_agreeableness": user.ocean_agreeableness,
+        "ocean_neuroticism": user.ocean_neuroticism,
+    }
+    scores = {}
+    for dept in depts:
+        if user_matches_dept(user, dept["name"], set(dept["skills"])):
+            result = calculate_match_score(skills, ocean, dept["quest"])
+            scores[dept["id"]] = result["total_score"]
+    return scores
+
+
+@router.post("/teams/plan")
+def plan_smart_teams(req: TeamPlanRequest, session: Session = Depends(get_session)):
+    """
+    Staff several draft quests together instead of one /teams/preview at a
+    time: users are assigned across all quests by min-cost flow over
+    calculate_match_score, then swapped between quests for harmony.
+    """
+    try:
+        window = parse_window(req.start_date, req.deadline)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ช่วงวันที่ไม่ถูกต้อง")
+
+    quests, depts = [], {}
+    for q in req.quests:
+        slots = {}
+        for r in q.requirements:
+            dept = get_dept_info(r.department_id)
+            if not dept:
+                raise HTTPException(status_code=400, detail=f"Unknown department: {r.department_id}")
+            slots[dept["id"]] = slots.get(dept["id"], 0) + max(0, r.count)
+            depts[dept["id"]] = {
+                **dept,
+                "quest": {
+                    "required_skills": [{"name": n, "level": 1} for n in [dept["name"], *dept["skills"]]],
+                    "ocean_preference": "{}",
+                },
+            }
+        quests.append({"key": q.key, "slots": slots})
+
+    statement = select(User)
+    if req.candidate_ids:
+        statement = statement.where(User.id.in_(req.candidate_ids))
+    users_by_id = {u.id: u for u in available_users(session, statement, window)}
+    scores = {}
+    for u in users_by_id.values():
+        by_dept = _dept_match_scores(u, list(depts.values()))
+        if by_dept:
+            scores[u.id] = by_dept
+
+    plans = plan_teams(quests, users_by_id, scores)
+
+    result = []
+    for plan in plans:
+        team = [u for u, _ in plan["members"]]
+        harmony = evaluate_team(team)
+        if harmony["cost"] == float("inf"):
+            harmony["cost"] = None  # not valid JSON
+        result.append(
+            {
+                "key": plan["key"],
+                "members": [
+                    {
+                        "id": u.id,
+                        "name": u.name,
+                        "character_class": u.character_class,
+                        "level": u.level,
+                        "dept_id": d,
+                        "dept_name": depts[d]["name"],
+                        "match_score": scores[u.id][d],
+                    }
+                    for u, d in plan["members"]
+                ],
+                **harmony,
+                "unfilled": plan["unfilled"],
+            }
+        )
+
+    return {
+        "quests": result,
+        "total_match_score": sum(m["match_score"] for q in result for m in q["members"]),
+        "candidates_considered": len(users_by_id),
+    }
+
+
+@router.websocket("/teams/draft/ws")
+async def team_draft_ws(
+    websocket: WebSocket, token: str = "", session: Session = Depends(get_session)
+):
+    """
+    Live team builder. Browsers can't set headers on a WebSocket, so the
+    access token comes as ?token=. Send {"op": "init", "requirements",
+    "candidate_ids", "member_ids"} first (candidates are loaded in one
+    query), then {"op": "add" | "remove", "user_id"}. Every message is
+    answered with the team's cost, score, rating and coverage.
+    """
+    if decode_token(token) is None:
+        await websocket.close(code=1008)
+        return
+    await websocket.accept()
+
+    draft = TeamDraft([], user_matches_dept)
+    users = {}
+
+    def load(ids):
+        missing = [uid for uid in ids if uid not in users]
+        if missing:
+            for u in session.exec(select(User).where(User.id.in_(missing))).all():
+                users[u.id] = u
+            # Don't hold a pooled connection between messages
+            session.close()
+
+    try:
+        while True:
+            try:
+                msg = TeamDraftMessage.model_validate(await websocket.receive_json())
+            except (ValidationError, ValueError) as e:
+                await websocket.send_json({"error": str(e)})
+                continue
+
+            started = time.perf_counter()
+            if msg.op == "init":
+                requirements = []
+                for r in msg.requirements:
+                    dept = get_dept_info(r.department_id)
+                    if dept:
+                        requirements.append(
+                            {
+                                "dept_id": dept["id"],
+                                "name": dept["name"],
+                                "skills": set(dept["skills"]),
+                                "count": r.count,
+                            }
+                        )
+                load(msg.candidate_ids + msg.member_ids)
+                draft = TeamDraft(requirements, user_matches_dept)
+                ids = msg.member_ids
+            else:
+                if not msg.user_id:
+                    await websocket.send_json({"error": "user_id is required"})
+                    continue
+                ids = [msg.user_id]
+                if msg.op == "add":
+                    load(ids)
+
+            for uid in ids:
+                if msg.op == "remove":
+                    draft.remove(uid)
+                elif uid in users:
+                    draft.add(users[uid])
+                else:
+                    await websocket.send_json({"error": f"User not found: {uid}"})
+
+            result = draft.snapshot()
+            result["op"] = msg.op
+            result["compute_ms"] = round((time.perf_counter() - started) * 1000, 3)
+            await websocket.send_json(result)
+    except WebSocketDisconnect:
+        pass
+
+
 @router.post("/teams/confirm")
 def confirm_smart_team(
     req: ConfirmSmartTeamRequest,
@@ -308,8 +466,8 @@ def confirm_smart_team(
         ocean_preference=json.dumps({"msg": "Optimized by Golden Formula"}),
         team_size=len(req.member_ids),
         leader_id=req.leader_id,
-        start_date=req.start_date,
-        deadline=req.deadline,
+        start_date=to_utc_naive(req.start_date),
+        deadline=to_utc_naive(req.deadline),
         status="filled",  # Immediately filled
         accepted_members=json.dumps(req.member_ids),
     )
@@ -318,15 +476,29 @@ def confirm_smart_team(
     session.commit()
     session.refresh(quest)
 
-    # 2. Update Users (Lock them)
+    # 2. Update Users (Lock them until the deadline; the scheduler releases them)
+    end_date = to_utc_naive(req.deadline)
+    locked_ids = []
     for uid in req.member_ids:
         u = session.get(User, uid)
         if u:
+            # Planned after a current quest: stay locked until the later one ends
+            if not u.is_available and u.active_project_end_date:
+                u.active_project_end_date = max(u.active_project_end_date, end_date)
+            else:
+                u.active_project_end_date = end_date
             u.is_available = False
             session.add(u)
+            locked_ids.append(uid)
 
     session.commit()
 
+    for uid in locked_ids:
+        schedule_release(uid, end_date)
+    schedule_deadline(quest.id, req.deadline)
+    availability_index.invalidate()
+    publish_quest_event(quest, "team_assigned", title=quest.title)
+
     return {"message": "Quest created and team assigned.", "quest_id": quest.id}
 
 
@@ -334,3 +506,19 @@ def confirm_smart_team(
 async def analyze_team(req: AnalyzeTeamRequest):
     analysis_text = await generate_team_overview(req.dict())
     return {"analysis": analysis_text}
+
+
+@router.post("/teams/analyze/stream")
+async def analyze_team_stream(req: AnalyzeTeamRequest):
+    """Same as /teams/analyze but streams tokens over SSE."""
+
+    async def event_stream():
+        async for event, data in stream_team_overview(req.dict()):
+            if event == "done":
+                yield format_sse({"analysis": data}, event="done")
+            else:
+                yield format_sse(data, event=event)
+
+    return StreamingResponse(
+        event_stream(), media_type="text/event-stream", headers=SSE_HEADERS
+    )
@@ -1,8 +1,11 @@
 import json
+import os
 from datetime import datetime
 from typing import List, Optional, Union
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from sqlmodel import Session, func, select
 
 from core.auth import (
@@ -12,132 +15,255 @@ from core.auth import (
     verify_token,
 )
 from core.database import get_session
-from models import User
+from core.etag import etag_matches, make_etag, not_modified, table_versions
+from core.fieldsets import load_only_columns, parse_fields
+from models import Quest, User
 from schemas import (
     OceanSubmission,
     UpdateSkillsRequest,
+    UserBatchRequest,
+    UserBatchResponse,
     UserCandidate,
     UserListResponse,
     UserProfile,
     UserPublic,
 )
-from services.ai import analyze_user_profile
+from services.ai import LLM_CACHE, analyze_user_profile
+from services.availability import available_users, parse_window
+from services.response_cache import response_cache
+from services.analysis_queue import (
+    STATUS_PENDING,
+    STATUS_PROCESSING,
+    STATUS_READY,
+    analysis_in_progress,
+    analysis_queue,
+    enqueue_analysis,
+)
 
 router = APIRouter()
 
+# Max ids per POST /users/batch
+USER_BATCH_MAX = int(os.getenv("USER_BATCH_MAX", 100))
 
-def check_and_release_users(session: Session):
-    busy_users = session.exec(
-        select(User).where(
-            User.is_available == False, User.active_project_end_date != None
-        )
-    ).all()
-    now = datetime.now()
-    released_count = 0
-    for user in busy_users:
-        if user.active_project_end_date and now > user.active_project_end_date:
-            user.is_available = True
-            user.active_project_end_date = None
-            session.add(user)
-            released_count += 1
-
-    if released_count > 0:
-        session.commit()
-        print(f"Auto-released {released_count} heroes from duty.")
-
-
-def _format_user_safe(u: User, requester_role: str, requester_id: str):
-    """Sanitize user data based on role (Admin/Owner vs Public)."""
+
+OCEAN_FIELDS = (
+    "ocean_openness",
+    "ocean_conscientiousness",
+    "ocean_extraversion",
+    "ocean_agreeableness",
+    "ocean_neuroticism",
+)
+
+
+def _parse_skills(skills):
+    return (
+        json.loads(skills)
+        if skills and isinstance(skills, str)
+        else (skills if skills else [])
+    )
+
+
+def _format_user_safe(u: User, requester_role: str, requester_id: str, fields: set = None):
+    """Sanitize user data based on role (Admin/Owner vs Public).
+
+    With `fields` (see core.fieldsets), only those keys are built, so columns
+    left out of the query are never touched (no lazy loads, no JSON parsing).
+    """
     is_admin = requester_role == "admin"
     is_owner = u.id == requester_id
 
-    # Base public data
-    skills = (
-        json.loads(u.skills)
-        if u.skills and isinstance(u.skills, str)
-        else (u.skills if u.skills else [])
-    )
+    def wanted(name):
+        return fields is None or name in fields
 
-    data = {
-        "id": u.id,
-        "name": u.name,
-        "character_class": u.character_class,
-        "level": u.level,
-        "skills": skills,
-        "is_available": u.is_available,
-        "role": u.role,
-    }
+    # Base public data
+    data = {}
+    for name in ("id", "name", "character_class", "level"):
+        if wanted(name):
+            data[name] = getattr(u, name)
+    if wanted("skills"):
+        data["skills"] = _parse_skills(u.skills)
+    for name in ("is_available", "role"):
+        if wanted(name):
+            data[name] = getattr(u, name)
 
     if is_admin or is_owner:
-        data["email"] = u.email
-        data["active_project_end_date"] = u.active_project_end_date
+        if wanted("email"):
+            data["email"] = u.email
+        if wanted("active_project_end_date"):
+            data["active_project_end_date"] = u.active_project_end_date
     else:
-        data["email"] = "HIDDEN"
-        data["active_project_end_date"] = None
+        if wanted("email"):
+            data["email"] = "HIDDEN"
+        if wanted("active_project_end_date"):
+            data["active_project_end_date"] = None
 
     # Expose OCEAN scores for everyone
-    data["ocean_openness"] = u.ocean_openness or 0
-    data["ocean_conscientiousness"] = u.ocean_conscientiousness or 0
-    data["ocean_extraversion"] = u.ocean_extraversion or 0
-    data["ocean_agreeableness"] = u.ocean_agreeableness or 0
-    data["ocean_neuroticism"] = u.ocean_neuroticism or 0
+    for name in OCEAN_FIELDS:
+        if wanted(name):
+            data[name] = getattr(u, name) or 0
 
     return data
 
 
+def _user_page(session: Session, offset: int, limit: int, selected: set = None) -> dict:
+    """Raw column values of one page; _format_user_safe runs per requester."""
+    total = session.exec(select(func.count(User.id))).one()
+
+    # Only what _format_user_safe can return; no hashes or analysis in the cache
+    columns = selected or UserPublic.model_fields
+    statement = (
+        select(User)
+        .order_by(User.id.desc())
+        .offset(offset)
+        .limit(limit)
+        .options(load_only_columns(User, columns))
+    )
+    rows = [
+        {name: getattr(u, name) for name in columns}
+        for u in session.exec(statement).all()
+    ]
+    return {"total": total, "rows": rows}
+
+
 @router.get("/users", response_model=UserListResponse)
 def get_users(
     offset: int = 0,
     limit: int = 12,
+    fields: Optional[str] = None,
     session: Session = Depends(get_session),
     current_user: Optional[User] = Depends(get_optional_user),
 ):
-    """Get all users (Paginated)."""
-    total = session.exec(select(func.count(User.id))).one()
-
-    users = session.exec(
-        select(User).order_by(User.id.desc()).offset(offset).limit(limit)
-    ).all()
+    """Get all users (Paginated). `fields=id,name` returns only those keys."""
+    try:
+        selected = parse_fields(fields, UserPublic.model_fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    page = response_cache.get_or_compute(
+        "users",
+        [offset, limit, sorted(selected or [])],
+        ["users"],
+        lambda s: _user_page(s, offset, limit, selected),
+        session,
+    )
 
     requester_role = current_user.role if current_user else "guest"
     requester_id = current_user.id if current_user else ""
 
-    results = [_format_user_safe(u, requester_role, requester_id) for u in users]
+    # Cached rows are unfiltered; each requester gets their own view
+    results = [
+        _format_user_safe(User(**row), requester_role, requester_id, selected)
+        for row in page["rows"]
+    ]
 
-    return {"users": results, "total": total}
+    if selected:
+        # Partial objects don't fit UserListResponse; skip its validation
+        return JSONResponse(jsonable_encoder({"users": results, "total": page["total"]}))
+    return {"users": results, "total": page["total"]}
+
+
+def _roster(session: Session, window=None, selected: set = None) -> list:
+    statement = select(User).order_by(User.id)
+    if selected:
+        statement = statement.options(load_only_columns(User, selected))
+    users = available_users(session, statement, window)
+
+    results = []
+    for u in users:
+        row = {}
+        for name in selected or UserCandidate.model_fields:
+            if name == "skills":
+                row[name] = _parse_skills(u.skills)
+            elif name == "is_available":
+                row[name] = True if window else u.is_available
+            else:
+                row[name] = getattr(u, name)
+        results.append(row)
+    return results
 
 
 @router.get("/users/roster", response_model=List[UserCandidate])
 def get_user_roster(
+    request: Request,
+    response: Response,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    fields: Optional[str] = None,
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_user),
 ):
-    """Get user roster for team building (Public Safe Data)."""
-    check_and_release_users(session)
-    users = session.exec(
-        select(User).where(User.is_available == True).order_by(User.id)
-    ).all()
-
-    results = []
-    for u in users:
-        skills_parsed = (
-            json.loads(u.skills)
-            if u.skills and isinstance(u.skills, str)
-            else (u.skills if u.skills else [])
+    """Get user roster for team building (Public Safe Data).
+
+    With `start`/`end`, lists users free for that whole window instead of now.
+    `fields=id,name,character_class` returns only those keys.
+    Sends an ETag unless the window is relative to now (no `start`).
+    """
+    try:
+        window = parse_window(start, end)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ช่วงวันที่ไม่ถูกต้อง")
+    try:
+        selected = parse_fields(fields, UserCandidate.model_fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    etag = None
+    if window is None or start is not None:
+        # Busy windows come from quests, so they only matter with a window
+        tables = (User, Quest) if window else (User,)
+        etag = make_etag(
+            "roster", window, sorted(selected or []), table_versions(session, *tables)
         )
-        results.append(
-            {
-                "id": u.id,
-                "name": u.name,
-                "character_class": u.character_class,
-                "level": u.level,
-                "is_available": u.is_available,
-                "skills": skills_parsed,
-            }
+        if etag_matches(request, etag):
+            return not_modified(etag)
+
+    if etag:
+        results = response_cache.get_or_compute(
+            "roster",
+            [window, sorted(selected or [])],
+            ["users", "quests"] if window else ["users"],
+            lambda s: _roster(s, window, selected),
+            session,
         )
+    else:
+        # Relative to now: neither tagged nor cached
+        results = _roster(session, window, selected)
+
+    headers = {"ETag": etag} if etag else {}
+    if selected:
+        return JSONResponse(jsonable_encoder(results), headers=headers)
+    response.headers.update(headers)
     return results
 
 
+@router.post("/users/batch", response_model=UserBatchResponse)
+def get_users_batch(
+    req: UserBatchRequest,
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+):
+    """Get several users by ID in one query (same Self or Admin rule as GET /users/{id})."""
+    ids = list(dict.fromkeys(req.ids))
+    if len(ids) > USER_BATCH_MAX:
+        raise HTTPException(
+            status_code=400, detail=f"At most {USER_BATCH_MAX} ids per batch"
+        )
+    if current_user.role != "admin" and any(uid != current_user.id for uid in ids):
+        raise HTTPException(status_code=403, detail="Permission denied")
+
+    users_by_id = {
+        u.id: u for u in session.exec(select(User).where(User.id.in_(ids))).all()
+    }
+    return {
+        "users": [
+            _format_user_safe(users_by_id[uid], current_user.role, current_user.id)
+            for uid in ids
+            if uid in users_by_id
+        ],
+        "missing": [uid for uid in ids if uid not in users_by_id],
+    }
+
+
 @router.get("/users/{user_id}", response_model=UserPublic)
 def get_user_by_id(
     user_id: str,
@@ -220,11 +346,13 @@ def submit_assessment(data: OceanSubmission, session: Session = Depends(get_sess
         ocean_agreeableness=data.agreeableness,
         ocean_neuroticism=data.neuroticism,
         analysis_result=None,
+        analysis_status=STATUS_PENDING,
     )
 
     session.add(new_hero)
     session.commit()
     session.refresh(new_hero)
+    enqueue_analysis(new_hero.id)
     token = create_access_token(new_hero.id)
 
     return {
@@ -240,6 +368,7 @@ def submit_assessment(data: OceanSubmission, session: Session = Depends(get_sess
             "Neuroticism": new_hero.ocean_neuroticism,
         },
         "access_token": token,
+        "analysis_status": new_hero.analysis_status,
     }
 
 
@@ -274,18 +403,53 @@ async def get_user_analysis(
     if user.analysis_result:
         try:
             ai_data = json.loads(user.analysis_result)
-            return {"user": user_data, "analysis": ai_data}
+            LLM_CACHE.inc(function="analyze_user_profile", result="hit")
+            return {
+                "user": user_data,
+                "analysis": ai_data,
+                "analysis_status": STATUS_READY,
+            }
         except:
             pass
 
+    # A live job owns it: don't make a second LLM call, let the client poll
+    if analysis_in_progress(user):
+        return {"user": user_data, "analysis": None, "analysis_status": STATUS_PROCESSING}
+
+    # Queued, or a dead job's stale mark: (re)queue it, the worker does the call
+    if analysis_queue.running and enqueue_analysis(user.id):
+        return {"user": user_data, "analysis": None, "analysis_status": STATUS_PENDING}
+
+    # Fallback: no background worker in this process
+    LLM_CACHE.inc(function="analyze_user_profile", result="miss")
     print(f"Summoning AI for {user.name}...")
     ai_data = await analyze_user_profile(user)
 
     user.analysis_result = json.dumps(ai_data, ensure_ascii=False)
+    user.analysis_status = STATUS_READY
+    user.analysis_started_at = None
     session.add(user)
     session.commit()
 
-    return {"user": user_data, "analysis": ai_data}
+    return {"user": user_data, "analysis": ai_data, "analysis_status": STATUS_READY}
+
+
+@router.get("/users/{user_id}/analysis/status")
+def get_user_analysis_status(
+    user_id: str,
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+):
+    """Check whether the background AI analysis is ready (Self or Admin only)"""
+    if current_user.id != user_id and current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Permission denied")
+
+    user = session.get(User, user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="Hero not found")
+
+    status = STATUS_READY if user.analysis_result else user.analysis_status
+    return {"user_id": user_id, "analysis_status": status}
 
 
 @router.post("/users/me/assessment", response_model=UserProfile)
@@ -311,10 +475,12 @@ def submit_my_assessment(
     current_user.ocean_neuroticism = data.neuroticism
     current_user.character_class = best_class
     current_user.analysis_result = None  # Clear old analysis
+    current_user.analysis_status = STATUS_PENDING
 
     session.add(current_user)
     session.commit()
     session.refresh(current_user)
+    enqueue_analysis(current_user.id)
 
     return {
         "id": current_user.id,
@@ -329,4 +495,5 @@ def submit_my_assessment(
             "Neuroticism": current_user.ocean_neuroticism,
         },
         "access_token": "",  # No new token needed
+        "analysis_status": current_user.analysis_status,
     }
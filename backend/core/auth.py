@@ -4,6 +4,7 @@ from jose import JWTError, jwt  # type: ignore
 from fastapi import HTTPException, Security
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from passlib.context import CryptContext
+from typing import Optional
 
 import os
 from dotenv import load_dotenv
@@ -35,6 +36,15 @@ def create_access_token(user_id: str):
     return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
 
 
+def decode_token(token: str) -> Optional[str]:
+    """User id from a token, or None if it is invalid or expired (WebSockets)."""
+    try:
+        user_id = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM]).get("sub")
+    except JWTError:
+        return None
+    return str(user_id) if user_id is not None else None
+
+
 def verify_token(credentials: HTTPAuthorizationCredentials = Security(security)):
     token = credentials.credentials
     try:
@@ -0,0 +1,59 @@
+# circuit_breaker.py
+import time
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a provider that is known to be failing."""
+
+
+class CircuitBreaker:
+    """
+    closed    -> calls go through; consecutive failures are counted
+    open      -> calls are rejected until `reset_timeout` has passed
+    half_open -> one trial call; success closes, failure re-opens
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self.trial_in_flight:
+            self.trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        self.trial_in_flight = False
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            if self.opened_at is None:
+                print(f"Circuit '{self.name}' opened after {self.failures} failures.")
+            self.opened_at = time.monotonic()
+
+    def release(self):
+        """Caller went away mid-call: no verdict on the provider."""
+        self.trial_in_flight = False
+
+    def reset(self):
+        self.record_success()
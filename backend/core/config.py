@@ -1,5 +1,4 @@
 import os
-from langchain_google_genai import ChatGoogleGenerativeAI
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -10,6 +9,12 @@ _llm_instance = None
 def get_llm():
     global _llm_instance
     if _llm_instance is None:
+        if os.getenv("LLM_PROVIDER", "gemini") == "fake":
+            from core.fake_llm import FakeLLM
+
+            _llm_instance = FakeLLM()
+            return _llm_instance
+
         if not os.getenv("GOOGLE_API_KEY"):
             print("GOOGLE_API_KEY not found in .env")
             # Return a dummy or raise error depending on needs.
@@ -20,6 +25,10 @@ def get_llm():
         # Only initialize if we have a key or we want to let it fail at runtime, not import time.
         # However, ChatGoogleGenerativeAI might validate immediately.
         # Let's try to initialize it.
+        # Imported here: langchain_google_genai is slow to import and only
+        # needed once an AI endpoint is actually hit.
+        from langchain_google_genai import ChatGoogleGenerativeAI
+
         try:
             _llm_instance = ChatGoogleGenerativeAI(
                 model="gemini-2.5-flash", temperature=0.5
@@ -0,0 +1,40 @@
+import hashlib
+
+from fastapi import Request, Response
+from sqlmodel import Session, select
+
+from models import CHANGE_ENTITIES, TableVersion
+
+
+def table_versions(session: Session, *models) -> tuple:
+    """
+    Write counters of the given tables (see models.TableVersion), in one
+    primary-key lookup. Every ORM or bulk write to the table bumps its
+    counter, so any write changes the result.
+    """
+    names = [CHANGE_ENTITIES[model] for model in models]
+    rows = dict(
+        session.exec(select(TableVersion.name, TableVersion.version).where(TableVersion.name.in_(names))).all()
+    )
+    return tuple(rows.get(name, 0) for name in names)
+
+
+def make_etag(*parts) -> str:
+    """Weak ETag from version counters; the body is never serialized for it."""
+    digest = hashlib.sha1(repr(parts).encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """If-None-Match uses weak comparison: W/ prefixes are ignored."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    strip = lambda tag: tag.strip().removeprefix("W/")
+    return strip(etag) in {strip(tag) for tag in header.split(",")}
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
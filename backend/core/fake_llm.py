@@ -0,0 +1,68 @@
+# fake_llm.py
+import asyncio
+from typing import Any, List, Optional
+
+from langchain_core.language_models.fake_chat_models import (
+    FakeListChatModel,
+    FakeListChatModelError,
+)
+from langchain_core.messages import AIMessageChunk
+from langchain_core.outputs import ChatGenerationChunk
+
+
+def _usage(messages, output: str) -> dict:
+    # Whitespace "tokens" -- enough to exercise token accounting offline
+    prompt_tokens = sum(len(str(m.content).split()) for m in messages)
+    output_tokens = len(output.split())
+    return {
+        "input_tokens": prompt_tokens,
+        "output_tokens": output_tokens,
+        "total_tokens": prompt_tokens + output_tokens,
+    }
+
+
+class FakeLLM(FakeListChatModel):
+    """
+    Offline stand-in for Gemini (set LLM_PROVIDER=fake).
+    Cycles through `responses`; `latency` delays each call and `fail`
+    raises, so timeouts and the circuit breaker can be exercised in tests.
+    With no responses every call fails -> the local fallback is used.
+    Reports approximate usage_metadata like the real provider does.
+    """
+
+    responses: List[str] = []
+    latency: float = 0.0
+    fail: bool = False
+    calls: int = 0
+
+    def _check(self):
+        self.calls += 1
+        if self.fail or not self.responses:
+            raise FakeListChatModelError("Fake LLM failure")
+
+    def _call(self, *args: Any, **kwargs: Any) -> str:
+        self._check()
+        return super()._call(*args, **kwargs)
+
+    def _generate(self, messages, stop: Optional[List[str]] = None, run_manager=None, **kwargs):
+        result = super()._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+        message = result.generations[0].message
+        message.usage_metadata = _usage(messages, message.content)
+        return result
+
+    async def _agenerate(self, messages, stop: Optional[List[str]] = None, run_manager=None, **kwargs):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._generate(messages, stop=stop, **kwargs)
+
+    async def _astream(self, messages, stop: Optional[List[str]] = None, run_manager=None, **kwargs):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        self._check()
+        output = ""
+        async for chunk in super()._astream(messages, stop=stop, run_manager=run_manager, **kwargs):
+            output += chunk.message.content
+            yield chunk
+        yield ChatGenerationChunk(
+            message=AIMessageChunk(content="", usage_metadata=_usage(messages, output))
+        )
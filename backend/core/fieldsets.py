@@ -0,0 +1,22 @@
+from typing import Optional
+
+from sqlalchemy.orm import load_only
+
+
+def parse_fields(fields: Optional[str], allowed) -> Optional[set]:
+    """
+    `fields=id,name` -> {"id", "name"}. None means "everything" (no fields=).
+    `id` is always included. Raises ValueError for unknown names.
+    """
+    if not fields:
+        return None
+    requested = {f.strip() for f in fields.split(",") if f.strip()}
+    unknown = requested - set(allowed)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return requested | {"id"}
+
+
+def load_only_columns(model, columns):
+    """load_only() option for the given column names of `model`."""
+    return load_only(*(getattr(model, c) for c in sorted(columns)))
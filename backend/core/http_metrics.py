@@ -0,0 +1,84 @@
+# http_metrics.py
+# ASGI middleware recording per-route request metrics (served at /metrics).
+# Pure ASGI rather than BaseHTTPMiddleware so SSE/streaming bodies pass
+# through untouched and are timed until the last chunk.
+import time
+
+from core import metrics, query_stats
+
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+
+REQUEST_DURATION = metrics.histogram(
+    "kemii_http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    ["method", "route", "status"],
+)
+REQUESTS_IN_FLIGHT = metrics.gauge(
+    "kemii_http_requests_in_flight",
+    "HTTP requests currently being served.",
+)
+RESPONSE_SIZE = metrics.histogram(
+    "kemii_http_response_size_bytes",
+    "Response body size by route template.",
+    ["method", "route"],
+    buckets=SIZE_BUCKETS,
+)
+REQUEST_QUERIES = metrics.histogram(
+    "kemii_http_db_queries_per_request",
+    "SQL statements executed while serving one request.",
+    ["method", "route"],
+    buckets=QUERY_BUCKETS,
+)
+REQUEST_DB_TIME = metrics.histogram(
+    "kemii_http_db_time_seconds",
+    "Total time spent in SQL while serving one request.",
+    ["method", "route"],
+)
+
+
+def route_template(scope) -> str:
+    """'/quests/{quest_id}' instead of raw paths, to keep label cardinality bounded."""
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = query_stats.QueryStats()
+        token = query_stats.bind(stats)
+        response = {"status": 500, "size": 0}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+            elif message["type"] == "http.response.body":
+                response["size"] += len(message.get("body", b""))
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            REQUESTS_IN_FLIGHT.dec()
+            query_stats.unbind(token)
+
+            method = scope["method"]
+            route = route_template(scope)
+            REQUEST_DURATION.observe(
+                elapsed, method=method, route=route, status=response["status"]
+            )
+            RESPONSE_SIZE.observe(response["size"], method=method, route=route)
+            REQUEST_QUERIES.observe(stats.count, method=method, route=route)
+            REQUEST_DB_TIME.observe(stats.seconds, method=method, route=route)
+            if query_stats.DEV_MODE:
+                query_stats.warn_repeated_queries(f"{method} {route}", stats)
@@ -0,0 +1,111 @@
+# query_stats.py
+# Counts SQL statements (and the time spent in them): per HTTP request via a
+# bound ContextVar (core/http_metrics.py), or per block via count_queries()
+# for query budgets in tests.
+import os
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# APP_ENV=development: warn when one request repeats a query shape this often
+DEV_MODE = os.getenv("APP_ENV", "production") == "development"
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", 5))
+
+_IN_LIST = re.compile(r"\(\s*(?:\?|%s|:\w+)(?:\s*,\s*(?:\?|%s|:\w+))+\s*\)")
+_NUMBER = re.compile(r"\b\d+\b")
+_SPACE = re.compile(r"\s+")
+
+
+class QueryStats:
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.statements = []
+
+    def record(self, statement: str, seconds: float):
+        self.count += 1
+        self.seconds += seconds
+        self.statements.append(statement)
+
+    def repeated_shapes(self, threshold: int = N_PLUS_ONE_THRESHOLD) -> list:
+        """[(shape, times)] for shapes run at least `threshold` times."""
+        counts = Counter(statement_shape(s) for s in self.statements)
+        return [(shape, n) for shape, n in counts.most_common() if n >= threshold]
+
+
+def statement_shape(statement: str) -> str:
+    """Statement with IN-lists and literal numbers collapsed, for N+1 grouping."""
+    shape = _IN_LIST.sub("(?)", statement)
+    shape = _NUMBER.sub("N", shape)
+    return _SPACE.sub(" ", shape).strip()
+
+
+_current = ContextVar("query_stats", default=None)
+
+
+def bind(stats: QueryStats):
+    """Make `stats` receive this context's queries; returns a reset token."""
+    return _current.set(stats)
+
+
+def unbind(token):
+    _current.reset(token)
+
+
+def current() -> QueryStats:
+    return _current.get()
+
+
+# Registered on the Engine class so test engines are counted too.
+# Sync endpoints run in a copied context, so they see the same QueryStats.
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_start"].pop()
+    stats = _current.get()
+    if stats is not None:
+        stats.record(statement, time.perf_counter() - started)
+
+
+@contextmanager
+def count_queries(engine=None):
+    """
+    Count every statement run through `engine` (default: the app engine)
+    on any thread while the block runs:
+
+        with count_queries() as stats:
+            client.get("/quests")
+        assert stats.count <= 3
+    """
+    if engine is None:
+        from core.database import engine
+
+    stats = QueryStats()
+
+    def before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("budget_start", []).append(time.perf_counter())
+
+    def after(conn, cursor, statement, parameters, context, executemany):
+        stats.record(statement, time.perf_counter() - conn.info["budget_start"].pop())
+
+    event.listen(engine, "before_cursor_execute", before)
+    event.listen(engine, "after_cursor_execute", after)
+    try:
+        yield stats
+    finally:
+        event.remove(engine, "before_cursor_execute", before)
+        event.remove(engine, "after_cursor_execute", after)
+
+
+def warn_repeated_queries(label: str, stats: QueryStats):
+    for shape, times in stats.repeated_shapes():
+        print(f"Possible N+1 in {label}: {times}x {shape[:200]}")
@@ -0,0 +1,18 @@
+# sse.py
+import json
+
+
+def format_sse(data, event: str = None) -> str:
+    """Encode one Server-Sent Events frame (data is JSON-encoded)."""
+    payload = json.dumps(data, ensure_ascii=False, default=str)
+    lines = []
+    if event:
+        lines.append(f"event: {event}")
+    lines.append(f"data: {payload}")
+    return "\n".join(lines) + "\n\n"
+
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",  # disable proxy buffering (nginx)
+}
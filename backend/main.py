@@ -2,7 +2,14 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from core.database import create_db_and_tables
-from api import users, quests, admin, team, auth
+from core.http_metrics import MetricsMiddleware
+from api import users, quests, admin, team, auth, metrics, changes, events
+from services.analysis_queue import analysis_queue
+from services.availability import register_release_job
+from services.change_log import register_compaction_job
+from services.events import event_hub
+from services.quest_sweeper import register_sweep_job
+from services.scheduler import scheduler
 from dotenv import load_dotenv
 import os
 
@@ -13,7 +20,15 @@ origins = [o.strip() for o in os.getenv("ORIGINS", "").split(",") if o.strip()]
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     create_db_and_tables()
+    analysis_queue.start()
+    register_release_job()
+    register_sweep_job()
+    register_compaction_job()
+    scheduler.start()
     yield
+    await scheduler.stop()
+    await analysis_queue.stop()
+    event_hub.stop()
     
 app = FastAPI(lifespan=lifespan)
 
@@ -24,6 +39,7 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware)
 
 @app.get("/")
 @app.head("/")
@@ -35,6 +51,9 @@ app.include_router(users.router)
 app.include_router(quests.router)
 app.include_router(team.router)
 app.include_router(admin.router)
+app.include_router(metrics.router)
+app.include_router(changes.router)
+app.include_router(events.router)
 
 if __name__ == "__main__":
     import uvicorn
@@ -1,7 +1,8 @@
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 from sqlmodel import SQLModel, Field, Relationship
-from sqlalchemy import JSON, Column, Text
+from sqlalchemy import JSON, Column, Text, event, insert, update
+from sqlalchemy.orm import Session as OrmSession
 from ulid import ULID
 
 class User(SQLModel, table=True):
@@ -24,9 +25,14 @@ class User(SQLModel, table=True):
     is_available: bool = Field(default=True)
     team_name: Optional[str] = Field(default=None)
     analysis_result: Optional[str] = Field(default=None)
+    analysis_status: str = Field(default="pending")
+    # When the worker marked it "processing"; an old mark means the job died
+    analysis_started_at: Optional[datetime] = Field(default=None)
     skills: Optional[str] = Field(default=None) 
     
-    active_project_end_date: Optional[datetime] = Field(default=None)
+    active_project_end_date: Optional[datetime] = Field(default=None, index=True)
+    # Bumped on every write (see _bump_versions); feeds the ETags
+    version: int = Field(default=1)
 
 class Quest(SQLModel, table=True):
     __table_args__ = {"extend_existing": True}
@@ -38,8 +44,99 @@ class Quest(SQLModel, table=True):
     ocean_preference: str = Field(default="{}")
     team_size: int = Field(default=1)
     leader_id: str = Field(foreign_key="user.id")
-    status: str = Field(default="open")
+    status: str = Field(default="open", index=True)
     accepted_members: str = Field(default="[]")
     start_date: Optional[datetime] = Field(default=None)
-    deadline: Optional[datetime] = Field(default=None)
-    created_at: datetime = Field(default_factory=datetime.utcnow)
\ No newline at end of file
+    deadline: Optional[datetime] = Field(default=None, index=True)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    version: int = Field(default=1)
+
+
+class ChangeLog(SQLModel, table=True):
+    """Append-only feed behind GET /changes; id is the client's cursor."""
+    __tablename__ = "change_log"
+    __table_args__ = {"extend_existing": True}
+    id: Optional[int] = Field(default=None, primary_key=True)
+    entity: str  # "user" | "quest"
+    entity_id: str = Field(index=True)
+    op: str = Field(default="upsert")  # "upsert" | "delete"
+    changed_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class TableVersion(SQLModel, table=True):
+    """Write counter per table; list ETags read it instead of scanning the table."""
+    __tablename__ = "table_version"
+    __table_args__ = {"extend_existing": True}
+    name: str = Field(primary_key=True)  # "user" | "quest"
+    version: int = Field(default=0)
+
+
+CHANGE_ENTITIES = {User: "user", Quest: "quest"}
+
+
+def bump_table_versions(session, names):
+    """version = version + 1 for each table in `names`, in the caller's transaction."""
+    connection = session.connection()
+    table = TableVersion.__table__
+    for name in sorted(names):
+        result = connection.execute(
+            update(table).where(table.c.name == name).values(version=table.c.version + 1)
+        )
+        if not result.rowcount:
+            connection.execute(insert(table).values(name=name, version=1))
+
+
+@event.listens_for(OrmSession, "before_flush")
+def _bump_versions(session, flush_context, instances):
+    """
+    Every ORM update of a User or Quest bumps its version in SQL
+    (version = version + 1), so concurrent writers never reuse a number.
+    Bulk UPDATE statements must bump it themselves.
+    """
+    for obj in session.dirty:
+        if isinstance(obj, (User, Quest)) and session.is_modified(obj):
+            obj.version = type(obj).version + 1
+
+
+@event.listens_for(OrmSession, "before_flush")
+def _log_changes(session, flush_context, instances):
+    """
+    ORM writes of a User or Quest append to the change log in the same
+    transaction. Bulk statements call services.change_log.record_changes.
+    """
+    entries = []
+    for obj in session.new:
+        if type(obj) in CHANGE_ENTITIES:
+            entries.append((obj, "upsert"))
+    for obj in session.dirty:
+        if type(obj) in CHANGE_ENTITIES and session.is_modified(obj):
+            entries.append((obj, "upsert"))
+    for obj in session.deleted:
+        if type(obj) in CHANGE_ENTITIES:
+            entries.append((obj, "delete"))
+    for obj, op in entries:
+        session.add(ChangeLog(entity=CHANGE_ENTITIES[type(obj)], entity_id=obj.id, op=op))
+
+
+@event.listens_for(OrmSession, "before_flush")
+def _bump_table_versions(session, flush_context, instances):
+    """Any ORM insert, update or delete of a User or Quest bumps its table's counter."""
+    names = set()
+    for obj in (*session.new, *session.deleted):
+        if type(obj) in CHANGE_ENTITIES:
+            names.add(CHANGE_ENTITIES[type(obj)])
+    for obj in session.dirty:
+        if type(obj) in CHANGE_ENTITIES and session.is_modified(obj):
+            names.add(CHANGE_ENTITIES[type(obj)])
+    if names:
+        bump_table_versions(session, names)
+
+
+@event.listens_for(OrmSession, "do_orm_execute")
+def _bump_bulk_table_versions(orm_execute_state):
+    """Bulk insert/update/delete statements on User or Quest bump the counter too."""
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and mapper.class_ in CHANGE_ENTITIES:
+        bump_table_versions(orm_execute_state.session, [CHANGE_ENTITIES[mapper.class_]])
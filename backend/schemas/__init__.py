@@ -1,5 +1,6 @@
-from pydantic import BaseModel
-from typing import Optional, Dict, List, Any
+import json
+from pydantic import BaseModel, Field, field_validator
+from typing import Optional, Dict, List, Any, Literal
 from datetime import datetime
 
 class LoginRequest(BaseModel):
@@ -29,6 +30,7 @@ class UserProfile(BaseModel):
     ocean_scores: Dict[str, int]  
     
     access_token: Optional[str] = None
+    analysis_status: Optional[str] = None
 
 class SkillItem(BaseModel):
     name: str
@@ -63,6 +65,13 @@ class UserListResponse(BaseModel):
     users: List[UserPublic]
     total: int
 
+class UserBatchRequest(BaseModel):
+    ids: List[str] = Field(min_length=1)
+
+class UserBatchResponse(BaseModel):
+    users: List[UserPublic]
+    missing: List[str] = []
+
 class AuthResponse(BaseModel):
     access_token: str
     token_type: str = "bearer"
@@ -74,6 +83,38 @@ class UserNameUpdate(BaseModel):
 class RoleUpdate(BaseModel):
     role: str
 
+class UserImportRecord(BaseModel):
+    """One row of a bulk user import (NDJSON object or CSV row)."""
+    name: str = Field(min_length=1)
+    email: Optional[str] = None
+    password: Optional[str] = None
+    role: Literal["user", "admin"] = "user"
+    character_class: str = "Novice"
+    level: int = Field(default=1, ge=1)
+    ocean_openness: int = Field(default=0, ge=0, le=50)
+    ocean_conscientiousness: int = Field(default=0, ge=0, le=50)
+    ocean_extraversion: int = Field(default=0, ge=0, le=50)
+    ocean_agreeableness: int = Field(default=0, ge=0, le=50)
+    ocean_neuroticism: int = Field(default=0, ge=0, le=50)
+    skills: List[SkillItem] = []
+
+    @field_validator("skills", mode="before")
+    @classmethod
+    def parse_skills(cls, v):
+        # CSV cells: JSON list or "Skill:3;Other Skill:2"
+        if isinstance(v, str):
+            v = v.strip()
+            if not v:
+                return []
+            if v.startswith("["):
+                return json.loads(v)
+            items = []
+            for part in v.split(";"):
+                name, _, level = part.rpartition(":")
+                items.append({"name": name.strip(), "level": int(level)})
+            return items
+        return v or []
+
 class MatchRequest(BaseModel):
     user1_id: str
     user2_id: str
@@ -144,6 +185,7 @@ class QuestResponse(BaseModel):
     deadline: Optional[datetime] = None
     created_at: datetime
     harmony_score: Optional[int] = 0
+    analysis: Optional[Dict[str, Any]] = None  # only with ?include=analysis
 
 class QuestListResponse(BaseModel):
     quests: List[QuestResponse]
@@ -168,6 +210,9 @@ class SmartQuestRequirement(BaseModel):
 class PreviewSmartTeamRequest(BaseModel):
     requirements: List[SmartQuestRequirement]
     candidate_ids: List[str]
+    # Optional planning window: pick people free for the whole period
+    start_date: Optional[datetime] = None
+    deadline: Optional[datetime] = None
 
 class ConfirmSmartTeamRequest(BaseModel):
     title: str
@@ -179,6 +224,25 @@ class ConfirmSmartTeamRequest(BaseModel):
     member_ids: List[str]
     status: str
 
+class TeamPlanQuest(BaseModel):
+    key: str  # client's name for the draft quest, echoed back
+    requirements: List[SmartQuestRequirement]
+
+class TeamPlanRequest(BaseModel):
+    quests: List[TeamPlanQuest] = Field(min_length=1)
+    candidate_ids: List[str] = []
+    start_date: Optional[datetime] = None
+    deadline: Optional[datetime] = None
+
+class TeamDraftMessage(BaseModel):
+    # init: requirements + candidates to preload (+ starting members)
+    # add / remove: user_id
+    op: Literal["init", "add", "remove"]
+    user_id: Optional[str] = None
+    requirements: List[SmartQuestRequirement] = []
+    candidate_ids: List[str] = []
+    member_ids: List[str] = []
+
 class AnalyzeTeamRequest(BaseModel):
     score: int
     avg_o: float
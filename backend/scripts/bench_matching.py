@@ -0,0 +1,245 @@
+"""
+Micro-benchmarks for the matching kernels (services/matching.py) and the
+/teams/preview optimizer, compared against the stored baseline.
+
+Each timing round is bracketed by a fixed pure-Python calibration loop
+and divided by it, so a baseline recorded on one machine stays usable on
+another; a kernel's result is the median over the rounds. Kernels that
+look slower than baseline by more than --threshold are measured again
+(--rechecks times) and only fail if every run agrees. Exits 1 on such a
+slowdown, or when the optimizer finds worse teams for the same budget.
+
+Run: uv run python scripts/bench_matching.py                    # compare
+     uv run python scripts/bench_matching.py --update-baseline  # after intended changes
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import timeit
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import User
+from scripts.synth_data import generate_users
+from services.matching import (
+    calculate_academic_cost,
+    calculate_match_score,
+    calculate_team_cost,
+    evaluate_team,
+    get_stats,
+)
+from services.team_optimizer import optimize_team
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "matching.json")
+DEFAULT_THRESHOLD = 0.50  # allowed slowdown of a kernel (normalized); shared runners are noisy
+DEFAULT_QUALITY_THRESHOLD = 0.05  # allowed increase of the optimizer's mean best cost
+DEFAULT_REPEAT = 7  # timing rounds per kernel (median)
+DEFAULT_RECHECKS = 2  # extra measurements of a suspected regression
+CALIBRATION_LOOPS = 20  # calibration workload runs before and after each round
+
+TEAM_SIZES = [2, 5, 10, 50]
+SKILL_COUNTS = [3, 10]
+POOL_SIZES = [20, 100, 500]
+OPTIMIZER_ITERATIONS = 200
+QUALITY_BUDGETS = [10, 50, 100, 250, 500, 1000]
+QUALITY_SEEDS = range(5)
+QUALITY_POOL_SIZE = 100
+
+
+def make_users(n: int, seed: int = 0) -> list:
+    return [User(**row) for row in generate_users(n, {}, seed)]
+
+
+def make_pools(pool_size: int, seed: int = 0) -> list:
+    users = make_users(pool_size * 3, seed)
+    return [
+        {"dept_id": f"dept_{i}", "count": count, "pool": users[i * pool_size : (i + 1) * pool_size]}
+        for i, count in enumerate([2, 1, 1])
+    ]
+
+
+def _calibration_workload():
+    total = 0
+    for i in range(10_000):
+        total += (i % 7) * (i % 11)
+    return total
+
+
+def time_kernel(fn, repeat: int = DEFAULT_REPEAT) -> dict:
+    """
+    Median per-call time over `repeat` rounds of an auto-sized loop. Each
+    round is divided by the mean of the calibration runs just before and
+    after it, so machine drift during the run cancels out.
+    """
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    calibration = timeit.Timer(_calibration_workload)
+    seconds, normalized = [], []
+    for _ in range(repeat):
+        before = calibration.timeit(CALIBRATION_LOOPS)
+        per_call = timer.timeit(number) / number
+        after = calibration.timeit(CALIBRATION_LOOPS)
+        seconds.append(per_call)
+        normalized.append(per_call / ((before + after) / 2 / CALIBRATION_LOOPS))
+    return {
+        "us": round(statistics.median(seconds) * 1e6, 3),
+        "normalized": round(statistics.median(normalized), 6),
+    }
+
+
+def kernel_cases() -> dict:
+    cases = {}
+    for size in TEAM_SIZES:
+        team = make_users(size, seed=size)
+        stats = [get_stats(u) for u in team]
+        cases[f"calculate_team_cost[team={size}]"] = lambda t=team: calculate_team_cost(t)
+        cases[f"evaluate_team[team={size}]"] = lambda t=team: evaluate_team(t)
+        cases[f"calculate_academic_cost[team={size}]"] = lambda s=stats: calculate_academic_cost(s)
+
+    user = make_users(1)[0]
+    user_skills = json.loads(user.skills)
+    user_ocean = user.model_dump()
+    for count in SKILL_COUNTS:
+        quest = {
+            "required_skills": [{"name": f"Skill {i}", "level": 1 + i % 3} for i in range(count)],
+            "ocean_preference": "{}",
+        }
+        cases[f"calculate_match_score[skills={count}]"] = (
+            lambda q=quest: calculate_match_score(user_skills, user_ocean, q)
+        )
+
+    for pool_size in POOL_SIZES:
+        pools = make_pools(pool_size)
+        # Threshold below any real cost: always runs the full iteration budget
+        cases[f"optimize_team[pool={pool_size},iter={OPTIMIZER_ITERATIONS}]"] = (
+            lambda p=pools: optimize_team(
+                p, OPTIMIZER_ITERATIONS, cost_threshold=-1, rng=random.Random(0)
+            )
+        )
+    return cases
+
+
+def optimizer_quality(budgets=QUALITY_BUDGETS, seeds=QUALITY_SEEDS, pool_size=QUALITY_POOL_SIZE) -> list:
+    """Mean best cost found vs wall time per iteration budget (fixed seeds)."""
+    pools = make_pools(pool_size)
+    results = []
+    for budget in budgets:
+        costs, elapsed = [], 0.0
+        for seed in seeds:
+            start = time.perf_counter()
+            _, cost = optimize_team(pools, budget, cost_threshold=-1, rng=random.Random(seed))
+            elapsed += time.perf_counter() - start
+            costs.append(cost)
+        results.append(
+            {
+                "iterations": budget,
+                "mean_cost": round(sum(costs) / len(costs), 6),
+                "best_cost": round(min(costs), 6),
+                "mean_ms": round(elapsed / len(costs) * 1000, 3),
+            }
+        )
+    return results
+
+
+def run(repeat: int = DEFAULT_REPEAT) -> dict:
+    kernels = {name: time_kernel(fn, repeat) for name, fn in kernel_cases().items()}
+    return {
+        "environment": {"python": platform.python_version(), "platform": platform.platform()},
+        "kernels": kernels,
+        "optimizer_quality": optimizer_quality(),
+    }
+
+
+def slow_kernels(report: dict, baseline: dict, threshold=DEFAULT_THRESHOLD) -> dict:
+    """{kernel name: normalized ratio to baseline} for kernels over the limit."""
+    slow = {}
+    for name, base in baseline.get("kernels", {}).items():
+        current = report["kernels"].get(name)
+        if current is not None:
+            ratio = current["normalized"] / base["normalized"]
+            if ratio > 1 + threshold:
+                slow[name] = ratio
+    return slow
+
+
+def recheck(report: dict, baseline: dict, threshold=DEFAULT_THRESHOLD, repeat=DEFAULT_REPEAT, rounds=DEFAULT_RECHECKS):
+    """
+    Measure suspected regressions again and keep each kernel's fastest
+    result, so a one-off slow run (noisy neighbour, frequency drop) doesn't
+    fail the build. Updates `report` in place.
+    """
+    cases = kernel_cases()
+    for _ in range(rounds):
+        suspects = slow_kernels(report, baseline, threshold)
+        if not suspects:
+            return
+        for name in suspects:
+            print(f"Re-measuring {name} ({suspects[name]:.2f}x baseline)")
+            again = time_kernel(cases[name], repeat)
+            if again["normalized"] < report["kernels"][name]["normalized"]:
+                report["kernels"][name] = again
+
+
+def compare(report: dict, baseline: dict, threshold=DEFAULT_THRESHOLD, quality_threshold=DEFAULT_QUALITY_THRESHOLD) -> list:
+    """Human-readable regressions of `report` against `baseline` (empty = pass)."""
+    regressions = []
+    slow = slow_kernels(report, baseline, threshold)
+    for name in baseline.get("kernels", {}):
+        if name not in report["kernels"]:
+            regressions.append(f"{name}: missing from this run")
+        elif name in slow:
+            regressions.append(f"{name}: {slow[name]:.2f}x baseline (limit {1 + threshold:.2f}x)")
+
+    current_quality = {q["iterations"]: q for q in report.get("optimizer_quality", [])}
+    for base in baseline.get("optimizer_quality", []):
+        current = current_quality.get(base["iterations"])
+        if current and current["mean_cost"] > base["mean_cost"] * (1 + quality_threshold) + 1e-9:
+            regressions.append(
+                f"optimizer quality at {base['iterations']} iterations: mean cost "
+                f"{current['mean_cost']} vs baseline {base['mean_cost']}"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Matching kernel micro-benchmarks")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--quality-threshold", type=float, default=DEFAULT_QUALITY_THRESHOLD)
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--rechecks", type=int, default=DEFAULT_RECHECKS)
+    args = parser.parse_args()
+
+    report = run(args.repeat)
+    print(json.dumps(report, indent=2))
+
+    if args.update_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w") as f:
+            f.write(json.dumps(report, indent=2) + "\n")
+        print(f"Baseline written to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print("No baseline yet; run with --update-baseline")
+        return
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    recheck(report, baseline, args.threshold, args.repeat, args.rechecks)
+    regressions = compare(report, baseline, args.threshold, args.quality_threshold)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    if regressions:
+        raise SystemExit(1)
+    print("No regressions against baseline.")
+
+
+if __name__ == "__main__":
+    main()
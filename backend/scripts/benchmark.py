@@ -0,0 +1,185 @@
+"""
+In-process load benchmark: drives the real ASGI app (no network, no
+server) against a synthetic dataset and prints p50/p95/p99 latency and
+throughput per endpoint as JSON, so releases can be compared.
+
+Run: uv run python scripts/benchmark.py --users 10000 --requests 200 --concurrency 8 --out bench.json
+     (add --reuse to benchmark an existing --db without re-seeding)
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from sqlmodel import Session, create_engine, func, select
+
+from core.auth import get_current_user, get_optional_user
+from core.database import get_session
+from data.skills import DEPARTMENTS
+from main import app
+from models import Quest, User
+from scripts.synth_data import seed_database
+
+ENDPOINTS = ["users", "roster", "quests", "team_preview", "team_analysis"]
+
+
+def percentile(sorted_values: list, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(pct / 100 * len(sorted_values)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def summarize(latencies: list, wall_seconds: float, errors: int, concurrency: int) -> dict:
+    ordered = sorted(latencies)
+    ms = lambda s: round(s * 1000, 2)
+    return {
+        "requests": len(latencies),
+        "concurrency": concurrency,
+        "errors": errors,
+        "p50_ms": ms(percentile(ordered, 50)),
+        "p95_ms": ms(percentile(ordered, 95)),
+        "p99_ms": ms(percentile(ordered, 99)),
+        "mean_ms": ms(sum(ordered) / len(ordered)) if ordered else 0.0,
+        "max_ms": ms(ordered[-1]) if ordered else 0.0,
+        "throughput_rps": round(len(latencies) / wall_seconds, 2) if wall_seconds else 0.0,
+    }
+
+
+def build_requests(session: Session) -> dict:
+    """(method, url, json body) per endpoint, using ids from the dataset."""
+    quest_with_team = session.exec(
+        select(Quest.id).where(Quest.accepted_members != "[]").limit(1)
+    ).first()
+    return {
+        "users": ("GET", "/users?offset=0&limit=12", None),
+        "roster": ("GET", "/users/roster", None),
+        "quests": ("GET", "/quests", None),
+        "team_preview": (
+            "POST",
+            "/teams/preview",
+            {
+                "requirements": [
+                    {"department_id": DEPARTMENTS[0]["id"], "count": 2},
+                    {"department_id": DEPARTMENTS[1]["id"], "count": 1},
+                    {"department_id": DEPARTMENTS[2]["id"], "count": 1},
+                ],
+                "candidate_ids": [],
+            },
+        ),
+        "team_analysis": ("GET", f"/quests/{quest_with_team}/team-analysis", None),
+    }
+
+
+async def _drive(client, method, url, body, requests: int, concurrency: int) -> dict:
+    latencies, errors = [], 0
+    remaining = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            start = time.perf_counter()
+            response = await client.request(method, url, json=body)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    # Warm-up (imports, caches, query plans) is not measured
+    await client.request(method, url, json=body)
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, time.perf_counter() - start, errors, concurrency)
+
+
+async def _run(engine, endpoints, requests: int, concurrency: int) -> dict:
+    with Session(engine) as session:
+        plan = build_requests(session)
+        viewer = session.exec(select(User).limit(1)).first()
+
+    def bench_session():
+        with Session(engine) as session:
+            yield session
+
+    overrides = dict(app.dependency_overrides)
+    app.dependency_overrides[get_session] = bench_session
+    app.dependency_overrides[get_current_user] = lambda: viewer
+    app.dependency_overrides[get_optional_user] = lambda: viewer
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            results = {}
+            for name in endpoints:
+                method, url, body = plan[name]
+                results[name] = await _drive(client, method, url, body, requests, concurrency)
+            return results
+    finally:
+        app.dependency_overrides = overrides
+
+
+def run_benchmark(engine, endpoints=None, requests: int = 200, concurrency: int = 8) -> dict:
+    endpoints = endpoints or ENDPOINTS
+    with Session(engine) as session:
+        dataset = {
+            "users": session.exec(select(func.count(User.id))).one(),
+            "quests": session.exec(select(func.count(Quest.id))).one(),
+        }
+    return {
+        "dataset": dataset,
+        "environment": _environment(),
+        "endpoints": asyncio.run(_run(engine, endpoints, requests, concurrency)),
+    }
+
+
+def _environment() -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True
+        ).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "commit": commit or None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="In-process API load benchmark")
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--quests", type=int, default=None, help="default: users / 10")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--db", default="sqlite:///bench.db")
+    parser.add_argument("--reuse", action="store_true", help="skip seeding, use --db as is")
+    parser.add_argument("--requests", type=int, default=200, help="per endpoint")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--endpoints", default=",".join(ENDPOINTS))
+    parser.add_argument("--out", help="also write the JSON report here")
+    args = parser.parse_args()
+
+    engine = create_engine(args.db, connect_args={"check_same_thread": False} if "sqlite" in args.db else {})
+    if not args.reuse:
+        seed_database(engine, args.users, args.quests, args.seed)
+
+    report = run_benchmark(
+        engine, args.endpoints.split(","), args.requests, args.concurrency
+    )
+    report["seed"] = args.seed
+    output = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
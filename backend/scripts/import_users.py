@@ -0,0 +1,44 @@
+"""
+Bulk-import users from an NDJSON or CSV file straight into the database
+(same pipeline as POST /admin/users/import), printing progress per chunk.
+
+CSV columns: name,email,password,role,character_class,level,ocean_openness,...,skills
+(skills as a JSON list or "Skill:3;Other Skill:2")
+
+Run: uv run python scripts/import_users.py employees.csv [--chunk-size 1000] [--workers 8]
+"""
+import argparse
+import json
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.database import create_db_and_tables
+from services.user_import import import_users
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk user import")
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=["ndjson", "csv"], help="default: from the file extension")
+    parser.add_argument("--chunk-size", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None, help="password hashing threads")
+    args = parser.parse_args()
+
+    fmt = args.format or ("csv" if args.path.lower().endswith(".csv") else "ndjson")
+    create_db_and_tables()
+
+    with open(args.path, encoding="utf-8-sig", newline="") as f:
+        for report in import_users(f, fmt, chunk_size=args.chunk_size, workers=args.workers):
+            if report.get("done"):
+                print(json.dumps(report, ensure_ascii=False, indent=2))
+            else:
+                print(
+                    f"{report['processed']} rows | {report['imported']} imported | "
+                    f"{report['skipped']} skipped | {report['rows_per_second']} rows/s"
+                )
+
+
+if __name__ == "__main__":
+    main()
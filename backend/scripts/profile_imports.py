@@ -0,0 +1,67 @@
+"""
+Import-time profile of the API (cold start cost).
+Runs `python -X importtime -c "import main"` in a fresh interpreter and
+prints the slowest modules by cumulative import time.
+
+Run: uv run python scripts/profile_imports.py [--top 25] [--module main]
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+# Heavy modules that must stay out of the startup path (loaded on first AI call)
+LAZY_MODULES = ["langchain_google_genai", "langchain_core", "google.genai"]
+
+
+def profile_imports(module: str = "main"):
+    code = (
+        f"import sys; import {module}; "
+        f"print('\\n'.join(m for m in {LAZY_MODULES!r} if m in sys.modules))"
+    )
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        print(proc.stderr)
+        raise SystemExit(proc.returncode)
+
+    # Line format: "import time: self [us] | cumulative | imported package"
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        rows.append((int(cumulative_us), int(self_us), name.rstrip()))
+
+    leaked = [m for m in proc.stdout.split() if m]
+    return rows, leaked
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--module", default="main")
+    args = parser.parse_args()
+
+    rows, leaked = profile_imports(args.module)
+    total_us = sum(self_us for _, self_us, _ in rows)
+
+    print(f"Total import time for '{args.module}': {total_us / 1000:.1f} ms")
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for cumulative_us, self_us, name in sorted(rows, reverse=True)[: args.top]:
+        print(f"{cumulative_us / 1000:>14.1f} {self_us / 1000:>9.1f}  {name}")
+
+    if leaked:
+        print(f"\n⚠️  Loaded at startup but should be lazy: {', '.join(leaked)}")
+        raise SystemExit(1)
+    print("\n✅ No lazy-only modules imported at startup.")
+
+
+if __name__ == "__main__":
+    main()
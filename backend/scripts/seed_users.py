@@ -10,11 +10,9 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import random
 import json
-from sqlmodel import Session, select
-from core.database import engine, create_db_and_tables
-from models import User
+from core.database import create_db_and_tables
 from data.skills import DEPARTMENTS
-from core.auth import get_password_hash
+from services.user_import import import_users
 
 # Thai first names
 FIRST_NAMES = [
@@ -42,88 +40,64 @@ CLASS_PROFILES = [
 def get_random_in_range(range_tuple):
     return random.randint(range_tuple[0], range_tuple[1])
 
+def seed_records():
+    """NDJSON lines for the bulk import: the admin, then 5 users per department."""
+    yield json.dumps(
+        {
+            "name": "Super Admin",
+            "email": "admin@kemii.com",
+            "password": "admin1234",
+            "character_class": "Mage",
+            "role": "admin",
+            "level": 99,
+            "ocean_openness": 50,
+            "ocean_conscientiousness": 50,
+            "ocean_extraversion": 50,
+            "ocean_agreeableness": 50,
+            "ocean_neuroticism": 50,
+            "skills": [{"name": "Admin", "level": 99}],
+        },
+        ensure_ascii=False,
+    )
+
+    user_count = 0
+    for dept in DEPARTMENTS:
+        dept_code = dept["id"][:3].upper()
+
+        # One user per character class, OCEAN drawn from its profile
+        for i, profile in enumerate(CLASS_PROFILES):
+            user_count += 1
+            yield json.dumps(
+                {
+                    # Dept suffix keeps names unique
+                    "name": f"{random.choice(FIRST_NAMES)} ({dept_code}-{i+1})",
+                    "email": f"user{user_count}@kemii.com",
+                    # Default password for all seed users
+                    "password": "1234",
+                    "character_class": profile["class"],
+                    "level": random.randint(1, 5),
+                    "ocean_openness": get_random_in_range(profile["o"]),
+                    "ocean_conscientiousness": get_random_in_range(profile["c"]),
+                    "ocean_extraversion": get_random_in_range(profile["e"]),
+                    "ocean_agreeableness": get_random_in_range(profile["a"]),
+                    "ocean_neuroticism": get_random_in_range(profile["n"]),
+                    # Skill = department name
+                    "skills": [{"name": dept["name"], "level": 1}],
+                },
+                ensure_ascii=False,
+            )
+
+
 def seed_users():
     create_db_and_tables()
-    
-    with Session(engine) as session:
-        user_count = 0
-        used_names = set()
-        
-        # Create Admin User
-        admin_email = "admin@kemii.com"
-        existing_admin = session.exec(select(User).where(User.email == admin_email)).first()
-        if not existing_admin:
-            admin_user = User(
-                name="Super Admin",
-                email=admin_email,
-                hashed_password=get_password_hash("admin1234"),
-                character_class="Mage",
-                role="admin",
-                level=99,
-                ocean_openness=50,
-                ocean_conscientiousness=50,
-                ocean_extraversion=50,
-                ocean_agreeableness=50,
-                ocean_neuroticism=50,
-                skills=json.dumps([{"name": "Admin", "level": 99}], ensure_ascii=False),
-                is_available=True
-            )
-            session.add(admin_user)
-            print("👑 Created Admin User: admin@kemii.com (Pass: admin1234)")
-        
-        for dept in DEPARTMENTS:
-            dept_id = dept["id"]
-            dept_name = dept["name"]
-            dept_skills = dept["skills"]
-            
-            # Create 5 users with different character classes
-            for i, profile in enumerate(CLASS_PROFILES):
-                # Generate OCEAN based on class profile
-                o = get_random_in_range(profile["o"])
-                c = get_random_in_range(profile["c"])
-                e = get_random_in_range(profile["e"])
-                a = get_random_in_range(profile["a"])
-                n = get_random_in_range(profile["n"])
-                
-                character_class = profile["class"]
-                
-                # Generate skills (Now using Department Name directly)
-                # Format: [{"name": "Department Name", "level": 1}]
-                skills_json = [{"name": dept_name, "level": 1}]
-                
-                # Generate name with dept suffix to ensure uniqueness
-                name = random.choice(FIRST_NAMES)
-                dept_code = dept_id[:3].upper()
-                full_name = f"{name} ({dept_code}-{i+1})"
-                
-                # Default password for all seed users: "1234"
-                # We calculate it once efficiently if we could, but here we can just call it (or move it out of loop)
-                # But to avoid moving out of loop for simple replace, I'll just call it or cleaner: define it before loop.
-                # However, replace_file_content targets this block.
-                # Let's rely on the import.
-                
-                user = User(
-                    name=full_name,
-                    email=f"user{user_count+1}@kemii.com",
-                    hashed_password=get_password_hash("1234"),
-                    character_class=character_class,
-                    level=random.randint(1, 5),
-                    ocean_openness=o,
-                    ocean_conscientiousness=c,
-                    ocean_extraversion=e,
-                    ocean_agreeableness=a,
-                    ocean_neuroticism=n,
-                    skills=json.dumps(skills_json, ensure_ascii=False),
-                    is_available=True
-                )
-                session.add(user)
-                user_count += 1
-            
-            print(f"✅ Created 5 users for {dept_name}")
-        
-        session.commit()
-        print(f"\n🎉 Total: {user_count} users created! (5 × {len(DEPARTMENTS)} departments)")
-        print("📊 Each department has: Mage, Paladin, Warrior, Cleric, Rogue")
+
+    # Same bulk path as scripts/import_users.py: parallel hashing, one insert
+    # per chunk, and users already seeded (by email) are skipped
+    for report in import_users(seed_records(), "ndjson"):
+        if report.get("done"):
+            print(f"\n🎉 Total: {report['imported']} users created, {report['skipped']} already existed")
+            print("👑 Admin: admin@kemii.com (Pass: admin1234)")
+            print(f"📊 Each of the {len(DEPARTMENTS)} departments has: Mage, Paladin, Warrior, Cleric, Rogue")
 
 if __name__ == "__main__":
     seed_users()
@@ -0,0 +1,170 @@
+"""
+Deterministic synthetic dataset for load tests (10k - 1M users).
+Same --seed -> same users, quests and ids. OCEAN scores follow the
+CLASS_PROFILES ranges used by /admin/seed; members of active quests are
+locked until the quest deadline, like /teams/confirm does.
+
+Run: uv run python scripts/synth_data.py --users 100000 --quests 10000 --db sqlite:///bench.db
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert
+from sqlmodel import Session, SQLModel, create_engine
+from ulid import ULID
+
+from api.admin import CLASS_PROFILES, FIRST_NAMES
+from core.auth import get_password_hash
+from data.skills import DEPARTMENTS
+from models import Quest, User
+
+BASE_DATE = datetime(2026, 1, 1)
+QUEST_STATUSES = ["open", "filled", "in_progress", "completed", "failed", "cancelled"]
+QUEST_STATUS_WEIGHTS = [10, 30, 20, 30, 5, 5]
+ACTIVE_STATUSES = {"open", "filled", "in_progress"}
+
+# ULID timestamps (ms) for generated ids; the low bits carry the seed
+_USER_ID_BASE_MS = 1_760_000_000_000
+_QUEST_ID_BASE_MS = 1_770_000_000_000
+
+
+def user_id(i: int, seed: int = 0) -> str:
+    return str(ULID.from_int(((_USER_ID_BASE_MS + i) << 80) | (seed & 0xFFFF)))
+
+
+def quest_id(i: int, seed: int = 0) -> str:
+    return str(ULID.from_int(((_QUEST_ID_BASE_MS + i) << 80) | (seed & 0xFFFF)))
+
+
+def generate_quests(n_users: int, n_quests: int, seed: int = 42):
+    """Returns (quest rows, {user index: lock end date}) for active quests."""
+    rng = random.Random(f"{seed}-quests")
+    quests, locked = [], {}
+
+    for q in range(n_quests):
+        dept = rng.choice(DEPARTMENTS)
+        status = rng.choices(QUEST_STATUSES, QUEST_STATUS_WEIGHTS)[0]
+        leader = rng.randrange(n_users)
+        members = rng.sample(range(n_users), min(rng.randint(2, 5), n_users))
+        start = BASE_DATE + timedelta(days=rng.randint(-180, 180))
+        deadline = start + timedelta(days=rng.randint(7, 90))
+
+        if status in ACTIVE_STATUSES:
+            for m in members:
+                locked[m] = max(locked.get(m, deadline), deadline)
+
+        quests.append(
+            {
+                "id": quest_id(q, seed),
+                "title": f"Quest {q + 1}: {dept['name']}",
+                "description": f"Synthetic quest for {dept['name']}",
+                "rank": rng.choice("SABCD"),
+                "required_skills": json.dumps(
+                    [{"name": s, "level": rng.randint(1, 3)} for s in rng.sample(dept["skills"], 3)],
+                    ensure_ascii=False,
+                ),
+                "ocean_preference": "{}",
+                "team_size": len(members),
+                "leader_id": user_id(leader, seed),
+                "status": status,
+                "accepted_members": json.dumps([user_id(m, seed) for m in members]),
+                "start_date": start,
+                "deadline": deadline,
+                "created_at": start - timedelta(days=rng.randint(1, 14)),
+            }
+        )
+    return quests, locked
+
+
+def generate_users(n_users: int, locked: dict, seed: int = 42, hashed_password: str = None):
+    """Yields user rows one at a time so 1M users never sit in memory together."""
+    rng = random.Random(f"{seed}-users")
+    for i in range(n_users):
+        profile = rng.choice(CLASS_PROFILES)
+        dept = rng.choice(DEPARTMENTS)
+        skills = [{"name": f"Dept: {dept['name']}", "level": 1}] + [
+            {"name": s, "level": rng.randint(1, 5)}
+            for s in rng.sample(dept["skills"], rng.randint(1, 3))
+        ]
+        end_date = locked.get(i)
+        yield {
+            "id": user_id(i, seed),
+            "name": f"{rng.choice(FIRST_NAMES)} ({dept['id'][:3].upper()}-{i + 1})",
+            "email": f"synth{i + 1}@kemii.test",
+            "hashed_password": hashed_password,
+            "role": "user",
+            "character_class": profile["class"],
+            "level": rng.randint(1, 5),
+            "ocean_openness": rng.randint(*profile["o"]),
+            "ocean_conscientiousness": rng.randint(*profile["c"]),
+            "ocean_extraversion": rng.randint(*profile["e"]),
+            "ocean_agreeableness": rng.randint(*profile["a"]),
+            "ocean_neuroticism": rng.randint(*profile["n"]),
+            "is_available": end_date is None,
+            "team_name": None,
+            "analysis_result": None,
+            "analysis_status": "pending",
+            "analysis_started_at": None,
+            "skills": json.dumps(skills, ensure_ascii=False),
+            "active_project_end_date": end_date,
+        }
+
+
+def _insert_chunks(session: Session, model, rows, chunk_size: int) -> int:
+    total, chunk = 0, []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            session.execute(insert(model), chunk)
+            session.commit()
+            total += len(chunk)
+            chunk = []
+    if chunk:
+        session.execute(insert(model), chunk)
+        session.commit()
+        total += len(chunk)
+    return total
+
+
+def seed_database(engine, n_users: int, n_quests: int = None, seed: int = 42, chunk_size: int = 5000) -> dict:
+    """Create tables and bulk-insert the dataset (executemany per chunk)."""
+    n_quests = n_users // 10 if n_quests is None else n_quests
+    SQLModel.metadata.create_all(engine)
+
+    # One password hash for everyone: hashing 1M passwords would take hours
+    hashed_password = get_password_hash("1234")
+    quests, locked = generate_quests(n_users, n_quests, seed)
+
+    with Session(engine) as session:
+        users = _insert_chunks(
+            session, User, generate_users(n_users, locked, seed, hashed_password), chunk_size
+        )
+        quests = _insert_chunks(session, Quest, quests, chunk_size)
+    return {"users": users, "quests": quests, "locked": len(locked), "seed": seed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--quests", type=int, default=None, help="default: users / 10")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--db", default="sqlite:///bench.db")
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    engine = create_engine(args.db)
+    start = time.perf_counter()
+    result = seed_database(engine, args.users, args.quests, args.seed, args.chunk_size)
+    result["seconds"] = round(time.perf_counter() - start, 2)
+    print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
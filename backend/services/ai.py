@@ -1,14 +1,101 @@
+import asyncio
 import json
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import StrOutputParser
+import os
+import time
+from contextlib import aclosing
+from functools import lru_cache
+from core import metrics
+from core.circuit_breaker import CircuitBreaker, CircuitOpenError
 from core.config import get_llm
+from services.ai_fallback import (
+    local_match_synergy,
+    local_profile_analysis,
+    local_team_overview,
+)
 
-llm = get_llm()
+# LangChain and the Gemini client are loaded on first use, not at import,
+# so app startup (and the "/" health ping) doesn't pay for them.
+llm = None
 
+# Per-call deadline (seconds). For streams it bounds the wait for each chunk.
+AI_TIMEOUT_SECONDS = float(os.getenv("AI_TIMEOUT_SECONDS", 10))
 
-async def analyze_user_profile(user):
-    prompt = ChatPromptTemplate.from_template(
-        """
+breaker = CircuitBreaker(
+    "gemini",
+    failure_threshold=int(os.getenv("AI_BREAKER_THRESHOLD", 5)),
+    reset_timeout=float(os.getenv("AI_BREAKER_RESET_SECONDS", 30)),
+)
+
+# =========================
+# Instrumentation (exposed at /metrics)
+# =========================
+LLM_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 4, 8, 16, 32)
+
+LLM_LATENCY = metrics.histogram(
+    "kemii_llm_call_duration_seconds",
+    "Wall time of LLM chain calls (whole stream for streaming calls).",
+    ["function", "outcome"],
+    LLM_BUCKETS,
+)
+LLM_FIRST_TOKEN = metrics.histogram(
+    "kemii_llm_time_to_first_token_seconds",
+    "Time until the first streamed chunk arrives.",
+    ["function"],
+    LLM_BUCKETS,
+)
+LLM_TOKENS = metrics.counter(
+    "kemii_llm_tokens_total",
+    "Tokens reported by the provider.",
+    ["function", "kind"],
+)
+LLM_PARSE_FAILURES = metrics.counter(
+    "kemii_llm_json_parse_failures_total",
+    "LLM responses that were not valid JSON.",
+    ["function"],
+)
+LLM_FALLBACKS = metrics.counter(
+    "kemii_llm_fallbacks_total",
+    "Responses served by the local fallback instead of the LLM.",
+    ["function", "reason"],
+)
+LLM_CACHE = metrics.counter(
+    "kemii_llm_cache_lookups_total",
+    "Lookups of stored AI results before calling the LLM.",
+    ["function", "result"],
+)
+
+
+def _failure_reason(e: Exception) -> str:
+    if isinstance(e, CircuitOpenError):
+        return "circuit_open"
+    if isinstance(e, (asyncio.TimeoutError, TimeoutError)):
+        return "timeout"
+    if isinstance(e, json.JSONDecodeError):
+        return "parse_error"
+    return "error"
+
+
+def _record_fallback(fn: str, e: Exception):
+    LLM_FALLBACKS.inc(function=fn, reason=_failure_reason(e))
+
+
+def _usage_collector(fn: str):
+    """Callback handler that adds provider-reported token usage to LLM_TOKENS."""
+    from langchain_core.callbacks import BaseCallbackHandler
+
+    class UsageCollector(BaseCallbackHandler):
+        def on_llm_end(self, response, **kwargs):
+            for generations in response.generations:
+                for generation in generations:
+                    usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                    if usage:
+                        LLM_TOKENS.inc(usage.get("input_tokens", 0), function=fn, kind="prompt")
+                        LLM_TOKENS.inc(usage.get("output_tokens", 0), function=fn, kind="completion")
+
+    return UsageCollector()
+
+
+USER_PROFILE_PROMPT = """
         Role: You are a "Guild Strategist & Career Mentor" (Expert in HR Psychology & RPG Mechanics).
         Goal: Decode the user's OCEAN stats into a unique RPG Class Identity and professional advice.
         Tone: Professional, Empowering, and slightly Gamified (Thai Language).
@@ -38,40 +125,8 @@ async def analyze_user_profile(user):
             "best_partner": "..."
         }}
     """
-    )
 
-    chain = prompt | llm | StrOutputParser()
-
-    try:
-        raw_res = await chain.ainvoke(
-            {
-                "name": user.name,
-                "rpg_class": user.character_class,
-                "openness": user.ocean_openness,
-                "conscientiousness": user.ocean_conscientiousness,
-                "extraversion": user.ocean_extraversion,
-                "agreeableness": user.ocean_agreeableness,
-                "neuroticism": user.ocean_neuroticism,
-            }
-        )
-
-        clean_json = raw_res.replace("```json", "").replace("```", "").strip()
-        return json.loads(clean_json)
-
-    except Exception as e:
-        print(f"AI Error: {e}")
-        return {
-            "class_title": f"{user.character_class} ฝึกหัด",
-            "prophecy": "พลังของท่านยังคลุมเครือ... โปรดลองใหม่อีกครั้ง",
-            "strengths": ["Unknown"],
-            "weaknesses": ["Unknown"],
-            "best_partner": "Unknown",
-        }
-
-
-async def analyze_match_synergy(u1, u2, s1, s2, final_score):
-    match_prompt = ChatPromptTemplate.from_template(
-        """
+MATCH_SYNERGY_PROMPT = """
         Role: You are a "Guild Strategy Consultant" (Expert in Party Synergy & HR Dynamics).
         Goal: Analyze the chemistry between two members and predict their teamwork effectiveness.
         Tone: Epic, Constructive, and Insightful (Thai Language).
@@ -103,47 +158,8 @@ async def analyze_match_synergy(u1, u2, s1, s2, final_score):
           "pro_tip": "..."
         }}
     """
-    )
-
-    chain = match_prompt | llm | StrOutputParser()
-
-    try:
-        raw_result = await chain.ainvoke(
-            {
-                "name1": u1.name,
-                "class1": u1.character_class,
-                "o1": s1["O"],
-                "c1": s1["C"],
-                "e1": s1["E"],
-                "a1": s1["A"],
-                "n1": s1["N"],
-                "name2": u2.name,
-                "class2": u2.character_class,
-                "o2": s2["O"],
-                "c2": s2["C"],
-                "e2": s2["E"],
-                "a2": s2["A"],
-                "n2": s2["N"],
-                "score": final_score,
-            }
-        )
-
-        cleaned_json = raw_result.replace("```json", "").replace("```", "").strip()
-        return json.loads(cleaned_json)
-
-    except Exception as e:
-        print(f"AI Error: {e}")
-        return {
-            "synergy_score": final_score,
-            "synergy_name": "พันธสัญญาแห่งโชคชะตา",
-            "analysis": "พลังเวทย์ผันผวน... ไม่สามารถอ่านคำทำนายได้ชัดเจน แต่ค่าพลังพื้นฐานบ่งบอกถึงความเป็นไปได้",
-            "pro_tip": "ลองให้ทั้งคู่ลงดันเจี้ยนง่ายๆ ร่วมกันดูก่อน",
-        }
-
 
-async def generate_team_overview(team_stats: dict) -> str:
-    prompt = ChatPromptTemplate.from_template(
-        """
+TEAM_OVERVIEW_PROMPT = """
         Role: You are a "Senior Party Tactician" (Expert in Organizational Psychology & RPG Mechanics).
         Goal: Analyze this team composition (Party) and explain how they will perform in a business quest.
         Tone: Professional, Insightful, yet Engaging (Thai Language).
@@ -167,13 +183,213 @@ async def generate_team_overview(team_stats: dict) -> str:
         - Be concise and direct.
         - **Speak like a tactician analyzing a battle formation, but for office work.**
         """
-    )
 
-    chain = prompt | llm | StrOutputParser()
 
+def _parse_json(fn: str, raw: str):
+    cleaned_json = raw.replace("```json", "").replace("```", "").strip()
+    try:
+        return json.loads(cleaned_json)
+    except json.JSONDecodeError:
+        LLM_PARSE_FAILURES.inc(function=fn)
+        raise
+
+
+def _match_inputs(u1, u2, s1, s2, final_score):
+    return {
+        "name1": u1.name,
+        "class1": u1.character_class,
+        "o1": s1["O"],
+        "c1": s1["C"],
+        "e1": s1["E"],
+        "a1": s1["A"],
+        "n1": s1["N"],
+        "name2": u2.name,
+        "class2": u2.character_class,
+        "o2": s2["O"],
+        "c2": s2["C"],
+        "e2": s2["E"],
+        "a2": s2["A"],
+        "n2": s2["N"],
+        "score": final_score,
+    }
+
+
+def _get_llm():
+    global llm
+    if llm is None:
+        llm = get_llm()
+    return llm
+
+
+@lru_cache(maxsize=None)
+def _prompt(prompt_text: str):
+    from langchain_core.prompts import ChatPromptTemplate
+
+    return ChatPromptTemplate.from_template(prompt_text)
+
+
+def _chain(prompt_text: str):
+    from langchain_core.output_parsers import StrOutputParser
+
+    return _prompt(prompt_text) | _get_llm() | StrOutputParser()
+
+
+async def _invoke(fn: str, prompt_text: str, inputs: dict) -> str:
+    """Run one prompt through the LLM with a deadline and the circuit breaker."""
+    if not breaker.allow():
+        LLM_LATENCY.observe(0.0, function=fn, outcome="circuit_open")
+        raise CircuitOpenError("AI provider circuit is open")
+
+    start = time.perf_counter()
+    try:
+        chain = _chain(prompt_text)
+        config = {"callbacks": [_usage_collector(fn)]}
+        result = await asyncio.wait_for(
+            chain.ainvoke(inputs, config=config), AI_TIMEOUT_SECONDS
+        )
+    except asyncio.CancelledError:
+        breaker.release()
+        LLM_LATENCY.observe(time.perf_counter() - start, function=fn, outcome="cancelled")
+        raise
+    except Exception as e:
+        breaker.record_failure()
+        LLM_LATENCY.observe(time.perf_counter() - start, function=fn, outcome=_failure_reason(e))
+        raise
+
+    breaker.record_success()
+    LLM_LATENCY.observe(time.perf_counter() - start, function=fn, outcome="ok")
+    return result
+
+
+async def _astream(fn: str, prompt_text: str, inputs: dict):
+    """Streaming variant of _invoke; the deadline applies to each chunk."""
+    if not breaker.allow():
+        LLM_LATENCY.observe(0.0, function=fn, outcome="circuit_open")
+        raise CircuitOpenError("AI provider circuit is open")
+
+    start = time.perf_counter()
+    try:
+        config = {"callbacks": [_usage_collector(fn)]}
+        stream = _chain(prompt_text).astream(inputs, config=config)
+    except Exception as e:
+        breaker.record_failure()
+        LLM_LATENCY.observe(time.perf_counter() - start, function=fn, outcome=_failure_reason(e))
+        raise
+
+    first = True
     try:
-        response = await chain.ainvoke(team_stats)
+        while True:
+            try:
+                chunk = await asyncio.wait_for(anext(stream), AI_TIMEOUT_SECONDS)
+            except StopAsyncIteration:
+                break
+            if first:
+                LLM_FIRST_TOKEN.observe(time.perf_counter() - start, function=fn)
+                first = False
+            yield chunk
+    except (GeneratorExit, asyncio.CancelledError):
+        breaker.release()
+        LLM_LATENCY.observe(time.perf_counter() - start, function=fn, outcome="cancelled")
+        raise
+    except Exception as e:
+        breaker.record_failure()
+        LLM_LATENCY.observe(time.perf_counter() - start, function=fn, outcome=_failure_reason(e))
+        raise
+    finally:
+        await stream.aclose()
+
+    breaker.record_success()
+    LLM_LATENCY.observe(time.perf_counter() - start, function=fn, outcome="ok")
+
+
+async def analyze_user_profile(user):
+    fn = "analyze_user_profile"
+    try:
+        raw_res = await _invoke(
+            fn,
+            USER_PROFILE_PROMPT,
+            {
+                "name": user.name,
+                "rpg_class": user.character_class,
+                "openness": user.ocean_openness,
+                "conscientiousness": user.ocean_conscientiousness,
+                "extraversion": user.ocean_extraversion,
+                "agreeableness": user.ocean_agreeableness,
+                "neuroticism": user.ocean_neuroticism,
+            },
+        )
+
+        return _parse_json(fn, raw_res)
+
+    except Exception as e:
+        print(f"AI Error: {e!r}")
+        _record_fallback(fn, e)
+        return local_profile_analysis(user)
+
+
+async def analyze_match_synergy(u1, u2, s1, s2, final_score):
+    fn = "analyze_match_synergy"
+    try:
+        raw_result = await _invoke(
+            fn, MATCH_SYNERGY_PROMPT, _match_inputs(u1, u2, s1, s2, final_score)
+        )
+        return _parse_json(fn, raw_result)
+
+    except Exception as e:
+        print(f"AI Error: {e!r}")
+        _record_fallback(fn, e)
+        return local_match_synergy(u1, u2, s1, s2, final_score)
+
+
+async def generate_team_overview(team_stats: dict) -> str:
+    fn = "generate_team_overview"
+    try:
+        response = await _invoke(fn, TEAM_OVERVIEW_PROMPT, team_stats)
         return response.strip()
     except Exception as e:
-        print(f"Team Analysis Error: {e}")
-        return "ไม่สามารถประเมินผลทีมได้ในขณะนี้"
+        print(f"Team Analysis Error: {e!r}")
+        _record_fallback(fn, e)
+        return local_team_overview(team_stats)
+
+
+# =========================
+# Streaming (SSE)
+# =========================
+# Each generator yields (event, data) tuples: "token" chunks as they arrive
+# from Gemini, then one "done" event carrying the final result. "done" is
+# authoritative: on failure it carries the local fallback instead.
+
+
+async def stream_match_synergy(u1, u2, s1, s2, final_score):
+    fn = "stream_match_synergy"
+    chunks = []
+    try:
+        inputs = _match_inputs(u1, u2, s1, s2, final_score)
+        async with aclosing(_astream(fn, MATCH_SYNERGY_PROMPT, inputs)) as stream:
+            async for chunk in stream:
+                chunks.append(chunk)
+                yield "token", chunk
+        result = _parse_json(fn, "".join(chunks))
+    except Exception as e:
+        print(f"AI Stream Error: {e!r}")
+        _record_fallback(fn, e)
+        result = local_match_synergy(u1, u2, s1, s2, final_score)
+
+    yield "done", result
+
+
+async def stream_team_overview(team_stats: dict):
+    fn = "stream_team_overview"
+    chunks = []
+    try:
+        async with aclosing(_astream(fn, TEAM_OVERVIEW_PROMPT, team_stats)) as stream:
+            async for chunk in stream:
+                chunks.append(chunk)
+                yield "token", chunk
+        result = "".join(chunks).strip()
+    except Exception as e:
+        print(f"Team Analysis Stream Error: {e!r}")
+        _record_fallback(fn, e)
+        result = local_team_overview(team_stats)
+
+    yield "done", result
@@ -0,0 +1,160 @@
+# Local deterministic stand-ins for the Gemini prompts in services/ai.py.
+# Used when the provider is slow, failing, or the circuit breaker is open,
+# so the user still gets an answer derived from their actual OCEAN stats.
+
+TRAITS = ["O", "C", "E", "A", "N"]
+
+# Same mapping as /submit-assessment
+TRAIT_CLASS = {
+    "O": "Mage",
+    "C": "Paladin",
+    "E": "Warrior",
+    "A": "Cleric",
+    "N": "Rogue",
+}
+
+CLASS_THAI = {
+    "Mage": "นักเวทย์",
+    "Paladin": "อัศวิน",
+    "Warrior": "นักรบ",
+    "Cleric": "นักบวช",
+    "Rogue": "โจร",
+}
+
+TRAIT_EPITHET = {
+    "O": "แห่งจินตนาการ",
+    "C": "ผู้ไม่เคยพลาดเดดไลน์",
+    "E": "ผู้ปลุกใจทีม",
+    "A": "ผู้ประสานใจ",
+    "N": "ผู้มองเห็นภัยล่วงหน้า",
+}
+
+# trait -> (label, advice)
+TRAIT_STRENGTH = {
+    "O": ("ความคิดสร้างสรรค์", "คุณมองเห็นทางออกใหม่ๆ ที่คนอื่นมองข้าม"),
+    "C": ("ความรับผิดชอบ", "คุณวางแผนเป็นระบบและส่งงานได้ตรงเวลา"),
+    "E": ("พลังขับเคลื่อน", "คุณกล้าเริ่มต้นและดึงทีมให้ลงมือทำ"),
+    "A": ("การประสานงาน", "คุณสร้างความไว้ใจและลดความขัดแย้งในทีม"),
+    "N": ("ความมั่นคงทางอารมณ์", "คุณรักษาสมาธิได้ดีแม้อยู่ภายใต้แรงกดดัน"),
+}
+
+TRAIT_GROWTH = {
+    "O": ("การเปิดรับไอเดียใหม่", "คุณลองทดลองวิธีการใหม่ในงานเล็กๆ ก่อน"),
+    "C": ("ความเป็นระบบ", "คุณลองแบ่งงานเป็นเป้าหมายย่อยพร้อมเดดไลน์ที่ชัดเจน"),
+    "E": ("การแสดงออก", "คุณลองแชร์ความคิดเห็นในที่ประชุมให้บ่อยขึ้น"),
+    "A": ("ความยืดหยุ่นต่อผู้อื่น", "คุณลองรับฟังมุมมองของทีมก่อนตัดสินใจ"),
+    "N": ("การจัดการความเครียด", "คุณลองกำหนดช่วงพักและแยกเรื่องสำคัญออกจากเรื่องเร่งด่วน"),
+}
+
+# Who covers each growth area best
+PARTNER_FOR_GAP = {
+    "O": "Mage",
+    "C": "Paladin",
+    "E": "Warrior",
+    "A": "Cleric",
+    "N": "Paladin",
+}
+
+PARTNER_REASON = {
+    "Mage": "ช่วยจุดประกายไอเดียใหม่ๆ ให้งานของคุณ",
+    "Paladin": "ช่วยวางโครงสร้างและทำให้แผนของคุณมั่นคงขึ้น",
+    "Warrior": "ช่วยผลักดันให้ไอเดียของคุณกลายเป็นการลงมือทำ",
+    "Cleric": "ช่วยประสานคนและดูแลบรรยากาศของทีม",
+    "Rogue": "ช่วยมองหาความเสี่ยงที่คุณอาจมองข้าม",
+}
+
+
+def _strength_score(stats: dict, trait: str) -> float:
+    # Low N (calm) is the strength; for the others, higher is better
+    return 60 - stats[trait] if trait == "N" else stats[trait]
+
+
+def _gap_score(stats: dict, trait: str) -> float:
+    return stats[trait] if trait == "N" else 60 - stats[trait]
+
+
+def _ranked(stats: dict, key) -> list:
+    # Stable ordering (TRAITS order breaks ties) keeps output deterministic
+    return sorted(TRAITS, key=lambda t: (-key(stats, t), TRAITS.index(t)))
+
+
+def user_stats(user) -> dict:
+    return {
+        "O": user.ocean_openness or 0,
+        "C": user.ocean_conscientiousness or 0,
+        "E": user.ocean_extraversion or 0,
+        "A": user.ocean_agreeableness or 0,
+        "N": user.ocean_neuroticism or 0,
+    }
+
+
+def local_profile_analysis(user) -> dict:
+    stats = user_stats(user)
+    top = _ranked(stats, _strength_score)
+    gaps = _ranked(stats, _gap_score)
+
+    main_trait = max(TRAITS[:4], key=lambda t: (stats[t], -TRAITS.index(t)))
+    main_class = TRAIT_CLASS.get(main_trait)
+    if user.character_class in CLASS_THAI:
+        main_class = user.character_class
+    second = next(t for t in top if TRAIT_CLASS[t] != main_class)
+
+    partner = PARTNER_FOR_GAP[gaps[0]]
+    if partner == main_class:
+        partner = PARTNER_FOR_GAP[gaps[1]]
+    if partner == main_class:
+        partner = "Cleric" if main_class != "Cleric" else "Paladin"
+
+    return {
+        "class_title": f"{CLASS_THAI[main_class]}{TRAIT_EPITHET[second]}",
+        "prophecy": (
+            f"พลังหลักของคุณคือ{TRAIT_STRENGTH[top[0]][0]} "
+            f"ซึ่งทำให้คุณโดดเด่นในภารกิจที่ต้องใช้จุดแข็งนี้ "
+            f"ส่วนด้านที่ควรฝึกฝนเพิ่มคือ{TRAIT_GROWTH[gaps[0]][0]}"
+        ),
+        "strengths": [TRAIT_STRENGTH[t][1] for t in top[:3]],
+        "weaknesses": [TRAIT_GROWTH[t][1] for t in gaps[:2]],
+        "best_partner": f"{CLASS_THAI[partner]} เพราะ{PARTNER_REASON[partner]}",
+    }
+
+
+def local_match_synergy(u1, u2, s1: dict, s2: dict, final_score: int) -> dict:
+    diffs = {t: abs(s1[t] - s2[t]) for t in TRAITS}
+    widest = max(TRAITS, key=lambda t: (diffs[t], -TRAITS.index(t)))
+    class1 = CLASS_THAI.get(u1.character_class, u1.character_class)
+    class2 = CLASS_THAI.get(u2.character_class, u2.character_class)
+
+    if final_score >= 70:
+        name = f"คู่หู{class1}และ{class2}"
+        analysis = "ทั้งคู่มีค่าพลังที่สอดคล้องกัน ทำงานร่วมกันได้ราบรื่นและเติมเต็มกันได้ดี"
+    elif final_score >= 40:
+        name = f"พันธมิตร{class1}-{class2}"
+        analysis = "ทั้งคู่มีจุดที่เสริมกันได้ แต่ยังมีมุมมองที่ต่างกันซึ่งต้องปรับจูน"
+    else:
+        name = f"ศึกชิงไหวพริบ{class1}-{class2}"
+        analysis = "ค่าพลังของทั้งคู่ต่างกันมาก อาจเกิดแรงเสียดทานหากไม่มีการตกลงวิธีทำงานให้ชัด"
+
+    return {
+        "synergy_score": final_score,
+        "synergy_name": name,
+        "analysis": analysis,
+        "pro_tip": f"ตกลงกันตั้งแต่ต้นในเรื่อง{TRAIT_GROWTH[widest][0]} ซึ่งเป็นจุดที่ทั้งคู่ต่างกันมากที่สุด",
+    }
+
+
+def local_team_overview(team_stats: dict) -> str:
+    avg_a = team_stats.get("avg_a", 0)
+    avg_c = team_stats.get("avg_c", 0)
+    avg_n = team_stats.get("avg_n", 0)
+
+    spirit = "กิลด์ที่กลมเกลียว" if avg_a >= 35 else "ชมรมโต้วาทีที่ถกเถียงกันอย่างเข้มข้น"
+    execution = "กองทัพที่มีวินัย" if avg_c >= 35 else "ทหารรับจ้างที่ปรับตัวเก่ง"
+    blind_spot = (
+        "แต่ต้องระวังความตึงเครียดเมื่อเจองานกดดัน"
+        if avg_n >= 30
+        else "และมีขวัญกำลังใจมั่นคงดุจหินผา แต่อย่าประมาทความเสี่ยงเล็กๆ"
+    )
+    return (
+        f"ทีมนี้ (คะแนน {team_stats.get('score', 0)}/100) มีบรรยากาศแบบ{spirit} "
+        f"และลงมือทำงานแบบ{execution} {blind_spot}"
+    )
@@ -0,0 +1,201 @@
+import asyncio
+import json
+import os
+import time
+from datetime import datetime, timedelta
+
+from sqlmodel import Session, select
+
+from core.database import engine
+from models import User
+from services.ai import AI_TIMEOUT_SECONDS, analyze_user_profile
+
+# Analysis lifecycle stored on User.analysis_status
+STATUS_PENDING = "pending"
+STATUS_PROCESSING = "processing"
+STATUS_READY = "ready"
+STATUS_FAILED = "failed"
+
+ANALYSIS_WORKERS = int(os.getenv("ANALYSIS_WORKERS", 2))
+ANALYSIS_RATE_PER_MIN = float(os.getenv("ANALYSIS_RATE_PER_MIN", 30))
+# A "processing" mark older than the LLM deadline plus this margin is a dead job
+ANALYSIS_STALE_MARGIN_SECONDS = float(os.getenv("ANALYSIS_STALE_MARGIN_SECONDS", 30))
+
+
+class AsyncRateLimiter:
+    """Token bucket: allow `rate` calls per `period` seconds (bursts up to `rate`)."""
+
+    def __init__(self, rate: float, period: float = 60.0):
+        self.capacity = max(rate, 1.0)
+        self.tokens = self.capacity
+        self.fill_rate = rate / period
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.capacity, self.tokens + (now - self.updated_at) * self.fill_rate
+                )
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.fill_rate)
+
+
+def _ocean_snapshot(user: User):
+    return (
+        user.ocean_openness,
+        user.ocean_conscientiousness,
+        user.ocean_extraversion,
+        user.ocean_agreeableness,
+        user.ocean_neuroticism,
+        user.character_class,
+    )
+
+
+def analysis_in_progress(user: User, now: datetime = None) -> bool:
+    """True while a live job owns the user: PROCESSING, marked recently enough."""
+    if user.analysis_status != STATUS_PROCESSING or user.analysis_started_at is None:
+        return False
+    deadline = timedelta(seconds=AI_TIMEOUT_SECONDS + ANALYSIS_STALE_MARGIN_SECONDS)
+    return user.analysis_started_at > (now or datetime.utcnow()) - deadline
+
+
+async def process_analysis(user_id: str, session_factory=None):
+    """
+    Generate and store the AI analysis for one user. The PROCESSING mark is
+    committed and its session closed before the LLM call, so no connection
+    is held while waiting; the result is stored from a fresh session.
+    A cancelled job (shutdown) puts the user back to PENDING.
+    """
+    session_factory = session_factory or (lambda: Session(engine))
+
+    with session_factory() as session:
+        user = session.get(User, user_id)
+        if not user:
+            return
+        if user.analysis_status == STATUS_READY and user.analysis_result:
+            return
+        if analysis_in_progress(user):
+            return
+        user.analysis_status = STATUS_PROCESSING
+        user.analysis_started_at = datetime.utcnow()
+        session.add(user)
+        session.commit()
+        session.refresh(user)
+        snapshot = _ocean_snapshot(user)
+
+    # `user` is detached here; its loaded attributes are all the LLM needs
+    try:
+        ai_data = await analyze_user_profile(user)
+    except asyncio.CancelledError:
+        # Not an LLM failure: leave it for the next start() to pick up
+        _store_analysis(user_id, snapshot, STATUS_PENDING, session_factory)
+        raise
+    except Exception as e:
+        print(f"Analysis Worker Error ({user_id}): {e}")
+        _store_analysis(user_id, snapshot, STATUS_FAILED, session_factory)
+        return
+
+    _store_analysis(user_id, snapshot, STATUS_READY, session_factory, ai_data)
+
+
+def _store_analysis(user_id: str, snapshot, status: str, session_factory, ai_data=None):
+    with session_factory() as session:
+        user = session.get(User, user_id)
+        # Gone, or stats changed while we were waiting on the LLM -> a newer job owns this user
+        if not user or _ocean_snapshot(user) != snapshot:
+            return
+        if ai_data is not None:
+            user.analysis_result = json.dumps(ai_data, ensure_ascii=False)
+        user.analysis_status = status
+        user.analysis_started_at = None
+        session.add(user)
+        session.commit()
+
+
+class AnalysisQueue:
+    """Bounded-concurrency background queue for profile analysis."""
+
+    def __init__(self, workers: int = ANALYSIS_WORKERS, rate_per_min: float = ANALYSIS_RATE_PER_MIN):
+        self.worker_count = max(workers, 1)
+        self.rate_per_min = rate_per_min
+        self.queue = None
+        self.loop = None
+        self.tasks = []
+        self.queued_ids = set()
+        self.limiter = None
+        self.session_factory = None
+
+    @property
+    def running(self) -> bool:
+        return bool(self.tasks)
+
+    def start(self, session_factory=None):
+        if self.running:
+            return
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue()
+        self.limiter = AsyncRateLimiter(self.rate_per_min)
+        self.session_factory = session_factory
+        self.tasks = [
+            asyncio.create_task(self._worker()) for _ in range(self.worker_count)
+        ]
+        self._requeue_unfinished()
+
+    def _requeue_unfinished(self):
+        """Jobs lost with the previous process: queued, or cut off mid-call."""
+        with (self.session_factory or (lambda: Session(engine)))() as session:
+            user_ids = session.exec(
+                select(User.id).where(
+                    User.analysis_status.in_([STATUS_PENDING, STATUS_PROCESSING]),
+                    User.analysis_result == None,
+                )
+            ).all()
+        for user_id in user_ids:
+            self._put(user_id)
+        if user_ids:
+            print(f"Re-queued {len(user_ids)} unfinished analyses.")
+
+    async def stop(self):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+        self.queued_ids.clear()
+
+    def enqueue(self, user_id: str) -> bool:
+        """Thread-safe: callable from sync endpoints running in the threadpool."""
+        if not self.running or self.loop.is_closed():
+            return False
+        self.loop.call_soon_threadsafe(self._put, user_id)
+        return True
+
+    def _put(self, user_id: str):
+        if user_id in self.queued_ids:
+            return
+        self.queued_ids.add(user_id)
+        self.queue.put_nowait(user_id)
+
+    async def _worker(self):
+        while True:
+            user_id = await self.queue.get()
+            self.queued_ids.discard(user_id)
+            try:
+                await self.limiter.acquire()
+                await process_analysis(user_id, self.session_factory)
+            except Exception as e:
+                print(f"Analysis Worker Error ({user_id}): {e}")
+            finally:
+                self.queue.task_done()
+
+
+analysis_queue = AnalysisQueue()
+
+
+def enqueue_analysis(user_id: str) -> bool:
+    return analysis_queue.enqueue(user_id)
@@ -0,0 +1,244 @@
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy import or_, update
+from sqlmodel import Session, select
+
+from core.database import engine
+from models import Quest, User
+from services.change_log import record_changes
+from services.interval_tree import IntervalTree
+from services.scheduler import ExpirationHeap, scheduler
+
+RELEASE_JOB = "release_users"
+# Safety-net sweep even when no expiration is known in this process
+RELEASE_INTERVAL_SECONDS = float(os.getenv("RELEASE_INTERVAL_SECONDS", 300))
+# Other workers' quest changes reach this process after at most this long
+AVAILABILITY_INDEX_TTL_SECONDS = float(os.getenv("AVAILABILITY_INDEX_TTL_SECONDS", 60))
+
+# Quests in these states still hold their members
+ACTIVE_QUEST_STATUSES = ["open", "filled", "in_progress"]
+
+expiration_heap = ExpirationHeap()
+
+
+def to_utc_naive(dt: datetime):
+    """Dates are stored naive in UTC (clients send toISOString() values)."""
+    if dt is not None and dt.tzinfo is not None:
+        return dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+
+def release_expired_users(session: Session = None, now: datetime = None) -> int:
+    """
+    Free every busy user whose project has ended (one bulk UPDATE). Users
+    still on an active quest that hasn't reached its deadline stay busy;
+    the quest's own release path frees them.
+    """
+    now = now or datetime.utcnow()
+    own_session = session is None
+    session = session or Session(engine)
+    still_on_quest = (
+        select(Quest.id)
+        .where(
+            Quest.status.in_(ACTIVE_QUEST_STATUSES),
+            Quest.accepted_members.contains(User.id),
+            or_(Quest.deadline == None, Quest.deadline >= now),
+        )
+        .exists()
+    )
+    try:
+        released = session.execute(
+            update(User)
+            .where(
+                User.is_available == False,
+                User.active_project_end_date != None,
+                User.active_project_end_date < now,
+                ~still_on_quest,
+            )
+            .values(
+                is_available=True,
+                active_project_end_date=None,
+                version=User.version + 1,
+            )
+            .returning(User.id)
+        ).scalars().all()
+        record_changes(session, "user", released)
+        session.commit()
+    finally:
+        if own_session:
+            session.close()
+
+    expiration_heap.pop_due(now)
+    if released:
+        availability_index.invalidate()
+        print(f"Auto-released {len(released)} heroes from duty.")
+    return len(released)
+
+
+def other_commitments(session: Session, user_ids, exclude_quest_ids=()) -> dict:
+    """
+    {user_id: latest deadline} for the users in `user_ids` who are still
+    members of an active quest other than `exclude_quest_ids`. None means
+    one of those quests has no deadline.
+    """
+    user_ids = set(user_ids)
+    if not user_ids:
+        return {}
+    rows = session.exec(
+        select(Quest.accepted_members, Quest.deadline).where(
+            Quest.status.in_(ACTIVE_QUEST_STATUSES),
+            Quest.id.not_in(list(exclude_quest_ids)),
+            # Narrows the scan; the JSON is checked exactly below
+            or_(*(Quest.accepted_members.contains(uid) for uid in user_ids)),
+        )
+    ).all()
+
+    busy = {}
+    for accepted, deadline in rows:
+        for uid in json.loads(accepted) if accepted else []:
+            if uid not in user_ids or (uid in busy and busy[uid] is None):
+                continue
+            busy[uid] = max(busy.get(uid, deadline), deadline) if deadline else None
+    return busy
+
+
+def release_members(session: Session, user_ids, exclude_quest_ids=()) -> list:
+    """
+    Free users leaving a quest, unless another active quest still holds
+    them: those stay busy until its deadline. Adds to the session, the
+    caller commits. Returns the ids that became available.
+    """
+    user_ids = list(user_ids)
+    if not user_ids:
+        return []
+    busy = other_commitments(session, user_ids, exclude_quest_ids)
+    freed = []
+    for user in session.exec(select(User).where(User.id.in_(user_ids))).all():
+        if user.id in busy:
+            user.is_available = False
+            user.active_project_end_date = busy[user.id]
+            if busy[user.id]:
+                schedule_release(user.id, busy[user.id])
+        else:
+            user.is_available = True
+            user.active_project_end_date = None
+            freed.append(user.id)
+        session.add(user)
+    return freed
+
+
+def schedule_release(user_id: str, end_date: datetime):
+    """Call after setting User.active_project_end_date."""
+    end_date = to_utc_naive(end_date)
+    if end_date and expiration_heap.push(user_id, end_date):
+        scheduler.wake(RELEASE_JOB)
+
+
+def register_release_job():
+    with Session(engine) as session:
+        expiration_heap.load(
+            session.exec(
+                select(User.id, User.active_project_end_date).where(
+                    User.is_available == False, User.active_project_end_date != None
+                )
+            ).all()
+        )
+    return scheduler.add_job(
+        RELEASE_JOB,
+        release_expired_users,
+        interval=RELEASE_INTERVAL_SECONDS,
+        next_due=expiration_heap.peek,
+    )
+
+
+def busy_intervals(session: Session) -> list:
+    """
+    (start, end, user_id) for every commitment: members of active quests
+    from start_date (or creation) to deadline. Users flagged unavailable
+    outside any active quest stay busy until their active_project_end_date.
+    """
+    intervals = []
+    quests = session.exec(
+        select(Quest.accepted_members, Quest.start_date, Quest.created_at, Quest.deadline)
+        .where(Quest.status.in_(ACTIVE_QUEST_STATUSES))
+    ).all()
+    for accepted, start_date, created_at, deadline in quests:
+        start = to_utc_naive(start_date or created_at) or datetime.min
+        end = to_utc_naive(deadline) or datetime.max
+        for uid in json.loads(accepted) if accepted else []:
+            intervals.append((start, end, uid))
+
+    locked = session.exec(
+        select(User.id, User.active_project_end_date).where(User.is_available == False)
+    ).all()
+    on_quest = {uid for _, _, uid in intervals}
+    for uid, end_date in locked:
+        if uid not in on_quest:
+            intervals.append((datetime.min, end_date or datetime.max, uid))
+    return intervals
+
+
+class AvailabilityIndex:
+    """
+    Interval tree of busy periods, rebuilt lazily after a quest transition
+    (`invalidate()`) or once the TTL passes. Answers "who is busy at any
+    point in [start, end]"; everyone else is free for the whole window.
+    `version` bumps on every invalidation so derived caches can follow.
+    """
+
+    def __init__(self, ttl: float = AVAILABILITY_INDEX_TTL_SECONDS):
+        self.ttl = ttl
+        self.tree = None
+        self.built_at = 0.0
+        self.version = 0
+        self._lock = threading.Lock()
+
+    def invalidate(self):
+        self.tree = None
+        self.version += 1
+
+    def _get_tree(self, session: Session) -> IntervalTree:
+        tree = self.tree
+        if tree is not None and time.monotonic() - self.built_at < self.ttl:
+            return tree
+        with self._lock:
+            if self.tree is None or time.monotonic() - self.built_at >= self.ttl:
+                self.tree = IntervalTree(busy_intervals(session))
+                self.built_at = time.monotonic()
+            return self.tree
+
+    def busy_user_ids(self, start: datetime, end: datetime, session: Session) -> set:
+        return self._get_tree(session).overlapping(start, end)
+
+
+availability_index = AvailabilityIndex()
+
+
+def parse_window(start: datetime = None, end: datetime = None):
+    """
+    Normalize an optional date window. Returns None when neither bound is
+    given (= "available now"); a missing start means now, a missing end
+    means the single instant `start`.
+    """
+    if start is None and end is None:
+        return None
+    start = to_utc_naive(start) or datetime.utcnow()
+    end = to_utc_naive(end) or start
+    if end < start:
+        raise ValueError("end must not be before start")
+    return start, end
+
+
+def available_users(session: Session, statement, window=None) -> list:
+    """
+    Run a `select(User)` keeping only users free now (is_available) or,
+    with a window from parse_window(), free for all of it.
+    """
+    if window is None:
+        return session.exec(statement.where(User.is_available == True)).all()
+    busy = availability_index.busy_user_ids(*window, session)
+    return [u for u in session.exec(statement).all() if u.id not in busy]
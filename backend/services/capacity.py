@@ -0,0 +1,151 @@
+import json
+import os
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+from sqlmodel import Session, select
+
+from data.skills import DEPARTMENTS
+from models import User
+from services.availability import availability_index, busy_intervals
+
+CAPACITY_CACHE_TTL_SECONDS = float(os.getenv("CAPACITY_CACHE_TTL_SECONDS", 300))
+
+BUCKETS = {"day": timedelta(days=1), "week": timedelta(weeks=1)}
+
+# Skill / department name -> department ids (same rule as team building)
+_DEPT_LOOKUP = {}
+for _d in DEPARTMENTS:
+    for _name in [_d["name"], *_d["skills"]]:
+        _DEPT_LOOKUP.setdefault(_name, set()).add(_d["id"])
+
+
+def user_departments(skills) -> set:
+    try:
+        parsed = json.loads(skills) if isinstance(skills, str) else skills
+    except (TypeError, ValueError):
+        return set()
+
+    depts = set()
+    for s in parsed or []:
+        name = s.get("name") or ""
+        if name.startswith("Dept: "):
+            name = name[len("Dept: ") :]
+        depts |= _DEPT_LOOKUP.get(name, set())
+    return depts
+
+
+def _bucket_ranges(intervals, origin: datetime, step: timedelta, periods: int) -> list:
+    """Busy intervals -> merged, clipped (first, last) bucket index ranges."""
+    ranges = []
+    for start, end, _ in intervals:
+        first = max((start - origin) // step, 0)
+        last = min((end - origin) // step, periods - 1)
+        if first <= last:
+            ranges.append((first, last))
+    ranges.sort()
+
+    merged = []
+    for first, last in ranges:
+        if merged and first <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], last))
+        else:
+            merged.append((first, last))
+    return merged
+
+
+def compute_forecast(session: Session, start: date, periods: int, bucket: str = "day") -> dict:
+    """
+    Available people per department per bucket. A person counts in a
+    bucket when none of their busy intervals touches it. One sweep over
+    +1/-1 busy events per department instead of a query per day.
+    """
+    step = BUCKETS[bucket]
+    origin = datetime.combine(start, datetime.min.time())
+
+    headcount = {d["id"]: 0 for d in DEPARTMENTS}
+    user_depts = {}
+    for uid, skills in session.exec(select(User.id, User.skills)).all():
+        depts = user_departments(skills)
+        if depts:
+            user_depts[uid] = depts
+            for dept_id in depts:
+                headcount[dept_id] += 1
+
+    by_user = {}
+    for interval in busy_intervals(session):
+        if interval[2] in user_depts:
+            by_user.setdefault(interval[2], []).append(interval)
+
+    events = []
+    for uid, intervals in by_user.items():
+        for first, last in _bucket_ranges(intervals, origin, step, periods):
+            for dept_id in user_depts[uid]:
+                events.append((first, 1, dept_id))
+                events.append((last + 1, -1, dept_id))
+    events.sort()
+
+    busy = {d["id"]: 0 for d in DEPARTMENTS}
+    available = {d["id"]: [] for d in DEPARTMENTS}
+    i = 0
+    for period in range(periods):
+        while i < len(events) and events[i][0] <= period:
+            _, delta, dept_id = events[i]
+            busy[dept_id] += delta
+            i += 1
+        for dept_id, series in available.items():
+            series.append(headcount[dept_id] - busy[dept_id])
+
+    return {
+        "start": start.isoformat(),
+        "bucket": bucket,
+        "periods": [(origin + step * p).date().isoformat() for p in range(periods)],
+        "departments": [
+            {
+                "id": d["id"],
+                "name": d["name"],
+                "headcount": headcount[d["id"]],
+                "available": available[d["id"]],
+            }
+            for d in DEPARTMENTS
+        ],
+    }
+
+
+class ForecastCache:
+    """
+    Results keyed by (start, periods, bucket). Dropped whenever the
+    availability index is invalidated (quest transitions, releases) or
+    after the TTL, which also covers skill and membership edits.
+    """
+
+    def __init__(self, ttl: float = CAPACITY_CACHE_TTL_SECONDS):
+        self.ttl = ttl
+        self._entries = {}
+        self._version = None
+        self._lock = threading.Lock()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_or_compute(self, session: Session, start: date, periods: int, bucket: str) -> dict:
+        key = (start, periods, bucket)
+        with self._lock:
+            if self._version != availability_index.version:
+                self._entries.clear()
+                self._version = availability_index.version
+            cached = self._entries.get(key)
+            if cached and time.monotonic() - cached[0] < self.ttl:
+                return cached[1]
+            version = self._version
+
+        result = compute_forecast(session, start, periods, bucket)
+        with self._lock:
+            if availability_index.version == version:
+                self._entries[key] = (time.monotonic(), result)
+        return result
+
+
+forecast_cache = ForecastCache()
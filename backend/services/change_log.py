@@ -0,0 +1,87 @@
+"""
+Change log behind GET /changes?since=<cursor>.
+
+Every User/Quest write appends (entity, entity_id, op) rows: ORM writes
+through the before_flush listener in models, bulk statements through
+record_changes(). The autoincrement id is the client's cursor.
+
+Compaction keeps only the newest row per entity. Deletes stay as
+tombstones, so any cursor a client holds still yields every entity that
+changed after it; it may just see an entity once instead of several times.
+"""
+import os
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, func, insert
+from sqlmodel import Session, select
+
+from core.database import engine
+from models import ChangeLog
+from services.scheduler import scheduler
+
+COMPACT_JOB = "compact_change_log"
+CHANGE_LOG_COMPACT_INTERVAL_SECONDS = float(os.getenv("CHANGE_LOG_COMPACT_INTERVAL_SECONDS", 3600))
+CHANGES_PAGE_SIZE = int(os.getenv("CHANGES_PAGE_SIZE", 500))
+# Ids are assigned at flush, commits can land out of order: entries younger
+# than this are held back so a cursor never moves past an uncommitted one
+CHANGES_SETTLE_SECONDS = float(os.getenv("CHANGES_SETTLE_SECONDS", 2))
+
+
+def record_changes(session: Session, entity: str, ids, op: str = "upsert"):
+    """Log a bulk statement's rows; commits with the caller's transaction."""
+    now = datetime.utcnow()
+    rows = [{"entity": entity, "entity_id": i, "op": op, "changed_at": now} for i in ids]
+    if rows:
+        session.execute(insert(ChangeLog), rows)
+
+
+def read_changes(session: Session, since: int, limit: int = None, now: datetime = None, settle: float = None):
+    """
+    ({(entity, entity_id): op}, next cursor, has_more) for entries after
+    `since`. Several entries for one entity collapse to the newest.
+    Entries younger than the settle window wait for the next poll; they
+    don't count as `has_more`, so clients don't spin on an unmoved cursor.
+    """
+    limit = limit or CHANGES_PAGE_SIZE
+    settle = CHANGES_SETTLE_SECONDS if settle is None else settle
+    cutoff = (now or datetime.utcnow()) - timedelta(seconds=settle)
+
+    rows = session.exec(
+        select(ChangeLog).where(ChangeLog.id > since).order_by(ChangeLog.id).limit(limit + 1)
+    ).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    for i, row in enumerate(rows):
+        if row.changed_at > cutoff:
+            rows, has_more = rows[:i], False
+            break
+
+    changes = {}
+    for row in rows:
+        changes[(row.entity, row.entity_id)] = row.op
+    return changes, (rows[-1].id if rows else since), has_more
+
+
+def compact_change_log(session: Session = None) -> int:
+    """Drop every entry superseded by a newer one for the same entity."""
+    own_session = session is None
+    session = session or Session(engine)
+    try:
+        newest = select(func.max(ChangeLog.id)).group_by(ChangeLog.entity, ChangeLog.entity_id)
+        result = session.execute(delete(ChangeLog).where(ChangeLog.id.not_in(newest)))
+        session.commit()
+    finally:
+        if own_session:
+            session.close()
+
+    if result.rowcount:
+        print(f"Compacted {result.rowcount} change log entries.")
+    return result.rowcount
+
+
+def register_compaction_job():
+    return scheduler.add_job(
+        COMPACT_JOB,
+        compact_change_log,
+        interval=CHANGE_LOG_COMPACT_INTERVAL_SECONDS,
+    )
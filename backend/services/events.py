@@ -0,0 +1,213 @@
+"""
+Pub/sub hub behind the SSE endpoints in api/events.py.
+
+Handlers publish after their commit to topics "user:<id>" and
+"quest:<id>"; every open stream subscribed to one of them gets the event
+once. Each stream has a bounded queue (EVENT_QUEUE_SIZE): a client too
+slow to drain it is sent one "resync" event and disconnected, so it never
+holds memory or delays anyone else. It should then refetch (or poll
+/changes) and reconnect. Idle streams get a comment line every
+SSE_HEARTBEAT_SECONDS to keep proxies from closing them.
+
+Brokers (EVENT_BROKER):
+  memory  delivered in this process only (default; one worker)
+  redis   fanned out to every worker over Redis pub/sub (EVENT_BROKER_URL;
+          needs the `redis` package)
+"""
+import asyncio
+import json
+import os
+import threading
+from collections import defaultdict
+
+from core import metrics
+from core.sse import format_sse
+
+EVENT_BROKER = os.getenv("EVENT_BROKER", "memory")
+EVENT_BROKER_URL = os.getenv("EVENT_BROKER_URL", "redis://localhost:6379/0")
+EVENT_QUEUE_SIZE = int(os.getenv("EVENT_QUEUE_SIZE", 100))
+SSE_HEARTBEAT_SECONDS = float(os.getenv("SSE_HEARTBEAT_SECONDS", 15))
+
+HEARTBEAT = ": ping\n\n"
+RESYNC = format_sse({"reason": "too slow, events were dropped"}, event="resync")
+
+EVENTS_PUBLISHED = metrics.counter(
+    "kemii_events_published_total",
+    "Events published to the SSE hub, by event name.",
+    ["event"],
+)
+EVENT_STREAMS = metrics.gauge(
+    "kemii_event_streams",
+    "Open SSE event streams in this process.",
+)
+EVENT_STREAMS_DROPPED = metrics.counter(
+    "kemii_event_streams_dropped_total",
+    "SSE streams disconnected because their queue overflowed.",
+)
+
+
+class Subscription:
+    """One open stream: a bounded queue owned by the stream's event loop."""
+
+    def __init__(self, topics, loop, maxsize: int):
+        self.topics = tuple(topics)
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize)
+        self.overflowed = False
+
+    def offer(self, frame: str):
+        # Runs on self.loop
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            self.overflowed = True
+            EVENT_STREAMS_DROPPED.inc()
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC)
+
+
+class MemoryBroker:
+    """Single process: publishing is delivering."""
+
+    def start(self, deliver):
+        self.deliver = deliver
+
+    def publish(self, message: dict):
+        self.deliver(message)
+
+    def stop(self):
+        pass
+
+
+class RedisBroker:
+    """Every worker publishes to one channel and delivers what it receives."""
+
+    def __init__(self, url: str = EVENT_BROKER_URL, channel: str = "kemii:events"):
+        # Imported here: only needed when EVENT_BROKER=redis
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.channel = channel
+        self._pubsub = None
+        self._thread = None
+
+    def start(self, deliver):
+        self._pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        self._pubsub.subscribe(self.channel)
+
+        def listen():
+            for raw in self._pubsub.listen():
+                try:
+                    deliver(json.loads(raw["data"]))
+                except Exception as e:
+                    print(f"Event broker dropped a message: {e}")
+
+        self._thread = threading.Thread(target=listen, daemon=True)
+        self._thread.start()
+
+    def publish(self, message: dict):
+        self.client.publish(self.channel, json.dumps(message, ensure_ascii=False, default=str))
+
+    def stop(self):
+        if self._pubsub is not None:
+            self._pubsub.close()
+
+
+def make_broker(name: str = EVENT_BROKER):
+    if name == "redis":
+        return RedisBroker()
+    return MemoryBroker()
+
+
+class EventHub:
+    def __init__(self, broker=None, queue_size: int = EVENT_QUEUE_SIZE, heartbeat: float = SSE_HEARTBEAT_SECONDS):
+        self.queue_size = queue_size
+        self.heartbeat = heartbeat
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+        self.use(broker or MemoryBroker())
+
+    def use(self, broker):
+        """Swap the broker (tests, or redis fan-out)."""
+        self.broker = broker
+        broker.start(self.deliver)
+
+    def stop(self):
+        self.broker.stop()
+
+    def publish(self, topics, event: str, data: dict):
+        """Safe from any thread; call after the write has committed."""
+        EVENTS_PUBLISHED.inc(event=event)
+        self.broker.publish({"topics": list(topics), "event": event, "data": data})
+
+    def deliver(self, message: dict):
+        """Hand one broker message to this process's matching streams."""
+        frame = format_sse(message["data"], event=message["event"])
+        with self._lock:
+            targets = set()
+            for topic in message["topics"]:
+                targets.update(self._subscribers.get(topic, ()))
+        for sub in targets:
+            try:
+                sub.loop.call_soon_threadsafe(sub.offer, frame)
+            except RuntimeError:
+                # Its event loop is gone
+                self.unsubscribe(sub)
+
+    def subscribe(self, topics) -> Subscription:
+        sub = Subscription(topics, asyncio.get_running_loop(), self.queue_size)
+        with self._lock:
+            for topic in sub.topics:
+                self._subscribers[topic].add(sub)
+        EVENT_STREAMS.inc()
+        return sub
+
+    def unsubscribe(self, sub: Subscription):
+        with self._lock:
+            if not any(sub in self._subscribers.get(t, ()) for t in sub.topics):
+                return
+            for topic in sub.topics:
+                subs = self._subscribers.get(topic)
+                if subs is not None:
+                    subs.discard(sub)
+                    if not subs:
+                        del self._subscribers[topic]
+        EVENT_STREAMS.dec()
+
+    async def stream(self, topics):
+        """SSE frames for `topics` until the client leaves or falls behind."""
+        sub = self.subscribe(topics)
+        try:
+            yield HEARTBEAT
+            while True:
+                try:
+                    frame = await asyncio.wait_for(sub.queue.get(), self.heartbeat)
+                except asyncio.TimeoutError:
+                    yield HEARTBEAT
+                    continue
+                yield frame
+                if frame is RESYNC:
+                    return
+        finally:
+            self.unsubscribe(sub)
+
+
+event_hub = EventHub(make_broker())
+
+
+def quest_topics(quest, *extra_user_ids) -> list:
+    """The quest itself, its leader, its members and anyone in `extra_user_ids`."""
+    members = json.loads(quest.accepted_members) if quest.accepted_members else []
+    user_ids = dict.fromkeys([quest.leader_id, *members, *extra_user_ids])
+    return [f"quest:{quest.id}", *(f"user:{uid}" for uid in user_ids)]
+
+
+def publish_quest_event(quest, event: str, *extra_user_ids, **data):
+    event_hub.publish(
+        quest_topics(quest, *extra_user_ids),
+        event,
+        {"quest_id": quest.id, "status": quest.status, **data},
+    )
@@ -0,0 +1,167 @@
+import json
+import os
+
+from sqlmodel import Session, select
+
+from core.database import engine as default_engine
+from models import Quest, User
+from services.availability import ACTIVE_QUEST_STATUSES
+from services.matching import evaluate_team
+
+# Rows fetched per round trip; also the size of the member lookup batches
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", 1000))
+
+EXPORTS = ("users", "quests", "teams")
+
+
+def _json_list(value) -> list:
+    try:
+        return json.loads(value) if value else []
+    except (TypeError, ValueError):
+        return []
+
+
+def _iso(value):
+    return value.isoformat() if value else None
+
+
+def _ocean(u: User) -> dict:
+    return {
+        "O": u.ocean_openness,
+        "C": u.ocean_conscientiousness,
+        "E": u.ocean_extraversion,
+        "A": u.ocean_agreeableness,
+        "N": u.ocean_neuroticism,
+    }
+
+
+def _streamed(session: Session, statement, batch_size: int):
+    """
+    Yields lists of rows from a server-side cursor (yield_per). The identity
+    map only holds weak references, so each batch is freed once consumed.
+    """
+    result = session.exec(statement.execution_options(yield_per=batch_size))
+    try:
+        yield from result.partitions()
+    finally:
+        # Release the cursor even if the client disconnects mid-stream
+        result.close()
+
+
+def _harmony(team_users: list) -> dict:
+    """Same rule as /quests: leader plus accepted members, at least two people."""
+    if len(team_users) < 2:
+        return {"harmony_score": 0, "rating": None}
+    result = evaluate_team(team_users)
+    return {"harmony_score": int(round(result["score"])), "rating": result["rating"]}
+
+
+def _active_memberships(session: Session, batch_size: int) -> dict:
+    """
+    {user id: [quest ids]} for open/filled/in-progress quests. Only active
+    quests are held, which is bounded by headcount rather than history.
+    """
+    memberships = {}
+    statement = (
+        select(Quest.id, Quest.leader_id, Quest.accepted_members)
+        .where(Quest.status.in_(ACTIVE_QUEST_STATUSES))
+        .order_by(Quest.id)
+    )
+    for rows in _streamed(session, statement, batch_size):
+        for quest_id, leader_id, accepted in rows:
+            for uid in {leader_id, *_json_list(accepted)}:
+                memberships.setdefault(uid, []).append(quest_id)
+    return memberships
+
+
+def export_users(session: Session, batch_size: int = None):
+    batch_size = batch_size or EXPORT_BATCH_SIZE
+    memberships = _active_memberships(session, batch_size)
+
+    for users in _streamed(session, select(User).order_by(User.id), batch_size):
+        for u in users:
+            yield {
+                "id": u.id,
+                "name": u.name,
+                "email": u.email,
+                "role": u.role,
+                "character_class": u.character_class,
+                "level": u.level,
+                "ocean": _ocean(u),
+                "skills": _json_list(u.skills),
+                "is_available": u.is_available,
+                "active_project_end_date": _iso(u.active_project_end_date),
+                "active_quest_ids": memberships.get(u.id, []),
+            }
+
+
+def _quest_teams(session: Session, batch_size: int):
+    """Yields (quest, leader, members) with one member lookup per batch of quests."""
+    for quests in _streamed(session, select(Quest).order_by(Quest.id), batch_size):
+        user_ids = set()
+        for q in quests:
+            user_ids.add(q.leader_id)
+            user_ids.update(_json_list(q.accepted_members))
+        users_by_id = {
+            u.id: u for u in session.exec(select(User).where(User.id.in_(user_ids))).all()
+        }
+
+        for q in quests:
+            members = [users_by_id[uid] for uid in _json_list(q.accepted_members) if uid in users_by_id]
+            yield q, users_by_id.get(q.leader_id), members
+
+
+def export_quests(session: Session, batch_size: int = None):
+    for q, leader, members in _quest_teams(session, batch_size or EXPORT_BATCH_SIZE):
+        yield {
+            "id": q.id,
+            "title": q.title,
+            "rank": q.rank,
+            "status": q.status,
+            "required_skills": _json_list(q.required_skills),
+            "team_size": q.team_size,
+            "leader_id": q.leader_id,
+            "member_ids": [m.id for m in members],
+            "start_date": _iso(q.start_date),
+            "deadline": _iso(q.deadline),
+            "created_at": _iso(q.created_at),
+            **_harmony([leader] + members if leader and members else []),
+        }
+
+
+def export_teams(session: Session, batch_size: int = None):
+    """One record per quest that has accepted members, with member profiles."""
+    for q, leader, members in _quest_teams(session, batch_size or EXPORT_BATCH_SIZE):
+        if not members:
+            continue
+        team = ([leader] if leader else []) + members
+        harmony = _harmony(team if leader else [])
+        yield {
+            "quest_id": q.id,
+            "quest_title": q.title,
+            "status": q.status,
+            "leader_id": q.leader_id,
+            "members": [
+                {
+                    "id": u.id,
+                    "name": u.name,
+                    "character_class": u.character_class,
+                    "is_leader": u.id == q.leader_id,
+                    "ocean": _ocean(u),
+                    "skills": _json_list(u.skills),
+                }
+                for u in team
+            ],
+            **harmony,
+        }
+
+
+def export_lines(kind: str, engine=None, batch_size: int = None):
+    """NDJSON lines for one export; owns its session so it can outlive the request."""
+    if kind not in EXPORTS:
+        raise ValueError(f"export must be one of {EXPORTS}")
+    exporter = {"users": export_users, "quests": export_quests, "teams": export_teams}[kind]
+
+    with Session(engine or default_engine) as session:
+        for record in exporter(session, batch_size):
+            yield json.dumps(record, ensure_ascii=False) + "\n"
@@ -0,0 +1,75 @@
+class _Node:
+    __slots__ = ("center", "by_start", "by_end", "left", "right")
+
+    def __init__(self, center, by_start, by_end, left, right):
+        self.center = center
+        self.by_start = by_start
+        self.by_end = by_end
+        self.left = left
+        self.right = right
+
+
+class IntervalTree:
+    """
+    Static centered interval tree over closed intervals (start, end, key).
+    Built once in O(n log n); `overlapping(a, b)` returns the keys of every
+    interval intersecting [a, b] in O(log n + k). Rebuild to change it.
+    """
+
+    def __init__(self, intervals=()):
+        items = [(s, e, key) for s, e, key in intervals if s <= e]
+        self.size = len(items)
+        self.root = self._build(items)
+
+    def __len__(self):
+        return self.size
+
+    def _build(self, items):
+        if not items:
+            return None
+        points = sorted([s for s, _, _ in items] + [e for _, e, _ in items])
+        center = points[len(points) // 2]
+
+        here, left, right = [], [], []
+        for item in items:
+            if item[1] < center:
+                left.append(item)
+            elif item[0] > center:
+                right.append(item)
+            else:
+                here.append(item)
+
+        return _Node(
+            center,
+            sorted(here, key=lambda i: i[0]),
+            sorted(here, key=lambda i: i[1], reverse=True),
+            self._build(left),
+            self._build(right),
+        )
+
+    def overlapping(self, start, end) -> set:
+        found = set()
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            if node is None:
+                continue
+            if end < node.center:
+                # Everything here ends at/after center > end: only starts matter
+                for s, _, key in node.by_start:
+                    if s > end:
+                        break
+                    found.add(key)
+                stack.append(node.left)
+            elif start > node.center:
+                for _, e, key in node.by_end:
+                    if e < start:
+                        break
+                    found.add(key)
+                stack.append(node.right)
+            else:
+                # Window contains center, so does every interval stored here
+                found.update(key for _, _, key in node.by_start)
+                stack.append(node.left)
+                stack.append(node.right)
+        return found
@@ -126,6 +126,87 @@ def evaluate_team(users):
     return {"cost": round(cost, 3), "score": score, "rating": rating}
 
 
+def cost_from_sums(n: int, sums: dict, squares: dict) -> float:
+    """
+    Golden Formula from per-trait sums and sums of squares (n >= 2), so
+    callers can add or take out members without rescanning the team.
+    """
+
+    def var_star(t):
+        # Exact while the scores are integers; max() guards float input
+        var = max(0.0, (n * squares[t] - sums[t] * sums[t]) / (n * n))
+        return clamp01(var / VAR_MAX)
+
+    def xbar_star(t):
+        return clamp01((sums[t] / n - MIN_SCORE) / SCORE_RANGE)
+
+    return (
+        1.5 * var_star("C")
+        + 1.5 * var_star("A")
+        + 1.0 * var_star("E")
+        + 1.0 * var_star("O")
+        + 1.0 * xbar_star("N")
+        + LAMBDA * max(0.0, TAU - xbar_star("A"))
+    )
+
+
+class RunningTeamStats:
+    """
+    Golden Formula inputs kept as running sums (count, sum and sum of
+    squares per trait), so adding or removing a member is O(1) and the
+    cost never rescans the team. Same result as calculate_team_cost.
+    """
+
+    TRAITS = ("O", "C", "E", "A", "N")
+
+    def __init__(self):
+        self.n = 0
+        self.invalid = 0  # members with a missing OCEAN score
+        self.sums = dict.fromkeys(self.TRAITS, 0.0)
+        self.squares = dict.fromkeys(self.TRAITS, 0.0)
+
+    @staticmethod
+    def traits(u):
+        return {
+            "O": u.ocean_openness,
+            "C": u.ocean_conscientiousness,
+            "E": u.ocean_extraversion,
+            "A": u.ocean_agreeableness,
+            "N": u.ocean_neuroticism,
+        }
+
+    def _apply(self, u, sign: int):
+        self.n += sign
+        traits = self.traits(u)
+        if None in traits.values():
+            self.invalid += sign
+            return
+        for t, x in traits.items():
+            self.sums[t] += sign * x
+            self.squares[t] += sign * x * x
+
+    def add(self, u):
+        self._apply(u, 1)
+
+    def remove(self, u):
+        self._apply(u, -1)
+
+    def cost(self) -> float:
+        if self.n < 2:
+            return 0.0
+        if self.invalid:
+            return float("inf")
+        return cost_from_sums(self.n, self.sums, self.squares)
+
+    def evaluate(self) -> dict:
+        """Same shape as evaluate_team."""
+        cost = self.cost()
+        if cost == float("inf"):
+            return {"cost": float("inf"), "score": 0.0, "rating": "Invalid Data"}
+        score = cost_to_score(cost)
+        return {"cost": round(cost, 3), "score": score, "rating": get_team_rating(score)}
+
+
 def calculate_academic_cost(team_stats_list):
     """Adapter for legacy dict inputs."""
 
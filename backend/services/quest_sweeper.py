@@ -0,0 +1,147 @@
+import json
+import os
+from datetime import datetime
+
+from sqlalchemy import update
+from sqlmodel import Session, select
+
+from core.database import engine
+from models import Quest, User
+from services.availability import (
+    ACTIVE_QUEST_STATUSES,
+    availability_index,
+    other_commitments,
+    schedule_release,
+    to_utc_naive,
+)
+from services.change_log import record_changes
+from services.scheduler import ExpirationHeap, scheduler
+
+SWEEP_JOB = "sweep_overdue_quests"
+
+TERMINAL_QUEST_STATUSES = ["completed", "failed", "cancelled"]
+
+QUEST_OVERDUE_STATUS = os.getenv("QUEST_OVERDUE_STATUS", "failed")
+if QUEST_OVERDUE_STATUS not in TERMINAL_QUEST_STATUSES:
+    raise ValueError(
+        f"QUEST_OVERDUE_STATUS must be one of {TERMINAL_QUEST_STATUSES}, got '{QUEST_OVERDUE_STATUS}'"
+    )
+
+QUEST_SWEEP_BATCH_SIZE = int(os.getenv("QUEST_SWEEP_BATCH_SIZE", 500))
+QUEST_SWEEP_INTERVAL_SECONDS = float(os.getenv("QUEST_SWEEP_INTERVAL_SECONDS", 300))
+
+deadline_heap = ExpirationHeap()
+
+
+def sweep_overdue_quests(
+    session: Session = None,
+    now: datetime = None,
+    terminal_status: str = None,
+    batch_size: int = None,
+) -> int:
+    """
+    Move active quests past their deadline to the terminal status and
+    release their members. Works in batches: one SELECT plus two bulk
+    UPDATEs per batch, each batch in its own transaction.
+    """
+    now = now or datetime.utcnow()
+    terminal_status = terminal_status or QUEST_OVERDUE_STATUS
+    batch_size = batch_size or QUEST_SWEEP_BATCH_SIZE
+    own_session = session is None
+    session = session or Session(engine)
+
+    swept = 0
+    try:
+        while True:
+            rows = session.exec(
+                select(Quest.id, Quest.accepted_members)
+                .where(
+                    Quest.status.in_(ACTIVE_QUEST_STATUSES),
+                    Quest.deadline != None,
+                    Quest.deadline < now,
+                )
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                break
+
+            quest_ids = [quest_id for quest_id, _ in rows]
+            member_ids = set()
+            for _, accepted in rows:
+                member_ids.update(json.loads(accepted) if accepted else [])
+
+            session.execute(
+                update(Quest)
+                .where(Quest.id.in_(quest_ids))
+                .values(status=terminal_status, version=Quest.version + 1)
+            )
+            # Members still on another active quest stay busy until its
+            # latest deadline; everyone else is freed
+            busy = other_commitments(session, member_ids, quest_ids)
+            free_ids = member_ids - busy.keys()
+            if free_ids:
+                session.execute(
+                    update(User)
+                    .where(User.id.in_(free_ids))
+                    .values(
+                        is_available=True,
+                        active_project_end_date=None,
+                        version=User.version + 1,
+                    )
+                )
+            by_end_date = {}
+            for uid, end_date in busy.items():
+                by_end_date.setdefault(end_date, []).append(uid)
+            for uid, end_date in busy.items():
+                if end_date:
+                    schedule_release(uid, end_date)
+            for end_date, uids in by_end_date.items():
+                session.execute(
+                    update(User)
+                    .where(User.id.in_(uids))
+                    .values(
+                        is_available=False,
+                        active_project_end_date=end_date,
+                        version=User.version + 1,
+                    )
+                )
+            record_changes(session, "quest", quest_ids)
+            record_changes(session, "user", sorted(member_ids))
+            session.commit()
+            swept += len(quest_ids)
+
+            if len(rows) < batch_size:
+                break
+    finally:
+        if own_session:
+            session.close()
+
+    deadline_heap.pop_due(now)
+    if swept:
+        availability_index.invalidate()
+        print(f"Marked {swept} overdue quests as '{terminal_status}'.")
+    return swept
+
+
+def schedule_deadline(quest_id: str, deadline: datetime):
+    """Call after creating a quest with a deadline."""
+    deadline = to_utc_naive(deadline)
+    if deadline and deadline_heap.push(quest_id, deadline):
+        scheduler.wake(SWEEP_JOB)
+
+
+def register_sweep_job():
+    with Session(engine) as session:
+        deadline_heap.load(
+            session.exec(
+                select(Quest.id, Quest.deadline).where(
+                    Quest.status.in_(ACTIVE_QUEST_STATUSES), Quest.deadline != None
+                )
+            ).all()
+        )
+    return scheduler.add_job(
+        SWEEP_JOB,
+        sweep_overdue_quests,
+        interval=QUEST_SWEEP_INTERVAL_SECONDS,
+        next_due=deadline_heap.peek,
+    )
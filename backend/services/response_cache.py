@@ -0,0 +1,278 @@
+"""
+Response cache for the hot read endpoints (quest list/detail, team
+analysis, roster, user list).
+
+Entries are fresh for RESPONSE_CACHE_TTL_SECONDS, then served stale for
+up to RESPONSE_CACHE_SWR_SECONDS more while one background refresh
+recomputes them. Each entry is tagged ("quests", "quest:<id>", "users";
+"quest:*" stands for bulk quest writes whose ids are unknown).
+Committed writes publish their tags and bump a per-tag generation, and an
+entry computed under older generations is never served. ORM writes and
+bulk statements on User/Quest publish automatically (listeners below);
+nothing else has to remember to invalidate.
+
+Backends (RESPONSE_CACHE_BACKEND):
+  memory  per-process LRU (default; one worker)
+  redis   shared between workers (RESPONSE_CACHE_URL; needs the `redis`
+          package; LRU comes from the server's maxmemory-policy)
+  none    caching disabled
+FakeBackend is an in-memory backend with a manual clock for tests.
+"""
+import json
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import event
+from sqlalchemy.orm import Session as OrmSession
+from sqlmodel import Session
+
+from core import metrics
+from models import Quest, User
+
+RESPONSE_CACHE_BACKEND = os.getenv("RESPONSE_CACHE_BACKEND", "memory")
+RESPONSE_CACHE_URL = os.getenv("RESPONSE_CACHE_URL", "redis://localhost:6379/0")
+RESPONSE_CACHE_TTL_SECONDS = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", 30))
+RESPONSE_CACHE_SWR_SECONDS = float(os.getenv("RESPONSE_CACHE_SWR_SECONDS", 30))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", 1000))
+
+CACHE_LOOKUPS = metrics.counter(
+    "kemii_response_cache_lookups_total",
+    "Response cache lookups by endpoint and result (hit, stale, miss).",
+    ["endpoint", "result"],
+)
+
+
+class MemoryBackend:
+    """Per-process LRU; generations live in the same process."""
+
+    def __init__(self, max_entries: int = RESPONSE_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._generations = {}
+        self._lock = threading.Lock()
+
+    def now(self) -> float:
+        return time.time()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry["stale_until"] <= self.now():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: dict, expire_seconds: float):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def generations(self, tags) -> list:
+        with self._lock:
+            return [self._generations.get(t, 0) for t in tags]
+
+    def bump(self, tags):
+        with self._lock:
+            for t in tags:
+                self._generations[t] = self._generations.get(t, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._generations.clear()
+
+
+class FakeBackend(MemoryBackend):
+    """MemoryBackend with a manual clock and a log of published tags."""
+
+    def __init__(self, max_entries: int = RESPONSE_CACHE_MAX_ENTRIES):
+        super().__init__(max_entries)
+        self.clock = 0.0
+        self.published = []
+
+    def now(self) -> float:
+        return self.clock
+
+    def advance(self, seconds: float):
+        self.clock += seconds
+
+    def bump(self, tags):
+        self.published.extend(tags)
+        super().bump(tags)
+
+
+class RedisBackend:
+    """Shared store for multi-worker deployments; entries expire server-side."""
+
+    def __init__(self, url: str = RESPONSE_CACHE_URL, prefix: str = "kemii:cache:"):
+        # Imported here: only needed when RESPONSE_CACHE_BACKEND=redis
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def now(self) -> float:
+        return time.time()
+
+    def get(self, key: str):
+        raw = self.client.get(self.prefix + key)
+        return json.loads(raw) if raw else None
+
+    def set(self, key: str, entry: dict, expire_seconds: float):
+        self.client.set(
+            self.prefix + key, json.dumps(entry), ex=max(1, math.ceil(expire_seconds))
+        )
+
+    def generations(self, tags) -> list:
+        values = self.client.mget([f"{self.prefix}tag:{t}" for t in tags])
+        return [int(v or 0) for v in values]
+
+    def bump(self, tags):
+        pipe = self.client.pipeline()
+        for t in tags:
+            pipe.incr(f"{self.prefix}tag:{t}")
+        pipe.execute()
+
+    def clear(self):
+        for key in self.client.scan_iter(self.prefix + "*"):
+            self.client.delete(key)
+
+
+def make_backend(name: str = RESPONSE_CACHE_BACKEND):
+    if name == "none":
+        return None
+    if name == "redis":
+        return RedisBackend()
+    if name == "fake":
+        return FakeBackend()
+    return MemoryBackend()
+
+
+class ResponseCache:
+    def __init__(self, backend=None, ttl: float = RESPONSE_CACHE_TTL_SECONDS, swr: float = RESPONSE_CACHE_SWR_SECONDS):
+        self.backend = backend
+        self.ttl = ttl
+        self.swr = swr
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+    def use(self, backend):
+        """Swap the backend (None disables caching)."""
+        self.backend = backend
+
+    def publish(self, *tags):
+        """Invalidate every entry carrying one of `tags`."""
+        if self.backend is not None and tags:
+            self.backend.bump(sorted(set(tags)))
+
+    def get_or_compute(self, endpoint: str, key_parts, tags, compute, session: Session):
+        """
+        `compute(session)` builds the JSON-able value; it runs with the
+        request session on a miss and with a fresh session when a stale
+        entry is refreshed in the background.
+        """
+        if self.backend is None:
+            return compute(session)
+
+        key = json.dumps([endpoint, *key_parts], default=str)
+        entry = self.backend.get(key)
+        if entry is not None and entry["gens"] == self.backend.generations(tags):
+            if self.backend.now() < entry["fresh_until"]:
+                CACHE_LOOKUPS.inc(endpoint=endpoint, result="hit")
+                return entry["value"]
+            if self.backend.now() < entry["stale_until"]:
+                CACHE_LOOKUPS.inc(endpoint=endpoint, result="stale")
+                self._refresh(key, tags, compute, session.get_bind())
+                return entry["value"]
+
+        CACHE_LOOKUPS.inc(endpoint=endpoint, result="miss")
+        return self._store(key, tags, compute, session)
+
+    def _store(self, key: str, tags, compute, session: Session):
+        # Generations are read first: a write that lands while computing
+        # leaves this entry outdated instead of hiding the write
+        gens = self.backend.generations(tags)
+        value = jsonable_encoder(compute(session))
+        now = self.backend.now()
+        self.backend.set(
+            key,
+            {
+                "value": value,
+                "gens": gens,
+                "fresh_until": now + self.ttl,
+                "stale_until": now + self.ttl + self.swr,
+            },
+            self.ttl + self.swr,
+        )
+        return value
+
+    def _refresh(self, key: str, tags, compute, bind):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def run():
+            try:
+                with Session(bind) as session:
+                    self._store(key, tags, compute, session)
+            except Exception as e:
+                print(f"Response cache refresh failed for {key}: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=run, daemon=True).start()
+
+
+response_cache = ResponseCache(make_backend())
+
+
+def _tags_for(obj) -> tuple:
+    if isinstance(obj, User):
+        return ("users",)
+    if isinstance(obj, Quest):
+        return ("quests", f"quest:{obj.id}")
+    return ()
+
+
+@event.listens_for(OrmSession, "after_flush")
+def _collect_flushed(session, flush_context):
+    tags = session.info.setdefault("cache_tags", set())
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        tags.update(_tags_for(obj))
+
+
+@event.listens_for(OrmSession, "do_orm_execute")
+def _collect_bulk(orm_execute_state):
+    """Bulk insert/update/delete statements on User or Quest."""
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    tags = orm_execute_state.session.info.setdefault("cache_tags", set())
+    if mapper is not None and mapper.class_ is User:
+        tags.add("users")
+    elif mapper is not None and mapper.class_ is Quest:
+        # Which quests is unknown here, so every per-quest entry goes
+        tags.update(("quests", "quest:*"))
+
+
+@event.listens_for(OrmSession, "after_commit")
+def _publish_committed(session):
+    tags = session.info.pop("cache_tags", None)
+    if tags:
+        response_cache.publish(*tags)
+
+
+@event.listens_for(OrmSession, "after_rollback")
+def _drop_rolled_back(session):
+    session.info.pop("cache_tags", None)
@@ -0,0 +1,162 @@
+import asyncio
+import heapq
+import threading
+import time
+from datetime import datetime
+
+from core import metrics
+
+JOB_DURATION = metrics.histogram(
+    "kemii_scheduler_job_duration_seconds",
+    "Wall time of one background job run.",
+    ["job"],
+)
+JOB_ITEMS = metrics.counter(
+    "kemii_scheduler_job_items_total",
+    "Rows changed by background jobs.",
+    ["job"],
+)
+JOB_ERRORS = metrics.counter(
+    "kemii_scheduler_job_errors_total",
+    "Background job runs that raised.",
+    ["job"],
+)
+JOB_LAST_RUN = metrics.gauge(
+    "kemii_scheduler_job_last_run_timestamp_seconds",
+    "Unix time of the last completed run.",
+    ["job"],
+)
+
+
+class PeriodicJob:
+    """
+    Runs `func` (sync, DB work -> executed in a thread) every `interval`
+    seconds, or earlier when `next_due()` says something is due sooner.
+    `wake()` re-evaluates the sleep immediately (e.g. a nearer due date).
+    """
+
+    def __init__(self, name: str, func, interval: float, next_due=None):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.next_due = next_due
+        self.loop = None
+        self._wake = None
+        self.last_result = None
+
+    def run_once(self):
+        start = time.perf_counter()
+        try:
+            result = self.func()
+        except Exception as e:
+            JOB_ERRORS.inc(job=self.name)
+            print(f"Scheduler job '{self.name}' failed: {e!r}")
+            return None
+        finally:
+            JOB_DURATION.observe(time.perf_counter() - start, job=self.name)
+
+        JOB_LAST_RUN.set(time.time(), job=self.name)
+        if isinstance(result, int) and result:
+            JOB_ITEMS.inc(result, job=self.name)
+        self.last_result = result
+        return result
+
+    def seconds_until_next_run(self) -> float:
+        delay = self.interval
+        due = self.next_due() if self.next_due else None
+        if due is not None:
+            delay = min(delay, (due - datetime.utcnow()).total_seconds())
+        return max(delay, 0.0)
+
+    async def run_forever(self):
+        self.loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        while True:
+            await asyncio.to_thread(self.run_once)
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.seconds_until_next_run())
+            except asyncio.TimeoutError:
+                pass
+
+    def wake(self):
+        """Thread-safe: callable from sync endpoints."""
+        if self.loop and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self._wake.set)
+
+
+class ExpirationHeap:
+    """
+    Min-heap of (due_date, key) so a job can sleep until exactly the next
+    expiration. Entries may go stale (kick, complete...); the job's bulk
+    UPDATE is authoritative, the heap only times it.
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._heap)
+
+    def push(self, key: str, due_date: datetime) -> bool:
+        """Returns True if this is now the earliest expiration."""
+        with self._lock:
+            heapq.heappush(self._heap, (due_date, key))
+            return self._heap[0] == (due_date, key)
+
+    def peek(self):
+        with self._lock:
+            return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: datetime) -> list:
+        due = []
+        with self._lock:
+            while self._heap and self._heap[0][0] < now:
+                due.append(heapq.heappop(self._heap)[1])
+        return due
+
+    def clear(self):
+        with self._lock:
+            self._heap.clear()
+
+    def load(self, rows):
+        """rows: iterable of (key, due_date)."""
+        with self._lock:
+            self._heap = [(due, key) for key, due in rows if due is not None]
+            heapq.heapify(self._heap)
+
+
+class Scheduler:
+    """Background jobs started and stopped with the app lifespan."""
+
+    def __init__(self):
+        self.jobs = {}
+        self.tasks = []
+
+    def add_job(self, name: str, func, interval: float, next_due=None) -> PeriodicJob:
+        job = PeriodicJob(name, func, interval, next_due)
+        self.jobs[name] = job
+        return job
+
+    def start(self):
+        if self.tasks:
+            return
+        self.tasks = [
+            asyncio.create_task(job.run_forever(), name=f"job:{name}")
+            for name, job in self.jobs.items()
+        ]
+
+    async def stop(self):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+
+    def wake(self, name: str):
+        job = self.jobs.get(name)
+        if job:
+            job.wake()
+
+
+scheduler = Scheduler()
@@ -0,0 +1,64 @@
+from collections import Counter
+
+from services.matching import RunningTeamStats
+
+
+class TeamDraft:
+    """
+    Server-side draft team for the live team builder (/teams/draft/ws).
+
+    Adding or removing a member updates the running OCEAN sums and the
+    per-department coverage counts in O(departments), so the snapshot
+    pushed after each change never rescans the team.
+    """
+
+    def __init__(self, requirements: list, matcher):
+        # requirements: [{"dept_id", "name", "skills": set, "count"}]
+        # matcher(user, dept_name, dept_skills) -> bool
+        self.requirements = requirements
+        self.matcher = matcher
+        self.stats = RunningTeamStats()
+        self.members = {}  # user id -> (user, matched dept ids)
+        self.coverage = Counter()
+
+    def add(self, user) -> bool:
+        if user.id in self.members:
+            return False
+        depts = [
+            r["dept_id"]
+            for r in self.requirements
+            if self.matcher(user, r["name"], r["skills"])
+        ]
+        self.members[user.id] = (user, depts)
+        self.coverage.update(depts)
+        self.stats.add(user)
+        return True
+
+    def remove(self, user_id: str) -> bool:
+        entry = self.members.pop(user_id, None)
+        if entry is None:
+            return False
+        user, depts = entry
+        self.coverage.subtract(depts)
+        self.stats.remove(user)
+        return True
+
+    def snapshot(self) -> dict:
+        coverage = [
+            {
+                "department_id": r["dept_id"],
+                "name": r["name"],
+                "required": r["count"],
+                "have": self.coverage[r["dept_id"]],
+            }
+            for r in self.requirements
+        ]
+        result = self.stats.evaluate()
+        if result["cost"] == float("inf"):
+            result["cost"] = None  # not valid JSON
+        return {
+            "member_ids": list(self.members),
+            **result,
+            "coverage": coverage,
+            "covered": all(c["have"] >= c["required"] for c in coverage),
+        }
@@ -0,0 +1,132 @@
+import heapq
+import random
+
+from services.matching import RunningTeamStats, calculate_team_cost, cost_from_sums
+
+# Stop early once a team is at least this harmonious (cost, lower is better)
+OPTIMAL_COST_THRESHOLD = 0.6
+DEFAULT_ITERATIONS = 1000
+
+
+def optimize_team(
+    req_pools: list,
+    iterations: int = DEFAULT_ITERATIONS,
+    cost_threshold: float = OPTIMAL_COST_THRESHOLD,
+    rng=random,
+):
+    """
+    Random-restart search with elite mutation over the department pools
+    ([{"dept_id", "count", "pool": [User]}]). Returns (best_team, best_cost)
+    where best_team is [{"user", "role"}] or None if no team fits.
+    """
+    best_team = None
+    best_cost = float("inf")
+
+    for i in range(iterations):
+        if best_team and best_cost <= cost_threshold:
+            break
+
+        current_team = []
+        possible = True
+
+        # Biased Sampling (Elite Retention / Mutation)
+        if best_team and rng.random() < 0.7:
+            current_team = list(best_team)
+            idx_to_change = rng.randint(0, len(current_team) - 1)
+            role_needed = current_team[idx_to_change]["role"]
+            target_pool = next(
+                (p for p in req_pools if p["dept_id"] == role_needed), None
+            )
+
+            if target_pool:
+                current_ids = {m["user"].id for m in current_team}
+                available = [u for u in target_pool["pool"] if u.id not in current_ids]
+                if available:
+                    new_user = rng.choice(available)
+                    current_team[idx_to_change] = {
+                        "user": new_user,
+                        "role": role_needed,
+                    }
+                else:
+                    current_team = []
+            else:
+                current_team = []
+
+        # Random Restart
+        if not current_team:
+            used_ids = set()
+            for item in req_pools:
+                pool = item["pool"]
+                count = item["count"]
+
+                available = [u for u in pool if u.id not in used_ids]
+
+                if len(available) < count:
+                    possible = False
+                    break
+
+                picked = rng.sample(available, count)
+                for p in picked:
+                    current_team.append({"user": p, "role": item["dept_id"]})
+                    used_ids.add(p.id)
+
+        if possible and current_team:
+            team_users = [t["user"] for t in current_team]
+            cost = calculate_team_cost(team_users)
+
+            if cost < best_cost:
+                best_cost = cost
+                best_team = current_team
+
+    return best_team, best_cost
+
+
+def best_swaps(team: list, members: list, candidates: list, limit: int = 10):
+    """
+    Best single replacements (member out, candidate in) by Golden Formula
+    cost. `team` is everyone scored (leader included); only `members` can
+    be swapped out. The team's sums are built once; taking a member out
+    (leave-one-out) and putting a candidate in is then O(1) per pair
+    instead of a calculate_team_cost rescan.
+
+    Returns (current_cost, [(cost, member, candidate)]), best first, only
+    swaps that lower the cost.
+    """
+    stats = RunningTeamStats()
+    for u in team:
+        stats.add(u)
+    current = stats.cost()
+    n = stats.n
+    if n < 2:
+        return current, []
+
+    traits = RunningTeamStats.TRAITS
+    pool = []
+    for c in candidates:
+        ct = RunningTeamStats.traits(c)
+        if None not in ct.values():
+            pool.append((c, ct))
+
+    def swaps():
+        for m in members:
+            mt = RunningTeamStats.traits(m)
+            m_invalid = None in mt.values()
+            if stats.invalid - m_invalid:
+                continue  # someone else's scores are missing: every swap is invalid
+            out_sums = dict(stats.sums)
+            out_squares = dict(stats.squares)
+            if not m_invalid:
+                for t in traits:
+                    out_sums[t] -= mt[t]
+                    out_squares[t] -= mt[t] * mt[t]
+
+            for c, ct in pool:
+                cost = cost_from_sums(
+                    n,
+                    {t: out_sums[t] + ct[t] for t in traits},
+                    {t: out_squares[t] + ct[t] * ct[t] for t in traits},
+                )
+                if cost < current:
+                    yield cost, m, c
+
+    return current, heapq.nsmallest(limit, swaps(), key=lambda s: s[0])
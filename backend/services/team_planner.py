@@ -0,0 +1,199 @@
+"""
+Global staffing of many draft quests at once (POST /teams/plan).
+
+1. Assignment: users go to department slots by min-cost flow
+   (source -> user -> department -> sink, cost = -match score). The match
+   score only depends on the department, so every shortest path runs on
+   a graph of departments. Edges S->d are the best free user for d.
+   Edges a->b are the cheapest move of a user from a to b, and d->T
+   exists while d has open slots. Per-edge heaps keep the path search
+   O(departments^3) however many users there are.
+2. Harmony refinement: users of the same department are swapped between
+   quests when that lowers the summed Golden Formula cost. The total
+   match score does not change.
+"""
+import heapq
+import os
+import random
+
+from services.matching import RunningTeamStats, cost_from_sums
+
+TEAM_PLAN_REFINE_ITERATIONS = int(os.getenv("TEAM_PLAN_REFINE_ITERATIONS", 20000))
+
+INF = float("inf")
+
+
+class _Heap:
+    """Min-heap with lazy deletion: stale entries are skipped on peek."""
+
+    def __init__(self):
+        self.items = []
+
+    def push(self, cost, uid):
+        heapq.heappush(self.items, (cost, uid))
+
+    def peek(self, valid):
+        while self.items and not valid(self.items[0][1]):
+            heapq.heappop(self.items)
+        return self.items[0] if self.items else None
+
+
+def assign_departments(demand: dict, scores: dict) -> dict:
+    """
+    Max total match score assignment of users to department slots.
+    demand {dept_id: slots}; scores {user_id: {dept_id: score}} for the
+    departments each user may fill. Returns {user_id: dept_id}; slots that
+    no eligible user can fill stay empty.
+    """
+    depts = [d for d, n in demand.items() if n > 0]
+    remaining = {d: demand[d] for d in depts}
+    assigned = {}
+    entry = {d: _Heap() for d in depts}
+    moves = {(a, b): _Heap() for a in depts for b in depts if a != b}
+
+    for uid, by_dept in scores.items():
+        for d, score in by_dept.items():
+            if d in entry:
+                entry[d].push(-score, uid)
+
+    def place(uid, d):
+        assigned[uid] = d
+        for b, score in scores[uid].items():
+            if b != d and b in entry:
+                moves[(d, b)].push(scores[uid][d] - score, uid)
+
+    is_free = lambda uid: uid not in assigned
+    while True:
+        # Bellman-Ford from S over the department graph (no negative
+        # cycles: successive shortest paths keep the flow optimal)
+        dist = {d: INF for d in depts}
+        via = {}
+        for d in depts:
+            top = entry[d].peek(is_free)
+            if top:
+                dist[d], via[d] = top[0], None
+        for _ in range(len(depts)):
+            changed = False
+            for (a, b), heap in moves.items():
+                if dist[a] == INF:
+                    continue
+                top = heap.peek(lambda uid, a=a: assigned.get(uid) == a)
+                if top and dist[a] + top[0] < dist[b]:
+                    dist[b], via[b] = dist[a] + top[0], a
+                    changed = True
+            if not changed:
+                break
+
+        open_depts = [d for d in depts if remaining[d] > 0 and dist[d] < INF]
+        if not open_depts:
+            return assigned
+        end = min(open_depts, key=lambda d: (dist[d], d))
+
+        path = [end]
+        while via[path[-1]] is not None:
+            path.append(via[path[-1]])
+        path.reverse()
+
+        # Apply from the sink side so earlier moves can't change later heaps
+        for a, b in reversed(list(zip(path, path[1:]))):
+            uid = moves[(a, b)].peek(lambda uid, a=a: assigned.get(uid) == a)[1]
+            place(uid, b)
+        place(entry[path[0]].peek(is_free)[1], path[0])
+        remaining[end] -= 1
+
+
+def plan_teams(
+    quests: list,
+    users_by_id: dict,
+    scores: dict,
+    refine_iterations: int = None,
+    rng=random,
+):
+    """
+    quests [{"key", "slots": {dept_id: count}}]. Returns one
+    {"key", "members": [(user, dept_id)], "unfilled": {dept_id: n}} per
+    quest, in order.
+    """
+    refine_iterations = TEAM_PLAN_REFINE_ITERATIONS if refine_iterations is None else refine_iterations
+    demand = {}
+    for q in quests:
+        for d, n in q["slots"].items():
+            demand[d] = demand.get(d, 0) + n
+    assigned = assign_departments(demand, scores)
+
+    # Deal each department's users to its quests, best scores first
+    by_dept = {}
+    for uid, d in assigned.items():
+        by_dept.setdefault(d, []).append(uid)
+    teams = [[] for _ in quests]  # [(uid, dept)]
+    unfilled = [dict(q["slots"]) for q in quests]
+    for d, uids in by_dept.items():
+        uids.sort(key=lambda uid: (-scores[uid][d], uid))
+        open_quests = [i for i, q in enumerate(quests) if q["slots"].get(d)]
+        k = 0
+        for uid in uids:
+            # Round-robin over the quests that still have a slot for d
+            while not unfilled[open_quests[k % len(open_quests)]][d]:
+                k += 1
+            i = open_quests[k % len(open_quests)]
+            teams[i].append((uid, d))
+            unfilled[i][d] -= 1
+            k += 1
+
+    _refine(teams, users_by_id, refine_iterations, rng)
+    return [
+        {
+            "key": q["key"],
+            "members": [(users_by_id[uid], d) for uid, d in teams[i]],
+            "unfilled": {d: n for d, n in unfilled[i].items() if n},
+        }
+        for i, q in enumerate(quests)
+    ]
+
+
+def _refine(teams: list, users_by_id: dict, iterations: int, rng):
+    """Random same-department swaps between quests, kept when they lower total cost."""
+    stats = []
+    for team in teams:
+        s = RunningTeamStats()
+        for uid, _ in team:
+            s.add(users_by_id[uid])
+        stats.append(s)
+
+    # Positions per department: [(quest index, member index)]
+    slots = {}
+    for i, team in enumerate(teams):
+        for j, (_, d) in enumerate(team):
+            slots.setdefault(d, []).append((i, j))
+    swappable = [d for d, pos in slots.items() if len({i for i, _ in pos}) > 1]
+    if not swappable:
+        return
+
+    traits = RunningTeamStats.TRAITS
+
+    def cost_with(s, out, into):
+        """Cost of `s` with one member's traits `out` replaced by `into`."""
+        if s.n < 2:
+            return 0.0
+        out_ok = None not in out.values()
+        if s.invalid - (not out_ok) or None in into.values():
+            return INF
+        sums = {t: s.sums[t] - (out[t] if out_ok else 0) + into[t] for t in traits}
+        squares = {t: s.squares[t] - (out[t] ** 2 if out_ok else 0) + into[t] ** 2 for t in traits}
+        return cost_from_sums(s.n, sums, squares)
+
+    for _ in range(iterations):
+        pos = slots[rng.choice(swappable)]
+        (i, a), (k, b) = rng.sample(pos, 2)
+        if i == k:
+            continue
+        u, v = users_by_id[teams[i][a][0]], users_by_id[teams[k][b][0]]
+        tu, tv = RunningTeamStats.traits(u), RunningTeamStats.traits(v)
+        before = stats[i].cost() + stats[k].cost()
+        after = cost_with(stats[i], tu, tv) + cost_with(stats[k], tv, tu)
+        if after < before:
+            stats[i].remove(u)
+            stats[i].add(v)
+            stats[k].remove(v)
+            stats[k].add(u)
+            teams[i][a], teams[k][b] = (v.id, teams[i][a][1]), (u.id, teams[k][b][1])
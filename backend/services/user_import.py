@@ -0,0 +1,182 @@
+import csv
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select
+from ulid import ULID
+
+from core.auth import get_password_hash
+from core.database import engine as default_engine
+from models import User
+from schemas import UserImportRecord
+from services.change_log import record_changes
+
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", 1000))
+# pbkdf2 runs in hashlib with the GIL released, so threads use every core
+IMPORT_HASH_WORKERS = int(os.getenv("IMPORT_HASH_WORKERS", os.cpu_count() or 2))
+MAX_REPORTED_ERRORS = 100
+
+FORMATS = ("ndjson", "csv")
+
+
+def read_records(lines, fmt: str = "ndjson"):
+    """Yields (line_no, dict | error message) without loading the whole input."""
+    if fmt == "csv":
+        reader = csv.DictReader(lines)
+        for row in reader:
+            # Empty cells mean "use the default", not ""
+            yield reader.line_num, {k: v for k, v in row.items() if k and v not in ("", None)}
+        return
+
+    for line_no, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield line_no, f"invalid JSON: {e}"
+            continue
+        yield line_no, record if isinstance(record, dict) else "expected a JSON object"
+
+
+def _chunks(iterable, size: int):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _validation_message(e: ValidationError) -> str:
+    err = e.errors()[0]
+    loc = ".".join(str(part) for part in err["loc"])
+    return f"{loc}: {err['msg']}" if loc else err["msg"]
+
+
+def hash_passwords(passwords: list, executor: ThreadPoolExecutor) -> list:
+    """Hashes in parallel; None stays None (account without a password)."""
+    return list(executor.map(lambda p: get_password_hash(p) if p else None, passwords))
+
+
+def _user_row(record: UserImportRecord, hashed_password: str) -> dict:
+    return {
+        "id": str(ULID()),
+        "name": record.name,
+        "email": record.email,
+        "hashed_password": hashed_password,
+        "role": record.role,
+        "character_class": record.character_class,
+        "level": record.level,
+        "ocean_openness": record.ocean_openness,
+        "ocean_conscientiousness": record.ocean_conscientiousness,
+        "ocean_extraversion": record.ocean_extraversion,
+        "ocean_agreeableness": record.ocean_agreeableness,
+        "ocean_neuroticism": record.ocean_neuroticism,
+        "is_available": True,
+        "team_name": None,
+        "analysis_result": None,
+        "analysis_status": "pending",
+        "analysis_started_at": None,
+        "skills": json.dumps([s.model_dump() for s in record.skills], ensure_ascii=False),
+        "active_project_end_date": None,
+    }
+
+
+def import_users(
+    lines,
+    fmt: str = "ndjson",
+    engine=None,
+    chunk_size: int = None,
+    workers: int = None,
+):
+    """
+    Bulk user import. Each chunk is validated, de-duplicated by email
+    (within the file and against the DB), hashed in parallel, inserted
+    with one executemany and committed. Bad rows are reported and skipped.
+    Yields a progress dict after every chunk; the last one has done=True.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"format must be one of {FORMATS}")
+    engine = engine or default_engine
+    chunk_size = chunk_size or IMPORT_CHUNK_SIZE
+
+    started = time.perf_counter()
+    counts = {"processed": 0, "imported": 0, "skipped": 0}
+    errors = []
+    seen_emails = set()
+
+    def reject(line_no, message):
+        counts["skipped"] += 1
+        if len(errors) < MAX_REPORTED_ERRORS:
+            errors.append({"line": line_no, "error": message})
+
+    def progress(done=False):
+        elapsed = time.perf_counter() - started
+        report = {
+            **counts,
+            "elapsed_seconds": round(elapsed, 2),
+            "rows_per_second": round(counts["imported"] / elapsed, 1) if elapsed else 0.0,
+        }
+        if done:
+            report["done"] = True
+            report["error_details"] = errors
+        return report
+
+    with ThreadPoolExecutor(max_workers=workers or IMPORT_HASH_WORKERS) as executor, Session(engine) as session:
+        for chunk in _chunks(read_records(lines, fmt), chunk_size):
+            counts["processed"] += len(chunk)
+
+            valid = []
+            for line_no, raw in chunk:
+                if isinstance(raw, str):
+                    reject(line_no, raw)
+                    continue
+                try:
+                    record = UserImportRecord.model_validate(raw)
+                except ValidationError as e:
+                    reject(line_no, _validation_message(e))
+                    continue
+                if record.email:
+                    record.email = record.email.strip()
+                    if record.email in seen_emails:
+                        reject(line_no, f"duplicate email {record.email}")
+                        continue
+                    seen_emails.add(record.email)
+                valid.append((line_no, record))
+
+            emails = [r.email for _, r in valid if r.email]
+            existing = set()
+            if emails:
+                existing = set(session.exec(select(User.email).where(User.email.in_(emails))).all())
+            if existing:
+                for line_no, r in valid:
+                    if r.email in existing:
+                        reject(line_no, f"email already registered: {r.email}")
+                valid = [(n, r) for n, r in valid if r.email not in existing]
+
+            if valid:
+                hashes = hash_passwords([r.password for _, r in valid], executor)
+                rows = [_user_row(r, h) for (_, r), h in zip(valid, hashes)]
+                try:
+                    session.execute(insert(User), rows)
+                    record_changes(session, "user", [row["id"] for row in rows])
+                    session.commit()
+                    counts["imported"] += len(rows)
+                except IntegrityError as e:
+                    # e.g. an email registered concurrently; the whole batch is rolled back
+                    session.rollback()
+                    for line_no, _ in valid:
+                        reject(line_no, f"batch rejected: {e.orig}")
+
+            yield progress()
+
+    yield progress(done=True)
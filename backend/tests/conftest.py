@@ -1,6 +1,7 @@
 
 import sys
 import os
+from contextlib import contextmanager
 
 # Get the path to the directory containing this file (backend/tests)
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -11,3 +12,34 @@ parent_dir = os.path.dirname(current_dir)
 # Add the parent directory to sys.path
 if parent_dir not in sys.path:
     sys.path.insert(0, parent_dir)
+
+# Never call the real Gemini API from tests (see core/fake_llm.py)
+os.environ.setdefault("LLM_PROVIDER", "fake")
+# Every test module has its own database; a shared response cache would
+# leak between them. Cache tests install a FakeBackend themselves.
+os.environ.setdefault("RESPONSE_CACHE_BACKEND", "none")
+
+
+import pytest
+
+from core.query_stats import count_queries
+
+
+@pytest.fixture
+def query_budget():
+    """
+    with query_budget(3, engine):
+        client.get("/quests")
+    fails if more than 3 SQL statements ran through `engine` in the block.
+    """
+
+    @contextmanager
+    def budget(max_queries, engine=None):
+        with count_queries(engine) as stats:
+            yield stats
+        assert stats.count <= max_queries, (
+            f"{stats.count} queries (budget {max_queries}):\n"
+            + "\n".join(stats.statements)
+        )
+
+    return budget
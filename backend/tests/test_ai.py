@@ -0,0 +1,204 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+from fastapi.testclient import TestClient
+
+import services.ai as ai
+from core.circuit_breaker import CircuitBreaker
+from core.fake_llm import FakeLLM
+from main import app
+from models import User
+from services.ai_fallback import local_profile_analysis
+
+client = TestClient(app)
+
+TEAM_STATS = {
+    "score": 80,
+    "avg_o": 30.0,
+    "avg_c": 40.0,
+    "avg_e": 25.0,
+    "avg_a": 45.0,
+    "avg_n": 15.0,
+}
+
+PROFILE_JSON = json.dumps(
+    {
+        "class_title": "จอมเวทย์",
+        "prophecy": "...",
+        "strengths": ["a", "b", "c"],
+        "weaknesses": ["d", "e"],
+        "best_partner": "นักรบ",
+    },
+    ensure_ascii=False,
+)
+
+
+def parse_sse(text):
+    events = []
+    for frame in text.strip().split("\n\n"):
+        event, data = None, None
+        for line in frame.splitlines():
+            if line.startswith("event: "):
+                event = line[len("event: ") :]
+            elif line.startswith("data: "):
+                data = json.loads(line[len("data: ") :])
+        events.append((event, data))
+    return events
+
+
+def make_user(name="Hero", o=45, c=20, e=30, a=35, n=40, cls="Mage"):
+    return User(
+        name=name,
+        character_class=cls,
+        ocean_openness=o,
+        ocean_conscientiousness=c,
+        ocean_extraversion=e,
+        ocean_agreeableness=a,
+        ocean_neuroticism=n,
+    )
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    monkeypatch.setattr(
+        ai, "breaker", CircuitBreaker("test", failure_threshold=2, reset_timeout=60)
+    )
+
+    def install(responses=None, **kwargs):
+        llm = FakeLLM(responses=responses or [], **kwargs)
+        monkeypatch.setattr(ai, "llm", llm)
+        return llm
+
+    return install
+
+
+def test_team_analyze_stream_sends_tokens_then_done(fake_llm):
+    fake_llm(["ทีมสมดุลดี"])
+
+    response = client.post("/teams/analyze/stream", json=TEAM_STATS)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+
+    events = parse_sse(response.text)
+    tokens = [data for event, data in events if event == "token"]
+    assert "".join(tokens) == "ทีมสมดุลดี"
+    assert events[-1] == ("done", {"analysis": "ทีมสมดุลดี"})
+
+
+def test_team_analyze_json_endpoint_still_works(fake_llm):
+    fake_llm(["ทีมสมดุลดี"])
+
+    response = client.post("/teams/analyze", json=TEAM_STATS)
+    assert response.status_code == 200
+    assert response.json() == {"analysis": "ทีมสมดุลดี"}
+
+
+def test_profile_analysis_uses_llm_when_healthy(fake_llm):
+    fake_llm([PROFILE_JSON])
+
+    result = asyncio.run(ai.analyze_user_profile(make_user()))
+    assert result["class_title"] == "จอมเวทย์"
+
+
+def test_slow_llm_times_out_to_local_fallback(fake_llm, monkeypatch):
+    monkeypatch.setattr(ai, "AI_TIMEOUT_SECONDS", 0.05)
+    fake_llm([PROFILE_JSON], latency=1.0)
+    user = make_user()
+
+    result = asyncio.run(ai.analyze_user_profile(user))
+    assert result == local_profile_analysis(user)
+
+
+def test_circuit_opens_after_repeated_failures(fake_llm):
+    llm = fake_llm([PROFILE_JSON], fail=True)
+    user = make_user()
+
+    for _ in range(2):
+        asyncio.run(ai.analyze_user_profile(user))
+    assert ai.breaker.state == "open"
+
+    # Provider recovers, but the open circuit keeps us off it until reset
+    llm.fail = False
+    calls_before = llm.calls
+    result = asyncio.run(ai.analyze_user_profile(user))
+    assert llm.calls == calls_before
+    assert result == local_profile_analysis(user)
+
+
+def test_half_open_trial_closes_circuit():
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    assert breaker.state == "half_open"
+    assert breaker.allow() is True
+    assert breaker.allow() is False  # only one trial at a time
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+def test_local_profile_analysis_reflects_stats():
+    user = make_user(o=48, c=15, e=30, a=40, n=45, cls="Mage")
+    result = local_profile_analysis(user)
+
+    assert result["class_title"].startswith("นักเวทย์")
+    assert len(result["strengths"]) == 3
+    assert len(result["weaknesses"]) == 2
+    assert all(s.startswith("คุณ") for s in result["strengths"] + result["weaknesses"])
+    assert "Unknown" not in json.dumps(result, ensure_ascii=False)
+    # Lowest C / highest N -> a structure-focused partner, never the same class
+    assert result["best_partner"].startswith("อัศวิน")
+    assert result == local_profile_analysis(user)
+
+
+def test_match_stream_falls_back_when_llm_fails(fake_llm):
+    fake_llm(fail=True)
+    u1, u2 = make_user("A"), make_user("B", cls="Paladin", c=45)
+    s1 = {"O": 45, "C": 20, "E": 30, "A": 35, "N": 40}
+    s2 = {"O": 45, "C": 45, "E": 30, "A": 35, "N": 40}
+
+    async def collect():
+        return [item async for item in ai.stream_match_synergy(u1, u2, s1, s2, 72)]
+
+    events = asyncio.run(collect())
+    assert events[-1][0] == "done"
+    assert events[-1][1]["synergy_score"] == 72
+    assert "ความเป็นระบบ" in events[-1][1]["pro_tip"]
+
+
+def test_importing_app_does_not_load_langchain():
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    code = (
+        "import sys, main; "
+        "print([m for m in sys.modules if m.startswith('langchain')])"
+    )
+    env = {**os.environ, "LLM_PROVIDER": "gemini"}
+    out = subprocess.run(
+        [sys.executable, "-c", code], cwd=backend_dir, env=env,
+        capture_output=True, text=True, check=True,
+    ).stdout
+    assert out.strip() == "[]"
+
+
+def test_llm_calls_are_instrumented(fake_llm):
+    fn = "analyze_user_profile"
+    fake_llm(["not json"])
+    ok_before = ai.LLM_LATENCY.count(function=fn, outcome="ok")
+    parse_before = ai.LLM_PARSE_FAILURES.value(function=fn)
+    fallback_before = ai.LLM_FALLBACKS.value(function=fn, reason="parse_error")
+    completion_before = ai.LLM_TOKENS.value(function=fn, kind="completion")
+
+    asyncio.run(ai.analyze_user_profile(make_user()))
+
+    assert ai.LLM_LATENCY.count(function=fn, outcome="ok") == ok_before + 1
+    assert ai.LLM_PARSE_FAILURES.value(function=fn) == parse_before + 1
+    assert ai.LLM_FALLBACKS.value(function=fn, reason="parse_error") == fallback_before + 1
+    assert ai.LLM_TOKENS.value(function=fn, kind="completion") == completion_before + 2
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'kemii_llm_json_parse_failures_total{function="analyze_user_profile"}' in response.text
+    assert "# TYPE kemii_llm_call_duration_seconds histogram" in response.text
@@ -0,0 +1,230 @@
+import asyncio
+import json
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel.pool import StaticPool
+
+import services.analysis_queue as aq
+from core.auth import get_current_user
+from core.database import get_session
+from main import app
+from models import User
+
+engine = create_engine(
+    "sqlite://",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+
+
+def make_session():
+    return Session(engine)
+
+
+def override_get_session():
+    with make_session() as session:
+        yield session
+
+
+def setup_function():
+    SQLModel.metadata.create_all(engine)
+
+
+def teardown_function():
+    app.dependency_overrides = {}
+    SQLModel.metadata.drop_all(engine)
+
+
+def create_user(name="Hero"):
+    with make_session() as session:
+        user = User(name=name, ocean_openness=40, ocean_agreeableness=30)
+        session.add(user)
+        session.commit()
+        session.refresh(user)
+        return user.id
+
+
+def test_process_analysis_stores_result(monkeypatch):
+    async def fake_analyze(user):
+        return {"class_title": f"{user.name} the Bold"}
+
+    monkeypatch.setattr(aq, "analyze_user_profile", fake_analyze)
+    user_id = create_user()
+
+    asyncio.run(aq.process_analysis(user_id, make_session))
+
+    with make_session() as session:
+        user = session.get(User, user_id)
+        assert user.analysis_status == aq.STATUS_READY
+        assert json.loads(user.analysis_result)["class_title"] == "Hero the Bold"
+
+
+def test_no_session_is_open_while_waiting_on_the_llm(monkeypatch):
+    open_sessions = []
+
+    class TrackedSession(Session):
+        def close(self):
+            if self in open_sessions:
+                open_sessions.remove(self)
+            super().close()
+
+    def tracked_session():
+        session = TrackedSession(engine)
+        open_sessions.append(session)
+        return session
+
+    async def fake_analyze(user):
+        assert open_sessions == []
+        with make_session() as session:
+            assert session.get(User, user.id).analysis_status == aq.STATUS_PROCESSING
+        return {"class_title": f"{user.name} the Bold"}
+
+    monkeypatch.setattr(aq, "analyze_user_profile", fake_analyze)
+    user_id = create_user()
+
+    asyncio.run(aq.process_analysis(user_id, tracked_session))
+
+    with make_session() as session:
+        assert session.get(User, user_id).analysis_status == aq.STATUS_READY
+
+
+def mark(user_id, status, started_at=None):
+    with make_session() as session:
+        user = session.get(User, user_id)
+        user.analysis_status = status
+        user.analysis_started_at = started_at
+        session.add(user)
+        session.commit()
+        session.refresh(user)
+        return user
+
+
+def get_analysis(user):
+    app.dependency_overrides[get_session] = override_get_session
+    app.dependency_overrides[get_current_user] = lambda: user
+    response = TestClient(app).get(f"/users/{user.id}/analysis")
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_analysis_endpoint_leaves_the_llm_call_to_the_worker(monkeypatch):
+    async def unexpected_call(user):
+        raise AssertionError("the worker owns this analysis")
+
+    queued = []
+    monkeypatch.setattr("api.users.analyze_user_profile", unexpected_call)
+    monkeypatch.setattr("api.users.enqueue_analysis", lambda uid: queued.append(uid) or True)
+    monkeypatch.setattr(aq.analysis_queue, "tasks", ["worker"])
+
+    busy = mark(create_user("Busy"), aq.STATUS_PROCESSING, datetime.utcnow())
+    assert get_analysis(busy)["analysis_status"] == aq.STATUS_PROCESSING
+
+    waiting = mark(create_user("Waiting"), aq.STATUS_PENDING)
+    body = get_analysis(waiting)
+    assert (body["analysis_status"], body["analysis"]) == (aq.STATUS_PENDING, None)
+
+    # A mark older than the LLM deadline is a dead job: queued again
+    dead = mark(create_user("Dead"), aq.STATUS_PROCESSING, datetime.utcnow() - timedelta(hours=1))
+    assert get_analysis(dead)["analysis_status"] == aq.STATUS_PENDING
+    assert queued == [waiting.id, dead.id]
+
+
+def test_stale_processing_mark_falls_back_to_the_request_without_workers():
+    dead = mark(create_user("Dead"), aq.STATUS_PROCESSING, datetime.utcnow() - timedelta(hours=1))
+    body = get_analysis(dead)
+    assert body["analysis_status"] == aq.STATUS_READY
+    assert body["analysis"]
+
+
+def test_restart_finishes_analyses_cut_off_by_shutdown(monkeypatch):
+    started = asyncio.Event()
+
+    async def hanging_analyze(user):
+        started.set()
+        await asyncio.sleep(3600)
+
+    async def fake_analyze(user):
+        return {"class_title": f"{user.name} the Bold"}
+
+    cut_off, queued = create_user("Cut off"), create_user("Queued")
+    crashed = create_user("Crashed")
+    mark(crashed, aq.STATUS_PROCESSING, datetime.utcnow() - timedelta(hours=1))
+
+    async def first_run():
+        monkeypatch.setattr(aq, "analyze_user_profile", hanging_analyze)
+        queue = aq.AnalysisQueue(workers=1, rate_per_min=6000)
+        queue.start(make_session)
+        await started.wait()
+        await queue.stop()
+
+    async def second_run():
+        monkeypatch.setattr(aq, "analyze_user_profile", fake_analyze)
+        queue = aq.AnalysisQueue(workers=2, rate_per_min=6000)
+        queue.start(make_session)
+        await queue.queue.join()
+        await queue.stop()
+
+    asyncio.run(first_run())
+    with make_session() as session:
+        statuses = {session.get(User, uid).analysis_status for uid in (cut_off, queued)}
+        assert statuses == {aq.STATUS_PENDING}
+
+    asyncio.run(second_run())
+    with make_session() as session:
+        for uid in (cut_off, queued, crashed):
+            user = session.get(User, uid)
+            assert user.analysis_status == aq.STATUS_READY
+            assert user.analysis_started_at is None
+
+
+def test_process_analysis_marks_failure(monkeypatch):
+    async def broken_analyze(user):
+        raise RuntimeError("LLM down")
+
+    monkeypatch.setattr(aq, "analyze_user_profile", broken_analyze)
+    user_id = create_user()
+
+    asyncio.run(aq.process_analysis(user_id, make_session))
+
+    with make_session() as session:
+        user = session.get(User, user_id)
+        assert user.analysis_status == aq.STATUS_FAILED
+        assert user.analysis_result is None
+
+
+def test_queue_respects_concurrency_limit(monkeypatch):
+    active = {"now": 0, "peak": 0}
+
+    async def slow_analyze(user):
+        active["now"] += 1
+        active["peak"] = max(active["peak"], active["now"])
+        await asyncio.sleep(0.01)
+        active["now"] -= 1
+        return {"class_title": "ok"}
+
+    monkeypatch.setattr(aq, "analyze_user_profile", slow_analyze)
+    user_ids = [create_user(f"Hero {i}") for i in range(6)]
+
+    async def run():
+        queue = aq.AnalysisQueue(workers=2, rate_per_min=6000)
+        queue.start(make_session)
+        for uid in user_ids:
+            queue.enqueue(uid)
+            queue.enqueue(uid)  # duplicates are collapsed
+        await asyncio.sleep(0)
+        await queue.queue.join()
+        await queue.stop()
+
+    asyncio.run(run())
+
+    assert active["peak"] <= 2
+    with make_session() as session:
+        for uid in user_ids:
+            assert session.get(User, uid).analysis_status == aq.STATUS_READY
+
+
+def test_enqueue_without_running_workers_is_noop():
+    queue = aq.AnalysisQueue()
+    assert queue.enqueue("missing") is False
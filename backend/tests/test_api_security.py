@@ -132,6 +132,30 @@ def test_access_own_analysis_allowed(session):
     # For now, if it returns 200 or attempts AI, the permission check passed.
     assert response.status_code != 403
 
+def test_users_batch_enforces_self_or_admin(session, monkeypatch):
+    admin = create_test_user(session, "Admin", role="admin")
+    user_a = create_test_user(session, "UserA")
+    user_b = create_test_user(session, "UserB")
+
+    app.dependency_overrides[get_current_user] = lambda: user_a
+    response = client.post("/users/batch", json={"ids": [user_a.id, user_b.id]})
+    assert response.status_code == 403
+    response = client.post("/users/batch", json={"ids": [user_a.id]})
+    assert response.status_code == 200
+    assert response.json()["users"][0]["email"] == "usera@example.com"
+
+    app.dependency_overrides[get_current_user] = lambda: admin
+    response = client.post("/users/batch", json={"ids": [user_b.id, "missing", user_a.id, user_b.id]})
+    assert response.status_code == 200
+    data = response.json()
+    assert [u["name"] for u in data["users"]] == ["UserB", "UserA"]
+    assert data["users"][0]["skills"] == [{"name": "Python", "level": 3}]
+    assert data["missing"] == ["missing"]
+
+    monkeypatch.setattr("api.users.USER_BATCH_MAX", 2)
+    response = client.post("/users/batch", json={"ids": [admin.id, user_a.id, user_b.id]})
+    assert response.status_code == 400
+
 def test_quest_match_other_user_forbidden(session):
     user_a = create_test_user(session, "UserA")
     user_b = create_test_user(session, "UserB")
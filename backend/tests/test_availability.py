@@ -0,0 +1,200 @@
+import json
+import random
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel.pool import StaticPool
+
+from core.auth import get_current_admin, get_current_user, verify_token
+from core.database import get_session
+from main import app
+from models import Quest, User
+from services.availability import availability_index
+from services.capacity import compute_forecast, forecast_cache
+from services.interval_tree import IntervalTree
+
+engine = create_engine(
+    "sqlite://",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+
+client = TestClient(app)
+
+JAN = datetime(2026, 1, 1)
+
+
+def override_get_session():
+    with Session(engine) as session:
+        yield session
+
+
+@pytest.fixture(name="session")
+def session_fixture():
+    SQLModel.metadata.create_all(engine)
+    app.dependency_overrides[get_session] = override_get_session
+    availability_index.invalidate()
+    forecast_cache.clear()
+    with Session(engine) as session:
+        yield session
+    app.dependency_overrides = {}
+    availability_index.invalidate()
+    SQLModel.metadata.drop_all(engine)
+
+
+def add_user(session, name, is_available=True, end_date=None, skills="[]"):
+    user = User(
+        name=name,
+        character_class="Mage",
+        is_available=is_available,
+        active_project_end_date=end_date,
+        skills=skills,
+    )
+    session.add(user)
+    session.commit()
+    session.refresh(user)
+    return user
+
+
+def add_quest(session, leader, members, start, end, status="filled"):
+    quest = Quest(
+        title="Quest",
+        description="",
+        leader_id=leader.id,
+        status=status,
+        accepted_members=json.dumps([m.id for m in members]),
+        start_date=start,
+        deadline=end,
+    )
+    session.add(quest)
+    session.commit()
+    return quest.id
+
+
+def test_interval_tree_matches_brute_force():
+    rng = random.Random(7)
+    intervals = []
+    for i in range(300):
+        start = rng.randint(0, 1000)
+        intervals.append((start, start + rng.randint(0, 80), i))
+    tree = IntervalTree(intervals)
+
+    for _ in range(200):
+        a = rng.randint(-50, 1050)
+        b = a + rng.randint(0, 120)
+        expected = {key for s, e, key in intervals if s <= b and e >= a}
+        assert tree.overlapping(a, b) == expected
+
+
+def test_roster_window_includes_users_free_after_current_quest(session):
+    busy_now = add_user(session, "BusyNow", is_available=False, end_date=JAN + timedelta(days=30))
+    free = add_user(session, "Free")
+    planned = add_user(session, "Planned")
+    add_quest(session, busy_now, [busy_now], JAN, JAN + timedelta(days=30))
+    add_quest(session, planned, [planned], JAN + timedelta(days=60), JAN + timedelta(days=90))
+
+    app.dependency_overrides[get_current_user] = lambda: free
+
+    now_names = {u["name"] for u in client.get("/users/roster").json()}
+    assert now_names == {"Free", "Planned"}
+
+    response = client.get(
+        "/users/roster",
+        params={"start": "2026-02-05T00:00:00Z", "end": "2026-02-20T00:00:00Z"},
+    )
+    assert response.status_code == 200
+    assert {u["name"] for u in response.json()} == {"BusyNow", "Free", "Planned"}
+    assert all(u["is_available"] for u in response.json())
+
+    response = client.get(
+        "/users/roster",
+        params={"start": "2026-03-01T00:00:00Z", "end": "2026-03-10T00:00:00Z"},
+    )
+    assert {u["name"] for u in response.json()} == {"BusyNow", "Free"}
+
+    response = client.get(
+        "/users/roster",
+        params={"start": "2026-03-10T00:00:00Z", "end": "2026-03-01T00:00:00Z"},
+    )
+    assert response.status_code == 400
+
+
+def test_locked_user_outside_quests_is_busy_until_end_date(session):
+    add_user(session, "Locked", is_available=False, end_date=JAN + timedelta(days=10))
+    viewer = add_user(session, "Viewer")
+    app.dependency_overrides[get_current_user] = lambda: viewer
+
+    before = client.get("/users/roster", params={"start": "2026-01-05T00:00:00"})
+    after = client.get("/users/roster", params={"start": "2026-01-15T00:00:00"})
+    assert {u["name"] for u in before.json()} == {"Viewer"}
+    assert {u["name"] for u in after.json()} == {"Locked", "Viewer"}
+
+
+def dept_series(forecast, dept_id):
+    return next(d for d in forecast["departments"] if d["id"] == dept_id)
+
+
+def test_capacity_forecast_counts_free_people_per_day(session):
+    hrbp = json.dumps([{"name": "Dept: HR Business Partner (HRBP)", "level": 1}])
+    payroll_skill = json.dumps([{"name": "Stakeholder Management", "level": 2}])
+    a = add_user(session, "A", skills=hrbp)
+    b = add_user(session, "B", skills=payroll_skill)
+    add_user(session, "C", skills="[]")
+    # Overlapping quests for A count once; B is busy on days 2-3
+    add_quest(session, a, [a], JAN + timedelta(days=1), JAN + timedelta(days=2, hours=6))
+    add_quest(session, a, [a], JAN + timedelta(days=2), JAN + timedelta(days=3))
+    add_quest(session, b, [b], JAN + timedelta(days=2), JAN + timedelta(days=3, hours=1))
+
+    forecast = compute_forecast(session, JAN.date(), periods=6)
+    assert forecast["periods"][0] == "2026-01-01"
+    series = dept_series(forecast, "hrbp")
+    assert series["headcount"] == 2
+    assert series["available"] == [2, 1, 0, 0, 2, 2]
+
+    weekly = compute_forecast(session, JAN.date(), periods=2, bucket="week")
+    assert dept_series(weekly, "hrbp")["available"] == [0, 2]
+
+
+def test_capacity_forecast_endpoint_is_cached_until_quest_changes(session):
+    hrbp = json.dumps([{"name": "Dept: HR Business Partner (HRBP)", "level": 1}])
+    admin = add_user(session, "Admin", skills=hrbp)
+    app.dependency_overrides[get_current_admin] = lambda: admin
+    params = {"start": "2026-01-01", "horizon_days": 14, "bucket": "week"}
+
+    first = client.get("/admin/capacity-forecast", params=params)
+    assert first.status_code == 200
+    assert dept_series(first.json(), "hrbp")["available"] == [1, 1]
+
+    add_quest(session, admin, [admin], JAN, JAN + timedelta(days=3))
+    cached = client.get("/admin/capacity-forecast", params=params)
+    assert dept_series(cached.json(), "hrbp")["available"] == [1, 1]
+
+    availability_index.invalidate()
+    fresh = client.get("/admin/capacity-forecast", params=params)
+    assert dept_series(fresh.json(), "hrbp")["available"] == [0, 1]
+
+    bad = client.get("/admin/capacity-forecast", params={"bucket": "month"})
+    assert bad.status_code == 400
+
+
+def test_leaving_one_quest_keeps_users_busy_with_another(session):
+    leader = add_user(session, "Leader")
+    both = add_user(session, "Both", is_available=False, end_date=JAN + timedelta(days=20))
+    only = add_user(session, "Only", is_available=False, end_date=JAN + timedelta(days=5))
+    short = add_quest(session, leader, [both, only], JAN, JAN + timedelta(days=5))
+    kicked_from = add_quest(session, leader, [both], JAN, JAN + timedelta(days=8))
+    add_quest(session, leader, [both], JAN, JAN + timedelta(days=20), status="in_progress")
+    app.dependency_overrides[verify_token] = lambda: leader.id
+
+    assert client.post(f"/quests/{short}/complete").status_code == 200
+    session.expire_all()
+    assert session.get(User, only.id).is_available is True
+    assert session.get(User, both.id).is_available is False
+    assert session.get(User, both.id).active_project_end_date == JAN + timedelta(days=20)
+
+    assert client.post(f"/quests/{kicked_from}/kick/{both.id}").status_code == 200
+    session.expire_all()
+    assert session.get(User, both.id).is_available is False
+    assert session.get(User, both.id).active_project_end_date == JAN + timedelta(days=20)
@@ -0,0 +1,77 @@
+from collections import Counter
+
+from sqlmodel import SQLModel, create_engine
+
+from scripts.bench_matching import compare, optimizer_quality
+from scripts.benchmark import ENDPOINTS, percentile, run_benchmark
+from scripts.synth_data import generate_quests, generate_users, seed_database
+
+
+def test_synthetic_data_is_deterministic_and_follows_class_profiles():
+    quests, locked = generate_quests(500, 50, seed=7)
+    again, _ = generate_quests(500, 50, seed=7)
+    assert quests == again
+
+    users = list(generate_users(500, locked, seed=7))
+    assert users == list(generate_users(500, locked, seed=7))
+    assert len({u["id"] for u in users}) == 500
+    assert set(Counter(u["character_class"] for u in users)) == {
+        "Mage", "Paladin", "Warrior", "Cleric", "Rogue"
+    }
+    mages = [u for u in users if u["character_class"] == "Mage"]
+    assert all(40 <= u["ocean_openness"] <= 50 for u in mages)
+    assert {u["id"] for u in users if not u["is_available"]} == {
+        users[i]["id"] for i in locked
+    }
+
+
+def test_benchmark_reports_percentiles_for_every_endpoint(tmp_path):
+    # File DB: concurrent requests need their own connections
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'bench.db'}", connect_args={"check_same_thread": False}
+    )
+    seeded = seed_database(engine, 200, 20, seed=1, chunk_size=64)
+    assert seeded["users"] == 200 and seeded["quests"] == 20
+
+    report = run_benchmark(engine, requests=4, concurrency=2)
+    assert report["dataset"] == {"users": 200, "quests": 20}
+    assert set(report["endpoints"]) == set(ENDPOINTS)
+    for result in report["endpoints"].values():
+        assert result["requests"] == 4
+        assert result["errors"] == 0
+        assert result["p50_ms"] <= result["p95_ms"] <= result["p99_ms"]
+    SQLModel.metadata.drop_all(engine)
+
+
+def test_percentile_nearest_rank():
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile([3.0], 95) == 3.0
+
+
+def test_matching_benchmark_flags_slowdowns_and_worse_teams():
+    baseline = {
+        "kernels": {"evaluate_team[team=5]": {"normalized": 0.02}},
+        "optimizer_quality": [{"iterations": 100, "mean_cost": 0.2}],
+    }
+    ok = {
+        "kernels": {"evaluate_team[team=5]": {"normalized": 0.025}},
+        "optimizer_quality": [{"iterations": 100, "mean_cost": 0.2}],
+    }
+    slow = {
+        "kernels": {"evaluate_team[team=5]": {"normalized": 0.03}},
+        "optimizer_quality": [{"iterations": 100, "mean_cost": 0.25}],
+    }
+    assert compare(ok, baseline, threshold=0.3) == []
+    regressions = compare(slow, baseline, threshold=0.3)
+    assert len(regressions) == 2
+    assert regressions[0].startswith("evaluate_team[team=5]: 1.50x")
+
+
+def test_optimizer_quality_improves_with_budget():
+    quality = optimizer_quality(budgets=[5, 200], seeds=range(2), pool_size=20)
+    again = optimizer_quality(budgets=[5, 200], seeds=range(2), pool_size=20)
+    # Seeded: same costs every run, so quality baselines compare exactly
+    assert [q["mean_cost"] for q in quality] == [q["mean_cost"] for q in again]
+    assert quality[1]["mean_cost"] <= quality[0]["mean_cost"]
@@ -0,0 +1,154 @@
+import json
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session, SQLModel, create_engine, select
+from sqlmodel.pool import StaticPool
+
+from core.auth import get_optional_user
+from core.database import get_session
+from main import app
+from models import ChangeLog, Quest, User
+from services import change_log
+from services.availability import release_expired_users
+from services.change_log import compact_change_log, read_changes
+
+engine = create_engine(
+    "sqlite://",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+
+client = TestClient(app)
+
+
+def override_get_session():
+    with Session(engine) as session:
+        yield session
+
+
+def setup_function():
+    SQLModel.metadata.create_all(engine)
+    app.dependency_overrides[get_session] = override_get_session
+    change_log.CHANGES_SETTLE_SECONDS = 0
+
+
+def teardown_function():
+    app.dependency_overrides = {}
+    SQLModel.metadata.drop_all(engine)
+    change_log.CHANGES_SETTLE_SECONDS = 2
+
+
+def _poll(since):
+    return client.get(f"/changes?since={since}").json()
+
+
+def test_feed_returns_only_what_changed_since_the_cursor(query_budget):
+    with Session(engine) as session:
+        leader = User(name="Leader", email="leader@kemii.com")
+        member = User(name="Member", email="member@kemii.com")
+        session.add_all([leader, member])
+        session.commit()
+        quest = Quest(
+            title="Quest",
+            description="",
+            leader_id=leader.id,
+            accepted_members=json.dumps([member.id]),
+        )
+        session.add(quest)
+        session.commit()
+        leader_id, member_id, quest_id = leader.id, member.id, quest.id
+
+    first = _poll(0)
+    assert {u["name"] for u in first["users"]} == {"Leader", "Member"}
+    assert [q["leader_name"] for q in first["quests"]] == ["Leader"]
+    assert first["users"][0]["email"] == "HIDDEN"
+    cursor = first["cursor"]
+
+    with query_budget(1, engine):
+        assert _poll(cursor) == {
+            "cursor": cursor,
+            "has_more": False,
+            "users": [],
+            "quests": [],
+            "deleted": {"users": [], "quests": []},
+        }
+
+    with Session(engine) as session:
+        member = session.get(User, member_id)
+        member.name = "Renamed"
+        session.add(member)
+        session.commit()
+    changed = _poll(cursor)
+    assert [u["name"] for u in changed["users"]] == ["Renamed"]
+    assert changed["quests"] == []
+
+    app.dependency_overrides[get_optional_user] = lambda: User(id=leader_id, name="Leader")
+    with Session(engine) as session:
+        session.delete(session.get(Quest, quest_id))
+        session.commit()
+    deleted = _poll(changed["cursor"])
+    assert deleted["deleted"] == {"users": [], "quests": [quest_id]}
+
+
+def test_bulk_writes_are_logged_and_pages_follow_the_cursor():
+    with Session(engine) as session:
+        session.add_all(
+            User(
+                name=f"Busy {i}",
+                is_available=False,
+                active_project_end_date=datetime.utcnow() - timedelta(days=1),
+            )
+            for i in range(3)
+        )
+        session.commit()
+        cursor = read_changes(session, 0)[1]
+        assert release_expired_users(session) == 3
+
+    page = client.get(f"/changes?since={cursor}&limit=2").json()
+    assert len(page["users"]) == 2 and page["has_more"]
+    rest = _poll(page["cursor"])
+    assert len(rest["users"]) == 1 and not rest["has_more"]
+    assert all(u["is_available"] for u in page["users"] + rest["users"])
+
+
+def test_unsettled_entries_are_held_back_without_has_more():
+    with Session(engine) as session:
+        old, fresh = User(name="Old"), User(name="Fresh")
+        session.add(old)
+        session.commit()
+        session.add(fresh)
+        session.commit()
+        first = session.exec(select(ChangeLog).order_by(ChangeLog.id)).first()
+        first.changed_at -= timedelta(minutes=5)
+        session.add(first)
+        session.commit()
+
+        changes, cursor, has_more = read_changes(session, 0, settle=60)
+        assert (changes, cursor, has_more) == ({("user", old.id): "upsert"}, first.id, False)
+        # Nothing settled yet: same cursor, and no reason to ask again at once
+        assert read_changes(session, cursor, settle=60) == ({}, cursor, False)
+
+
+def test_compaction_keeps_newest_entry_and_tombstones():
+    with Session(engine) as session:
+        kept, gone = User(name="Kept"), User(name="Gone")
+        session.add_all([kept, gone])
+        session.commit()
+        for name in ("Kept 2", "Kept 3"):
+            kept.name = name
+            session.add(kept)
+            session.commit()
+        old_cursor = read_changes(session, 0, limit=1)[1]
+        session.delete(gone)
+        session.commit()
+        kept_id, gone_id = kept.id, gone.id
+
+        assert compact_change_log(session) == 3
+        rows = session.exec(select(ChangeLog.entity_id, ChangeLog.op)).all()
+        assert sorted(rows) == sorted([(kept_id, "upsert"), (gone_id, "delete")])
+
+    # A cursor from before compaction still sees both entities
+    feed = _poll(old_cursor)
+    assert [u["name"] for u in feed["users"]] == ["Kept 3"]
+    assert feed["deleted"]["users"] == [gone_id]
@@ -0,0 +1,147 @@
+import json
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+from sqlalchemy import update
+from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel.pool import StaticPool
+
+from core.auth import get_current_user
+from core.etag import table_versions
+from core.database import get_session
+from main import app
+from models import Quest, User
+from services.availability import release_expired_users
+
+engine = create_engine(
+    "sqlite://",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+
+client = TestClient(app)
+
+
+def override_get_session():
+    with Session(engine) as session:
+        yield session
+
+
+def setup_function():
+    SQLModel.metadata.create_all(engine)
+    app.dependency_overrides[get_session] = override_get_session
+
+
+def teardown_function():
+    app.dependency_overrides = {}
+    SQLModel.metadata.drop_all(engine)
+
+
+def _seed():
+    with Session(engine) as session:
+        leader, member = User(name="Leader"), User(name="Member")
+        session.add_all([leader, member])
+        session.commit()
+        quest = Quest(
+            title="Quest",
+            description="",
+            leader_id=leader.id,
+            accepted_members=json.dumps([member.id]),
+        )
+        session.add(quest)
+        session.commit()
+        return quest.id, member.id
+
+
+def _rename(model, id_, name):
+    with Session(engine) as session:
+        obj = session.get(model, id_)
+        setattr(obj, "title" if model is Quest else "name", name)
+        session.add(obj)
+        session.commit()
+        session.refresh(obj)
+        return obj.version
+
+
+def test_orm_writes_bump_versions():
+    quest_id, member_id = _seed()
+    assert _rename(User, member_id, "Renamed") == 2
+    assert _rename(User, member_id, "Renamed again") == 3
+    assert _rename(Quest, quest_id, "New title") == 2
+
+
+def test_quest_list_answers_304_from_the_version_check(query_budget):
+    quest_id, member_id = _seed()
+
+    first = client.get("/quests")
+    etag = first.headers["etag"]
+
+    # One primary-key lookup of the table counters, no scan of quest/user
+    with query_budget(1, engine) as stats:
+        cached = client.get("/quests", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert "table_version" in stats.statements[0]
+    assert cached.headers["etag"] == etag
+
+    # A member's profile is part of the list (harmony), so it changes the tag
+    _rename(User, member_id, "Renamed")
+    changed = client.get("/quests", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+
+    # Different filters are different representations
+    assert client.get("/quests?status=open").headers["etag"] != changed.headers["etag"]
+
+
+def test_quest_detail_etag_follows_quest_and_team_versions(query_budget):
+    quest_id, member_id = _seed()
+
+    etag = client.get(f"/quests/{quest_id}").headers["etag"]
+    # Quest and team versions only: the body is never built for a 304
+    with query_budget(2, engine) as stats:
+        assert client.get(f"/quests/{quest_id}", headers={"If-None-Match": etag}).status_code == 304
+    assert "description" not in stats.statements[0]
+    assert client.get(f"/quests/{quest_id}?include=analysis").headers["etag"] != etag
+
+    _rename(User, member_id, "Renamed")
+    response = client.get(f"/quests/{quest_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["accepted_members"][0]["name"] == "Renamed"
+
+
+def test_roster_etag_changes_when_bulk_release_frees_users():
+    with Session(engine) as session:
+        session.add(
+            User(
+                name="Busy",
+                is_available=False,
+                active_project_end_date=datetime.utcnow() - timedelta(days=1),
+            )
+        )
+        session.commit()
+    app.dependency_overrides[get_current_user] = lambda: User(id="viewer", name="Viewer")
+
+    first = client.get("/users/roster")
+    assert first.json() == []
+    etag = first.headers["etag"]
+    assert client.get("/users/roster", headers={"If-None-Match": etag}).status_code == 304
+
+    with Session(engine) as session:
+        assert release_expired_users(session) == 1
+
+    response = client.get("/users/roster", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert [u["name"] for u in response.json()] == ["Busy"]
+
+    # Windows relative to "now" can change without any write: no ETag
+    assert "etag" not in client.get("/users/roster?end=2030-01-01T00:00:00").headers
+
+
+def test_bulk_writes_bump_the_table_counters():
+    quest_id, _ = _seed()
+    with Session(engine) as session:
+        before = table_versions(session, Quest, User)
+        session.execute(update(Quest).where(Quest.id == quest_id).values(status="failed"))
+        session.commit()
+        after = table_versions(session, Quest, User)
+    assert after == (before[0] + 1, before[1])
@@ -0,0 +1,130 @@
+import asyncio
+import json
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel.pool import StaticPool
+
+from core.auth import create_access_token, get_current_user
+from core.database import get_session
+from main import app
+from models import Quest, User
+from services.events import HEARTBEAT, RESYNC, EventHub, event_hub
+
+engine = create_engine(
+    "sqlite://",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+
+client = TestClient(app)
+
+
+def override_get_session():
+    with Session(engine) as session:
+        yield session
+
+
+def setup_function():
+    SQLModel.metadata.create_all(engine)
+    app.dependency_overrides[get_session] = override_get_session
+
+
+def teardown_function():
+    app.dependency_overrides = {}
+    SQLModel.metadata.drop_all(engine)
+
+
+async def _next_event(stream, timeout=2):
+    """Next non-heartbeat frame as (event, data)."""
+    while True:
+        frame = await asyncio.wait_for(anext(stream), timeout)
+        if frame != HEARTBEAT:
+            event, data = frame.strip().split("\n")
+            return event.removeprefix("event: "), json.loads(data.removeprefix("data: "))
+
+
+def test_events_reach_matching_streams_once_with_heartbeats():
+    hub = EventHub(heartbeat=0.05)
+
+    async def main():
+        mine = hub.stream(["user:a", "quest:q"])
+        other = hub.stream(["user:b"])
+        assert await anext(mine) == HEARTBEAT  # subscribes
+        assert await anext(other) == HEARTBEAT
+
+        # Published from a worker thread, like a sync route handler
+        await asyncio.to_thread(hub.publish, ["quest:q", "user:a"], "quest_status", {"status": "in_progress"})
+        assert await _next_event(mine) == ("quest_status", {"status": "in_progress"})
+
+        # Nothing for user:b, so it only gets heartbeats
+        assert await asyncio.wait_for(anext(other), 1) == HEARTBEAT
+        await mine.aclose()
+        await other.aclose()
+        assert not hub._subscribers
+
+    asyncio.run(main())
+
+
+def test_slow_stream_is_told_to_resync_and_dropped():
+    hub = EventHub(queue_size=2, heartbeat=5)
+
+    async def main():
+        stream = hub.stream(["user:a"])
+        await anext(stream)
+        for i in range(5):
+            hub.publish(["user:a"], "tick", {"i": i})
+        await asyncio.sleep(0)  # deliveries are scheduled on this loop
+        assert await anext(stream) == RESYNC
+        try:
+            await anext(stream)
+            raise AssertionError("stream should have ended")
+        except StopAsyncIteration:
+            pass
+        assert not hub._subscribers
+
+    asyncio.run(main())
+
+
+def test_route_handlers_publish_to_user_and_quest_streams():
+    with Session(engine) as session:
+        leader, member = User(name="Leader"), User(name="Member", is_available=False)
+        session.add_all([leader, member])
+        session.commit()
+        quest = Quest(
+            title="Quest",
+            description="",
+            leader_id=leader.id,
+            team_size=1,
+            status="filled",
+            accepted_members=json.dumps([member.id]),
+        )
+        session.add(quest)
+        session.commit()
+        leader_id, member_id, quest_id = leader.id, member.id, quest.id
+    headers = {"Authorization": f"Bearer {create_access_token(leader_id)}"}
+
+    async def main():
+        kicked = event_hub.stream([f"user:{member_id}"])
+        watching = event_hub.stream([f"quest:{quest_id}"])
+        await anext(kicked)
+        await anext(watching)
+
+        response = await asyncio.to_thread(client.post, f"/quests/{quest_id}/kick/{member_id}", headers=headers)
+        assert response.status_code == 200
+        expected = ("member_kicked", {"quest_id": quest_id, "status": "open", "user_id": member_id})
+        assert await _next_event(kicked) == expected
+        assert await _next_event(watching) == expected
+
+        await asyncio.to_thread(client.post, f"/quests/{quest_id}/start", headers=headers)
+        assert await _next_event(watching) == ("quest_status", {"quest_id": quest_id, "status": "in_progress"})
+        await kicked.aclose()
+        await watching.aclose()
+
+    asyncio.run(main())
+
+
+def test_user_stream_is_private():
+    app.dependency_overrides[get_current_user] = lambda: User(id="someone", name="Someone")
+    assert client.get("/events/users/other").status_code == 403
+    assert client.get("/events/quests/missing").status_code == 404
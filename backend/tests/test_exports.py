@@ -0,0 +1,102 @@
+import json
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel.pool import StaticPool
+
+from core.auth import get_current_admin
+from core.database import get_session
+from main import app
+from models import Quest, User
+from services.exports import export_lines
+
+engine = create_engine(
+    "sqlite://",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+
+client = TestClient(app)
+
+
+def override_get_session():
+    with Session(engine) as session:
+        yield session
+
+
+def setup_function():
+    SQLModel.metadata.create_all(engine)
+    app.dependency_overrides[get_session] = override_get_session
+
+
+def teardown_function():
+    app.dependency_overrides = {}
+    SQLModel.metadata.drop_all(engine)
+
+
+def _seed():
+    with Session(engine) as session:
+        users = [
+            User(
+                id=f"u{i}",
+                name=f"User {i}",
+                skills=json.dumps([{"name": "Payroll", "level": i + 1}]),
+                ocean_openness=30 + i,
+                ocean_conscientiousness=35,
+                ocean_extraversion=25 + i,
+                ocean_agreeableness=40,
+                ocean_neuroticism=15,
+            )
+            for i in range(5)
+        ]
+        session.add_all(users)
+        session.add(
+            Quest(
+                id="q1", title="Payroll", description="", leader_id="u0",
+                status="in_progress", accepted_members=json.dumps(["u1", "u2"]),
+            )
+        )
+        session.add(Quest(id="q2", title="Solo", description="", leader_id="u3", status="completed"))
+        session.add(
+            Quest(
+                id="q3", title="Audit", description="", leader_id="u4",
+                status="completed", accepted_members=json.dumps(["u1"]),
+            )
+        )
+        session.commit()
+
+
+def test_exports_stream_every_row_across_batches():
+    _seed()
+
+    users = [json.loads(line) for line in export_lines("users", engine=engine, batch_size=2)]
+    assert [u["id"] for u in users] == ["u0", "u1", "u2", "u3", "u4"]
+    assert users[1]["skills"] == [{"name": "Payroll", "level": 2}]
+    assert users[1]["ocean"]["O"] == 31
+    # Only active quests count as membership
+    assert users[1]["active_quest_ids"] == ["q1"]
+    assert users[4]["active_quest_ids"] == []
+
+    quests = [json.loads(line) for line in export_lines("quests", engine=engine, batch_size=2)]
+    assert [q["id"] for q in quests] == ["q1", "q2", "q3"]
+    assert quests[0]["member_ids"] == ["u1", "u2"]
+    assert quests[0]["harmony_score"] > 0
+    assert quests[1]["harmony_score"] == 0
+
+    teams = [json.loads(line) for line in export_lines("teams", engine=engine, batch_size=2)]
+    assert [t["quest_id"] for t in teams] == ["q1", "q3"]
+    assert [m["id"] for m in teams[0]["members"]] == ["u0", "u1", "u2"]
+    assert teams[0]["members"][0]["is_leader"] is True
+    assert teams[0]["harmony_score"] == quests[0]["harmony_score"]
+
+
+def test_export_endpoint_streams_ndjson():
+    _seed()
+    app.dependency_overrides[get_current_admin] = lambda: User(name="Admin", role="admin")
+
+    response = client.get("/admin/export/quests")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert len(response.text.splitlines()) == 3
+
+    assert client.get("/admin/export/everything").status_code == 404
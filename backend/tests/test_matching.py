@@ -1,7 +1,11 @@
+import itertools
+import json
+import random
+
 import pytest
 from services.matching import calculate_team_cost, cost_to_score, calculate_match_score
+from services.team_optimizer import best_swaps, optimize_team
 from models import User, Quest
-import json
 
 
 def make_user(name, o, c, e, a, n, skills=[]):
@@ -157,3 +161,44 @@ def test_single_user_cost():
     u1 = make_user("One", 30, 30, 30, 30, 10)
     assert calculate_team_cost([u1]) == 0.0
     assert calculate_team_cost([]) == 0.0
+
+
+def test_optimize_team_finds_the_harmonious_pair():
+    """Small pools: the search should land on the exhaustive optimum."""
+
+    rng = random.Random(3)
+    pool = [
+        make_user(f"U{i}", *(rng.randint(10, 50) for _ in range(5))) for i in range(8)
+    ]
+    for i, u in enumerate(pool):
+        u.id = f"u{i}"
+    best = min(calculate_team_cost(list(pair)) for pair in itertools.combinations(pool, 2))
+
+    team, cost = optimize_team(
+        [{"dept_id": "d", "count": 2, "pool": pool}], 1000, cost_threshold=-1, rng=random.Random(0)
+    )
+    assert len(team) == 2
+    assert cost == pytest.approx(best)
+
+
+def test_best_swaps_match_the_brute_force_ranking():
+    """Leave-one-out sums must rank swaps exactly like rescoring every team."""
+
+    rng = random.Random(11)
+    people = [
+        make_user(f"U{i}", *(rng.randint(10, 50) for _ in range(5))) for i in range(24)
+    ]
+    leader, members, pool = people[0], people[1:5], people[5:]
+
+    brute = []
+    for m in members:
+        for c in pool:
+            team = [leader] + [c if u is m else u for u in members]
+            brute.append((calculate_team_cost(team), m.name, c.name))
+    current = calculate_team_cost([leader] + members)
+    brute = sorted(s for s in brute if s[0] < current)[:5]
+
+    cost, swaps = best_swaps([leader] + members, members, pool, limit=5)
+    assert cost == pytest.approx(current)
+    assert [(m.name, c.name) for _, m, c in swaps] == [(m, c) for _, m, c in brute]
+    assert [s[0] for s in swaps] == pytest.approx([s[0] for s in brute])
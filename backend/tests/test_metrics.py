@@ -0,0 +1,188 @@
+import json
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel.pool import StaticPool
+
+from core.auth import get_current_user
+from core.database import get_session
+from core.http_metrics import REQUEST_DURATION, REQUEST_QUERIES, RESPONSE_SIZE
+from core.query_stats import QueryStats, statement_shape
+from main import app
+from models import Quest, User
+
+engine = create_engine(
+    "sqlite://",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+
+client = TestClient(app)
+
+
+def override_get_session():
+    with Session(engine) as session:
+        yield session
+
+
+def setup_function():
+    SQLModel.metadata.create_all(engine)
+    app.dependency_overrides[get_session] = override_get_session
+
+
+def teardown_function():
+    app.dependency_overrides = {}
+    SQLModel.metadata.drop_all(engine)
+
+
+def test_requests_are_recorded_per_route_template_with_query_counts():
+    with Session(engine) as session:
+        session.add(User(name="Hero"))
+        session.commit()
+
+    labels = {"method": "GET", "route": "/users"}
+    count_before = REQUEST_QUERIES.count(**labels)
+    queries_before = REQUEST_QUERIES.sum(**labels)
+    size_before = RESPONSE_SIZE.sum(**labels)
+
+    response = client.get("/users")
+    assert response.status_code == 200
+
+    assert REQUEST_DURATION.count(status="200", **labels) >= 1
+    assert REQUEST_QUERIES.count(**labels) == count_before + 1
+    # total count + page of users
+    assert REQUEST_QUERIES.sum(**labels) - queries_before == 2
+    assert RESPONSE_SIZE.sum(**labels) - size_before == len(response.content)
+
+    client.get("/quests/does-not-exist")
+    text = client.get("/metrics").text
+    assert 'route="/quests/{quest_id}"' in text
+    assert "does-not-exist" not in text
+    assert "kemii_http_requests_in_flight 1" in text
+
+
+def test_quest_list_query_budget(query_budget):
+    with Session(engine) as session:
+        users = [User(name=f"Hero {i}") for i in range(50)]
+        session.add_all(users)
+        session.commit()
+        ids = [u.id for u in users]
+        session.add_all(
+            Quest(
+                title=f"Quest {i}",
+                description="",
+                leader_id=ids[i % 50],
+                accepted_members=json.dumps([ids[(i + 1) % 50], ids[(i + 2) % 50]]),
+            )
+            for i in range(500)
+        )
+        session.commit()
+
+    with query_budget(3, engine):
+        response = client.get("/quests")
+    assert len(response.json()["quests"]) == 500
+
+
+def test_leader_fields_do_not_load_the_member_lists(query_budget):
+    with Session(engine) as session:
+        users = [User(name=f"Hero {i}", character_class="Mage") for i in range(5)]
+        session.add_all(users)
+        session.commit()
+        ids = [u.id for u in users]
+        session.add_all(
+            Quest(title=f"Quest {i}", description="", leader_id=ids[i % 5], accepted_members=json.dumps(ids))
+            for i in range(30)
+        )
+        session.commit()
+
+    # version check + projected quests + leaders
+    with query_budget(3, engine) as stats:
+        quests = client.get("/quests?fields=leader_name,leader_class").json()["quests"]
+    assert len(quests) == 30
+    assert {q["leader_class"] for q in quests} == {"Mage"}
+    assert not any("accepted_members" in s for s in stats.statements)
+
+
+def test_repeated_query_shapes_are_grouped():
+    stats = QueryStats()
+    for uid in ["a", "b", "c"]:
+        stats.record("SELECT * FROM user WHERE user.id = ?", 0.001)
+    stats.record("SELECT * FROM user WHERE user.id IN (?, ?, ?)", 0.001)
+    stats.record("SELECT * FROM user WHERE user.id IN (?, ?)", 0.001)
+    stats.record("SELECT * FROM quest LIMIT 10", 0.001)
+
+    assert statement_shape("SELECT *\n  FROM quest LIMIT 10") == "SELECT * FROM quest LIMIT N"
+    assert stats.repeated_shapes(threshold=2) == [
+        ("SELECT * FROM user WHERE user.id = ?", 3),
+        ("SELECT * FROM user WHERE user.id IN (?)", 2),
+    ]
+
+
+def test_quest_detail_with_analysis_loads_the_team_once(query_budget):
+    with Session(engine) as session:
+        users = [
+            User(
+                name=f"Hero {i}",
+                skills=json.dumps([{"name": "Payroll", "level": i + 1}]),
+                ocean_openness=30 + 5 * i,
+                ocean_agreeableness=40,
+            )
+            for i in range(4)
+        ]
+        session.add_all(users)
+        session.commit()
+        ids = [u.id for u in users]
+        quest = Quest(
+            title="Payroll run",
+            description="",
+            leader_id=ids[0],
+            required_skills=json.dumps([{"name": "Payroll", "level": 3}]),
+            accepted_members=json.dumps(ids[1:]),
+        )
+        session.add(quest)
+        session.commit()
+        quest_id = quest.id
+
+    # quest + one query for leader and members
+    with query_budget(2, engine):
+        detail = client.get(f"/quests/{quest_id}?include=analysis").json()
+
+    analysis = client.get(f"/quests/{quest_id}/team-analysis").json()
+    assert detail["analysis"] == analysis
+    assert detail["harmony_score"] == analysis["harmony_score"]
+    assert [m["id"] for m in detail["accepted_members"]] == ids[1:]
+    assert analysis["skill_coverage"]["all_covered"] is True
+    assert analysis["team_ocean"]["O"] == 40
+
+    assert client.get(f"/quests/{quest_id}").json()["analysis"] is None
+
+
+def test_sparse_fieldsets_project_columns_in_sql(query_budget):
+    with Session(engine) as session:
+        hero = User(name="Hero", character_class="Mage", skills=json.dumps([{"name": "Payroll", "level": 2}]))
+        session.add(hero)
+        session.commit()
+        session.add(Quest(title="Quest", description="x" * 5000, leader_id=hero.id))
+        session.commit()
+
+    # version check + the projected quest query
+    with query_budget(2, engine) as stats:
+        response = client.get("/quests?fields=title,status")
+    assert response.json() == {
+        "quests": [{"id": response.json()["quests"][0]["id"], "title": "Quest", "status": "open"}]
+    }
+    assert "description" not in stats.statements[-1]
+
+    with query_budget(2, engine) as stats:
+        users = client.get("/users?fields=name,character_class").json()["users"]
+    assert users == [{"id": users[0]["id"], "name": "Hero", "character_class": "Mage"}]
+    assert "skills" not in stats.statements[-1]
+
+    app.dependency_overrides[get_current_user] = lambda: User(id="viewer", name="Viewer")
+    roster = client.get("/users/roster?fields=name,character_class").json()
+    assert roster == [{"id": users[0]["id"], "name": "Hero", "character_class": "Mage"}]
+
+    assert client.get("/users?fields=name,password").status_code == 400
+    assert client.get("/quests?fields=accepted_members").status_code == 400
+    # Without fields= the full payload is unchanged
+    assert client.get("/quests").json()["quests"][0]["leader_name"] == "Hero"
@@ -0,0 +1,137 @@
+import json
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import update
+from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel.pool import StaticPool
+
+from core.auth import get_current_user, get_optional_user
+from core.database import get_session
+from main import app
+from models import Quest, User
+from services.response_cache import FakeBackend, ResponseCache, response_cache
+
+engine = create_engine(
+    "sqlite://",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+
+client = TestClient(app)
+
+
+def override_get_session():
+    with Session(engine) as session:
+        yield session
+
+
+@pytest.fixture
+def backend():
+    SQLModel.metadata.create_all(engine)
+    app.dependency_overrides[get_session] = override_get_session
+    fake = FakeBackend()
+    response_cache.use(fake)
+    yield fake
+    response_cache.use(None)
+    app.dependency_overrides = {}
+    SQLModel.metadata.drop_all(engine)
+
+
+def test_ttl_then_stale_while_revalidate_then_expiry():
+    fake = FakeBackend()
+    cache = ResponseCache(fake, ttl=10, swr=5)
+    calls = []
+
+    def compute(session):
+        calls.append(1)
+        return {"n": len(calls)}
+
+    with Session(engine) as session:
+        get = lambda: cache.get_or_compute("test", ["k"], ["t"], compute, session)
+        assert get() == {"n": 1}
+        assert get() == {"n": 1}
+
+        # Stale: old value right away, one refresh in the background
+        fake.advance(12)
+        assert get() == {"n": 1}
+        deadline = time.monotonic() + 2
+        while len(calls) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert get() == {"n": 2}
+
+        # Past the stale window: recomputed inline
+        fake.advance(20)
+        assert get() == {"n": 3}
+
+        # A published tag invalidates immediately, even when fresh
+        cache.publish("t")
+        assert get() == {"n": 4}
+
+
+def test_memory_backend_evicts_least_recently_used():
+    cache = ResponseCache(FakeBackend(max_entries=2), ttl=60, swr=0)
+    with Session(engine) as session:
+        get = lambda k: cache.get_or_compute("test", [k], [], lambda s: {"k": k, "t": time.monotonic()}, session)
+        a = get("a")
+        get("b")
+        assert get("a") == a  # touch a, so b is the oldest
+        get("c")
+        assert get("a") == a
+        assert len(cache.backend._entries) == 2
+        assert json.dumps(["test", "b"]) not in cache.backend._entries
+
+
+def test_writes_publish_invalidation_and_views_stay_per_requester(backend, query_budget):
+    with Session(engine) as session:
+        owner = User(name="Owner", email="owner@kemii.com", hashed_password="secret-hash")
+        other = User(name="Other", email="other@kemii.com")
+        session.add_all([owner, other])
+        session.commit()
+        quest = Quest(
+            title="Quest",
+            description="",
+            leader_id=owner.id,
+            accepted_members=json.dumps([other.id]),
+        )
+        session.add(quest)
+        session.commit()
+        owner_id, other_id, quest_id = owner.id, other.id, quest.id
+
+    assert set(backend.published) >= {"users", "quests", f"quest:{quest_id}"}
+
+    client.get("/quests")
+    # Cached: only the ETag version check runs
+    with query_budget(1, engine):
+        assert client.get("/quests").json()["quests"][0]["title"] == "Quest"
+    client.get(f"/quests/{quest_id}")
+    with query_budget(0, engine):
+        assert client.get(f"/quests/{quest_id}").status_code == 200
+
+    # An ORM write anywhere publishes its tags on commit
+    with Session(engine) as session:
+        user = session.get(User, other_id)
+        user.name = "Renamed"
+        session.add(user)
+        session.commit()
+    detail = client.get(f"/quests/{quest_id}").json()
+    assert detail["accepted_members"][0]["name"] == "Renamed"
+
+    # One cached page, filtered per requester by _format_user_safe
+    app.dependency_overrides[get_optional_user] = lambda: User(id=owner_id, name="Owner")
+    mine = {u["name"]: u["email"] for u in client.get("/users").json()["users"]}
+    app.dependency_overrides[get_optional_user] = lambda: User(id=other_id, name="Renamed")
+    theirs = {u["name"]: u["email"] for u in client.get("/users").json()["users"]}
+    assert mine == {"Owner": "owner@kemii.com", "Renamed": "HIDDEN"}
+    assert theirs == {"Owner": "HIDDEN", "Renamed": "other@kemii.com"}
+    # Only UserPublic columns are cached
+    assert "secret-hash" not in repr(backend._entries)
+
+    # Bulk statements publish too
+    app.dependency_overrides[get_current_user] = lambda: User(id="viewer", name="Viewer")
+    assert len(client.get("/users/roster").json()) == 2
+    with Session(engine) as session:
+        session.execute(update(User).where(User.id == other_id).values(is_available=False))
+        session.commit()
+    assert [u["name"] for u in client.get("/users/roster").json()] == ["Owner"]
@@ -0,0 +1,136 @@
+import asyncio
+import json
+from datetime import datetime, timedelta
+
+from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel.pool import StaticPool
+
+from models import Quest, User
+from services.availability import release_expired_users
+from services.quest_sweeper import sweep_overdue_quests
+from services.scheduler import JOB_DURATION, ExpirationHeap, PeriodicJob
+
+engine = create_engine(
+    "sqlite://",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+
+
+def setup_function():
+    SQLModel.metadata.create_all(engine)
+
+
+def teardown_function():
+    SQLModel.metadata.drop_all(engine)
+
+
+def add_user(session, name, is_available=False, end_date=None):
+    user = User(name=name, is_available=is_available, active_project_end_date=end_date)
+    session.add(user)
+    session.commit()
+    session.refresh(user)
+    return user.id
+
+
+def test_release_expired_users_is_one_bulk_update():
+    now = datetime(2026, 1, 10, 12, 0)
+    with Session(engine) as session:
+        expired = add_user(session, "Expired", end_date=now - timedelta(days=1))
+        future = add_user(session, "Future", end_date=now + timedelta(days=1))
+        no_date = add_user(session, "Locked")
+
+        released = release_expired_users(session, now=now)
+        assert released == 1
+
+        session.expire_all()
+        assert session.get(User, expired).is_available is True
+        assert session.get(User, expired).active_project_end_date is None
+        assert session.get(User, future).is_available is False
+        assert session.get(User, no_date).is_available is False
+
+
+def test_expiration_heap_orders_and_pops_due():
+    heap = ExpirationHeap()
+    base = datetime(2026, 1, 1)
+    assert heap.push("late", base + timedelta(days=5)) is True
+    assert heap.push("early", base + timedelta(days=1)) is True
+    assert heap.push("mid", base + timedelta(days=3)) is False
+
+    assert heap.peek() == base + timedelta(days=1)
+    assert heap.pop_due(base + timedelta(days=4)) == ["early", "mid"]
+    assert heap.peek() == base + timedelta(days=5)
+
+
+def test_periodic_job_sleeps_until_next_due():
+    due = datetime.utcnow() + timedelta(seconds=5)
+    job = PeriodicJob("test_job", lambda: 0, interval=3600, next_due=lambda: due)
+    assert 0 < job.seconds_until_next_run() <= 5
+
+    job.next_due = lambda: None
+    assert job.seconds_until_next_run() == 3600
+
+
+def test_periodic_job_wakes_early_and_records_timing():
+    runs = []
+    job = PeriodicJob("wake_job", lambda: runs.append(1) or 1, interval=3600)
+    before = JOB_DURATION.count(job="wake_job")
+
+    async def drive():
+        task = asyncio.create_task(job.run_forever())
+        while len(runs) < 1:
+            await asyncio.sleep(0.01)
+        job.wake()
+        while len(runs) < 2:
+            await asyncio.sleep(0.01)
+        task.cancel()
+
+    asyncio.run(asyncio.wait_for(drive(), 5))
+    assert len(runs) == 2
+    assert JOB_DURATION.count(job="wake_job") == before + 2
+
+
+def add_quest(session, leader_id, members, deadline, status="filled"):
+    quest = Quest(
+        title="Quest",
+        description="",
+        leader_id=leader_id,
+        status=status,
+        accepted_members=json.dumps(members),
+        deadline=deadline,
+    )
+    session.add(quest)
+    session.commit()
+    session.refresh(quest)
+    return quest.id
+
+
+def test_sweep_overdue_quests_in_batches_releases_members():
+    now = datetime(2026, 1, 10, 12, 0)
+    past = now - timedelta(days=1)
+    with Session(engine) as session:
+        members = [add_user(session, f"M{i}", end_date=now + timedelta(days=30)) for i in range(3)]
+        overdue = [
+            add_quest(session, members[0], [members[0], members[1]], past),
+            add_quest(session, members[2], [members[2]], past, status="in_progress"),
+            add_quest(session, members[0], [], past, status="open"),
+        ]
+        done = add_quest(session, members[0], [members[0]], past, status="completed")
+        future = add_quest(session, members[0], [members[0]], now + timedelta(days=1))
+
+        swept = sweep_overdue_quests(session, now=now, terminal_status="failed", batch_size=2)
+        assert swept == 3
+
+        session.expire_all()
+        assert {session.get(Quest, qid).status for qid in overdue} == {"failed"}
+        assert session.get(Quest, done).status == "completed"
+        assert session.get(Quest, future).status == "filled"
+        for uid in members[1:]:
+            assert session.get(User, uid).is_available is True
+            assert session.get(User, uid).active_project_end_date is None
+        # Still on the future quest: busy until its deadline
+        still_busy = session.get(User, members[0])
+        assert still_busy.is_available is False
+        assert still_busy.active_project_end_date == now + timedelta(days=1)
+
+        assert sweep_overdue_quests(session, now=now) == 0
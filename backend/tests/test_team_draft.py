@@ -0,0 +1,147 @@
+import json
+import random
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel.pool import StaticPool
+
+from core.auth import create_access_token, verify_token
+from core.database import get_session
+from main import app
+from models import Quest, User
+from services.matching import RunningTeamStats, calculate_team_cost, evaluate_team
+
+engine = create_engine(
+    "sqlite://",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+
+client = TestClient(app)
+
+
+def override_get_session():
+    with Session(engine) as session:
+        yield session
+
+
+def setup_function():
+    SQLModel.metadata.create_all(engine)
+    app.dependency_overrides[get_session] = override_get_session
+
+
+def teardown_function():
+    app.dependency_overrides = {}
+    SQLModel.metadata.drop_all(engine)
+
+
+def _person(rng, i):
+    return User(
+        id=f"u{i}",
+        name=f"User {i}",
+        ocean_openness=rng.randint(10, 50),
+        ocean_conscientiousness=rng.randint(10, 50),
+        ocean_extraversion=rng.randint(10, 50),
+        ocean_agreeableness=rng.randint(10, 50),
+        ocean_neuroticism=rng.randint(10, 50),
+    )
+
+
+def test_running_stats_match_the_full_formula_through_adds_and_removes():
+    rng = random.Random(7)
+    people = [_person(rng, i) for i in range(30)]
+    stats, team = RunningTeamStats(), []
+
+    for _ in range(500):
+        if team and (len(team) > 8 or rng.random() < 0.4):
+            u = team.pop(rng.randrange(len(team)))
+            stats.remove(u)
+        else:
+            u = rng.choice([p for p in people if p not in team])
+            team.append(u)
+            stats.add(u)
+        assert stats.cost() == pytest.approx(calculate_team_cost(team), abs=1e-9)
+        # Summation order differs, so a score can round the other way
+        running, full = stats.evaluate(), evaluate_team(team)
+        assert running["score"] == pytest.approx(full["score"], abs=0.1)
+
+    incomplete = User(id="x", name="No test", ocean_openness=None)
+    stats.add(incomplete)
+    stats.add(people[0])
+    assert stats.evaluate()["rating"] == "Invalid Data"
+
+
+def test_draft_socket_pushes_score_and_coverage_after_each_change():
+    rng = random.Random(3)
+    with Session(engine) as session:
+        people = [_person(rng, i) for i in range(4)]
+        people[0].skills = json.dumps([{"name": "Dept: HR Business Partner (HRBP)", "level": 3}])
+        session.add_all(people)
+        session.commit()
+        people = [session.get(User, f"u{i}") for i in range(4)]
+        session.expunge_all()
+
+    token = create_access_token("u0")
+    with client.websocket_connect(f"/teams/draft/ws?token={token}") as ws:
+        ws.send_json(
+            {
+                "op": "init",
+                "requirements": [{"department_id": "hrbp", "count": 1}],
+                "candidate_ids": ["u0", "u1", "u2", "u3"],
+                "member_ids": ["u1", "u2"],
+            }
+        )
+        state = ws.receive_json()
+        assert state["member_ids"] == ["u1", "u2"]
+        assert state["score"] == evaluate_team(people[1:3])["score"]
+        assert state["coverage"][0]["have"] == 0 and not state["covered"]
+
+        ws.send_json({"op": "add", "user_id": "u0"})
+        state = ws.receive_json()
+        assert state["rating"] == evaluate_team(people[:3])["rating"]
+        assert state["covered"]
+        assert state["compute_ms"] < 1
+
+        ws.send_json({"op": "remove", "user_id": "u1"})
+        state = ws.receive_json()
+        assert state["member_ids"] == ["u2", "u0"]
+        assert state["cost"] == evaluate_team([people[2], people[0]])["cost"]
+
+        ws.send_json({"op": "add"})
+        assert "error" in ws.receive_json()
+
+
+def test_draft_socket_requires_a_token():
+    with pytest.raises(WebSocketDisconnect):
+        with client.websocket_connect("/teams/draft/ws?token=bad") as ws:
+            ws.receive_json()
+
+
+def test_swap_suggestions_are_leader_only_and_improve_harmony():
+    with Session(engine) as session:
+        calm = {"ocean_openness": 30, "ocean_conscientiousness": 40, "ocean_extraversion": 30}
+        leader = User(id="leader", name="Leader", ocean_agreeableness=40, ocean_neuroticism=15, **calm)
+        clash = User(id="clash", name="Clash", ocean_agreeableness=10, ocean_neuroticism=50, **calm)
+        fit = User(id="fit", name="Fit", ocean_agreeableness=40, ocean_neuroticism=15, **calm)
+        quest = Quest(
+            id="quest",
+            title="Quest",
+            description="",
+            leader_id=leader.id,
+            status="filled",
+            accepted_members=json.dumps([clash.id]),
+        )
+        session.add_all([leader, clash, fit, quest])
+        session.commit()
+
+    app.dependency_overrides[verify_token] = lambda: "clash"
+    assert client.get("/quests/quest/swap-suggestions").status_code == 403
+
+    app.dependency_overrides[verify_token] = lambda: "leader"
+    response = client.get("/quests/quest/swap-suggestions")
+    assert response.status_code == 200
+    best = response.json()["suggestions"][0]
+    assert (best["remove"]["name"], best["add"]["name"]) == ("Clash", "Fit")
+    assert best["delta_score"] > 0
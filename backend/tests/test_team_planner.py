@@ -0,0 +1,135 @@
+import json
+import random
+from collections import Counter
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel.pool import StaticPool
+
+from core.database import get_session
+from main import app
+from models import User
+from services.matching import calculate_team_cost
+from services.team_planner import assign_departments, plan_teams
+
+engine = create_engine(
+    "sqlite://",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+
+client = TestClient(app)
+
+
+def override_get_session():
+    with Session(engine) as session:
+        yield session
+
+
+def setup_function():
+    SQLModel.metadata.create_all(engine)
+    app.dependency_overrides[get_session] = override_get_session
+
+
+def teardown_function():
+    app.dependency_overrides = {}
+    SQLModel.metadata.drop_all(engine)
+
+
+def _brute_force(demand, scores):
+    """(slots filled, total score) of the best assignment, by enumeration."""
+    slots = [d for d, n in demand.items() for _ in range(n)]
+    best = (0, 0)
+
+    def search(i, used, filled, total):
+        nonlocal best
+        if i == len(slots):
+            best = max(best, (filled, total))
+            return
+        search(i + 1, used, filled, total)
+        for uid, by_dept in scores.items():
+            if uid not in used and slots[i] in by_dept:
+                search(i + 1, used | {uid}, filled + 1, total + by_dept[slots[i]])
+
+    search(0, frozenset(), 0, 0)
+    return best
+
+
+def test_min_cost_flow_matches_exhaustive_search():
+    rng = random.Random(1)
+    for _ in range(150):
+        depts = ["a", "b", "c"][: rng.randint(1, 3)]
+        demand = {d: rng.randint(0, 2) for d in depts}
+        scores = {
+            f"u{i}": {d: rng.randint(0, 90) for d in depts if rng.random() < 0.7}
+            for i in range(rng.randint(1, 5))
+        }
+        assigned = assign_departments(demand, scores)
+
+        per_dept = Counter(assigned.values())
+        assert all(per_dept[d] <= demand[d] for d in per_dept)
+        total = sum(scores[uid][d] for uid, d in assigned.items())
+        assert (len(assigned), total) == _brute_force(demand, scores)
+
+
+def test_refinement_only_lowers_total_harmony_cost():
+    rng = random.Random(5)
+    users = {}
+    for i in range(60):
+        users[f"u{i}"] = User(
+            id=f"u{i}",
+            name=f"User {i}",
+            **{
+                f"ocean_{t}": rng.randint(10, 50)
+                for t in ("openness", "conscientiousness", "extraversion", "agreeableness", "neuroticism")
+            },
+        )
+    scores = {uid: {"a": 50, "b": 50} for uid in users}
+    quests = [{"key": f"q{i}", "slots": {"a": 2, "b": 2}} for i in range(10)]
+
+    def total_cost(plans):
+        return sum(calculate_team_cost([u for u, _ in p["members"]]) for p in plans)
+
+    unrefined = plan_teams(quests, users, scores, refine_iterations=0)
+    refined = plan_teams(quests, users, scores, refine_iterations=5000, rng=random.Random(0))
+    assert all(len(p["members"]) == 4 and not p["unfilled"] for p in refined)
+    assert total_cost(refined) < total_cost(unrefined)
+
+
+def test_plan_endpoint_staffs_several_quests_without_sharing_people():
+    with Session(engine) as session:
+        for i in range(6):
+            dept = "HR Business Partner (HRBP)" if i % 2 else "SWP & Organization Development"
+            session.add(
+                User(
+                    name=f"User {i}",
+                    skills=json.dumps([{"name": f"Dept: {dept}", "level": 3}]),
+                    ocean_openness=30,
+                    ocean_conscientiousness=40,
+                    ocean_extraversion=20 + i,
+                    ocean_agreeableness=40,
+                    ocean_neuroticism=15,
+                )
+            )
+        session.commit()
+
+    response = client.post(
+        "/teams/plan",
+        json={
+            "quests": [
+                {"key": "alpha", "requirements": [{"department_id": "hrbp", "count": 1}, {"department_id": "swp_od", "count": 1}]},
+                {"key": "beta", "requirements": [{"department_id": "hrbp", "count": 2}]},
+                {"key": "gamma", "requirements": [{"department_id": "swp_od", "count": 3}]},
+            ]
+        },
+    )
+    assert response.status_code == 200
+    plans = {q["key"]: q for q in response.json()["quests"]}
+    ids = [m["id"] for q in plans.values() for m in q["members"]]
+    assert len(ids) == len(set(ids)) == 6
+    assert plans["beta"]["unfilled"] == {}
+    assert sum(plans["gamma"]["unfilled"].values()) + sum(plans["alpha"]["unfilled"].values()) == 1
+    assert {m["dept_id"] for m in plans["beta"]["members"]} == {"hrbp"}
+
+    bad = client.post("/teams/plan", json={"quests": [{"key": "x", "requirements": [{"department_id": "nope", "count": 1}]}]})
+    assert bad.status_code == 400
@@ -0,0 +1,100 @@
+import io
+import json
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session, SQLModel, create_engine, select
+from sqlmodel.pool import StaticPool
+
+from core.auth import get_current_admin, verify_password
+from core.database import get_session
+from main import app
+from models import User
+from services.user_import import import_users
+
+engine = create_engine(
+    "sqlite://",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+
+client = TestClient(app)
+
+
+def override_get_session():
+    with Session(engine) as session:
+        yield session
+
+
+def setup_function():
+    SQLModel.metadata.create_all(engine)
+    app.dependency_overrides[get_session] = override_get_session
+
+
+def teardown_function():
+    app.dependency_overrides = {}
+    SQLModel.metadata.drop_all(engine)
+
+
+def test_ndjson_import_validates_dedupes_and_batches():
+    with Session(engine) as session:
+        session.add(User(name="Existing", email="taken@kemii.com"))
+        session.commit()
+
+    lines = [
+        json.dumps({"name": "A", "email": "a@kemii.com", "password": "pw-a", "ocean_openness": 40}),
+        json.dumps({"name": "B", "email": "b@kemii.com", "skills": [{"name": "Payroll", "level": 3}]}),
+        "{not json",
+        json.dumps({"name": "C", "email": "a@kemii.com"}),
+        json.dumps({"name": "D", "email": "taken@kemii.com"}),
+        json.dumps({"name": "E", "ocean_neuroticism": 99}),
+        "",
+        json.dumps({"name": "F"}),
+    ]
+    reports = list(import_users(io.StringIO("\n".join(lines)), "ndjson", engine=engine, chunk_size=3, workers=2))
+
+    # 7 records in chunks of 3 -> 3 progress reports + the final summary
+    assert len(reports) == 4
+    final = reports[-1]
+    assert final["done"] is True
+    assert (final["processed"], final["imported"], final["skipped"]) == (7, 3, 4)
+    errors = {e["line"]: e["error"] for e in final["error_details"]}
+    assert errors[3].startswith("invalid JSON")
+    assert "duplicate email" in errors[4]
+    assert "already registered" in errors[5]
+    assert errors[6].startswith("ocean_neuroticism")
+
+    with Session(engine) as session:
+        a = session.exec(select(User).where(User.email == "a@kemii.com")).one()
+        assert verify_password("pw-a", a.hashed_password)
+        assert a.ocean_openness == 40
+        b = session.exec(select(User).where(User.email == "b@kemii.com")).one()
+        assert b.hashed_password is None
+        assert json.loads(b.skills) == [{"name": "Payroll", "level": 3}]
+
+
+def test_csv_import_endpoint_streams_progress():
+    admin = User(name="Admin", role="admin")
+    app.dependency_overrides[get_current_admin] = lambda: admin
+    body = (
+        "name,email,password,character_class,ocean_agreeableness,skills\n"
+        "Somchai,somchai@kemii.com,1234,Cleric,45,Payroll:3;Labor Law & Regulations:2\n"
+        "Wipa,wipa@kemii.com,,Mage,,\n"
+        ",nobody@kemii.com,,,,\n"
+    )
+
+    response = client.post(
+        "/admin/users/import", content=body, headers={"content-type": "text/csv"}
+    )
+    assert response.status_code == 200
+    reports = [json.loads(line) for line in response.text.splitlines()]
+    assert reports[-1]["done"] is True
+    assert reports[-1]["imported"] == 2
+    assert reports[-1]["error_details"][0]["line"] == 4
+
+    with Session(engine) as session:
+        somchai = session.exec(select(User).where(User.name == "Somchai")).one()
+        assert somchai.character_class == "Cleric"
+        assert json.loads(somchai.skills)[1] == {"name": "Labor Law & Regulations", "level": 2}
+
+    bad = client.post("/admin/users/import?format=xml", content="")
+    assert bad.status_code == 400
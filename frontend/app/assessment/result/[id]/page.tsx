@@ -12,6 +12,10 @@ import ElementalLoader from "@/components/ElementalLoader";
 
 const API_URL = process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000";
 
+// ผลวิเคราะห์ยังไม่เสร็จ (รอคิวหรือกำลังวิเคราะห์)
+const isAnalysisWaiting = (data?: { analysis_status?: string }) =>
+  data?.analysis_status === "pending" || data?.analysis_status === "processing";
+
 export default function ResultPage() {
   const params = useParams();
   const router = useRouter();
@@ -60,6 +64,9 @@ export default function ResultPage() {
     },
     enabled: isAuthorized && !!token,
     retry: false,
+    // รอคิว / วิเคราะห์อยู่เบื้องหลัง -> ถามใหม่จนกว่าจะเสร็จ
+    refetchInterval: (query) =>
+      isAnalysisWaiting(query.state.data) ? 3000 : false,
     staleTime: 0,
     gcTime: 0,
     refetchOnMount: "always",
@@ -81,7 +88,7 @@ export default function ResultPage() {
     }
   }, [error, router]);
 
-  if (authLoading || isLoading || !isAuthorized) {
+  if (authLoading || isLoading || !isAuthorized || isAnalysisWaiting(data)) {
     return (
       <div className="min-h-screen flex flex-col items-center justify-center bg-[var(--background)] transition-colors">
         <ElementalLoader />
@@ -120,7 +120,7 @@ export default function QuestDetailPage({
 
   const queryClient = useQueryClient();
 
-  // 1. Fetch Quest Detail
+  // 1. Fetch Quest Detail + Team Analysis in one request
   const {
     data: quest,
     isLoading: loading,
@@ -128,20 +128,15 @@ export default function QuestDetailPage({
   } = useQuery({
     queryKey: ["quest", id],
     queryFn: async () => {
-      const res = await api.get(`/quests/${id}`);
+      const res = await api.get(`/quests/${id}`, {
+        params: { include: "analysis" },
+      });
       return res.data;
     },
   });
 
-  // 2. Fetch Team Analysis (Enabled if quest exists)
-  const { data: teamAnalysis } = useQuery({
-    queryKey: ["quest-analysis", id],
-    queryFn: async () => {
-      const res = await api.get(`/quests/${id}/team-analysis`);
-      return res.data;
-    },
-    enabled: !!quest,
-  });
+  // 2. Team Analysis comes with the quest detail
+  const teamAnalysis = quest?.analysis;
 
   // 3. Fetch Candidates (Enabled if quest exists and user is leader and status allows)
   const isLeader = user?.id === quest?.leader_id;
@@ -150,7 +145,6 @@ export default function QuestDetailPage({
 
   const refreshQuest = () => {
     queryClient.invalidateQueries({ queryKey: ["quest", id] });
-    queryClient.invalidateQueries({ queryKey: ["quest-analysis", id] });
     queryClient.invalidateQueries({ queryKey: ["quest-candidates", id] });
     queryClient.invalidateQueries({ queryKey: ["quests"] });
   };